@@ -1,12 +1,18 @@
 # Main Flask application for AI-Powered Local Business Booster
 
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, session, flash
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, session, flash, Response, stream_with_context, abort, g
 import os
 import json
+import mimetypes
 import uuid
+import hashlib
+import threading
+import time
 import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from werkzeug.utils import secure_filename
 import requests
+from PIL import Image
 
 # Import configuration
 import config
@@ -17,6 +23,15 @@ from modules.content_generator import ContentGenerator
 from modules.image_service import ImageService
 from modules.file_storage import FileStorage
 from modules.export_service import ExportService
+from modules.generation_pipeline import GenerationPipeline
+from modules.job_manager import JobManager
+from modules.cache import TieredCache
+from modules.http_client import ProviderClients
+from modules.image_pool import ImagePool
+from modules.media_store import MediaStore
+from modules.batch_runner import BatchRunner
+from modules.metrics import Metrics
+import click
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -24,29 +39,285 @@ app.config['SECRET_KEY'] = config.SECRET_KEY
 app.config['UPLOAD_FOLDER'] = config.UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = config.MAX_CONTENT_LENGTH
 
-# Create upload folder if it doesn't exist
-if not os.path.exists(config.UPLOAD_FOLDER):
-    os.makedirs(config.UPLOAD_FOLDER)
+# Create upload and batch folders if they don't exist
+for folder in (config.UPLOAD_FOLDER, config.BATCH_DIR):
+    if not os.path.exists(folder):
+        os.makedirs(folder)
 
 # Initialize services
+metrics = Metrics(buckets=config.METRICS_LATENCY_BUCKETS)
+http_clients = ProviderClients(
+    pool_size=config.HTTP_POOL_SIZE,
+    connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=config.HTTP_READ_TIMEOUT,
+    read_timeouts=config.HTTP_PROVIDER_READ_TIMEOUTS,
+    rate_limits=config.HTTP_RATE_LIMITS,
+    max_retries=config.HTTP_MAX_RETRIES,
+    backoff_base=config.HTTP_BACKOFF_BASE,
+    backoff_max=config.HTTP_BACKOFF_MAX,
+    retry_budget=config.HTTP_RETRY_BUDGET,
+    breaker_settings=config.HTTP_CIRCUIT_BREAKER,
+    cassette_mode=config.HTTP_CASSETTE_MODE,
+    cassette_dir=config.HTTP_CASSETTE_DIR,
+    replay_speed=config.HTTP_REPLAY_SPEED
+)
+media_store = MediaStore(
+    root=config.MEDIA_DIR,
+    variant_root=config.MEDIA_VARIANT_DIR,
+    variant_widths=config.MEDIA_VARIANT_WIDTHS,
+    variant_max_bytes=config.MEDIA_VARIANT_MAX_BYTES,
+    variant_quality=config.MEDIA_VARIANT_QUALITY
+)
 business_processor = BusinessProcessor()
+llm_response_cache = TieredCache(
+    max_items=config.LLM_CACHE_MAX_ITEMS,
+    ttl=config.LLM_CACHE_TTL,
+    disk_path=config.LLM_CACHE_DIR,
+    disk_max_bytes=config.LLM_CACHE_MAX_DISK_BYTES
+) if config.LLM_CACHE_ENABLED else None
 content_generator = ContentGenerator(
-    api_key=config.GEMMA_API_KEY
+    api_key=config.GEMMA_API_KEY,
+    concurrent=config.CONTENT_CONCURRENT_SECTIONS,
+    max_workers=config.CONTENT_MAX_WORKERS,
+    section_timeouts=config.CONTENT_SECTION_TIMEOUTS,
+    http_clients=http_clients,
+    response_cache=llm_response_cache,
+    structured=config.CONTENT_STRUCTURED_OUTPUT,
+    metrics=metrics,
+    api_url=config.NVIDIA_API_URL
 )
 image_service = ImageService(
     stability_api_key=config.STABILITY_AI_API_KEY,
     bria_api_key=config.BRIA_API_KEY,
     unsplash_api_key=config.UNSPLASH_API_KEY,
-    unsplash_secret_key=config.UNSPLASH_SECRET_KEY
+    unsplash_secret_key=config.UNSPLASH_SECRET_KEY,
+    http_clients=http_clients,
+    media_store=media_store,
+    race=config.IMAGE_RACE_ENABLED,
+    hedge_delay=config.IMAGE_HEDGE_DELAY,
+    max_workers=config.IMAGE_RACE_MAX_WORKERS or 3 * (config.JOB_MAX_WORKERS + config.IMAGE_POOL_REFILL_WORKERS),
+    metrics=metrics,
+    stability_api_url=config.STABILITY_API_URL,
+    bria_api_url=config.BRIA_API_URL,
+    unsplash_api_url=config.UNSPLASH_API_URL
+)
+file_storage = FileStorage(
+    api_key=config.TINYCLOUD_API_KEY,
+    http_clients=http_clients,
+    metrics=metrics,
+    api_url=config.TINYCLOUD_API_URL
+)
+export_service = ExportService(
+    http_clients=http_clients,
+    media_store=media_store,
+    max_workers=config.EXPORT_MAX_WORKERS,
+    pdf_image_dpi=config.EXPORT_PDF_IMAGE_DPI,
+    metrics=metrics,
+    cache_max_bytes=config.EXPORT_CACHE_MAX_BYTES,
+    cache_ttl=config.EXPORT_CACHE_TTL
+)
+image_pool = ImagePool(
+    image_service,
+    pool_dir=config.IMAGE_POOL_DIR,
+    pool_size=config.IMAGE_POOL_SIZE,
+    ttl=config.IMAGE_POOL_TTL,
+    refill_workers=config.IMAGE_POOL_REFILL_WORKERS
 )
-file_storage = FileStorage(api_key=config.TINYCLOUD_API_KEY)
-export_service = ExportService()
+generation_pipeline = GenerationPipeline(
+    business_processor,
+    content_generator,
+    image_service,
+    max_workers=config.PIPELINE_MAX_WORKERS,
+    request_timeout=config.GENERATE_REQUEST_TIMEOUT,
+    image_count=config.DEFAULT_IMAGE_COUNT,
+    metrics=metrics,
+    image_pool=image_pool if config.IMAGE_POOL_ENABLED else None
+)
+job_store = TieredCache(ttl=config.JOB_TTL, disk_path=config.JOB_STORE_DIR) if config.JOB_STORE_DIR else None
+job_manager = JobManager(
+    max_workers=config.JOB_MAX_WORKERS,
+    job_ttl=config.JOB_TTL,
+    store=job_store,
+    poll_interval=config.JOB_STORE_POLL_INTERVAL,
+    pools={'batch': config.BATCH_MAX_JOBS}
+)
+batch_runner = BatchRunner(generation_pipeline, max_workers=config.BATCH_MAX_WORKERS)
+result_store = TieredCache(
+    max_items=config.RESULT_STORE_MAX_ITEMS,
+    ttl=config.RESULT_STORE_TTL,
+    disk_path=config.RESULT_STORE_DIR,
+    disk_max_bytes=config.RESULT_STORE_MAX_DISK_BYTES
+)
+
+# Load on startup what would otherwise be loaded on first use, so a server that forks
+# worker processes after importing the app shares it copy-on-write instead of loading it in every worker
+def warm_up():
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    Image.init()
+    mimetypes.init()
+    export_service.warm_up()
+
+# Figures the services already keep, read when /metrics is scraped
+def collect_service_metrics():
+    caches = {'llm_response': llm_response_cache, 'results': result_store}
+    cache_stats = {name: cache.stats() for name, cache in caches.items() if cache is not None}
+    pool_stats = image_pool.stats()
+    lookups = pool_stats['hits'] + pool_stats['misses']
+    cache_stats['image_pool'] = dict(pool_stats, hit_ratio=round(pool_stats['hits'] / lookups, 3) if lookups else 0.0)
+    
+    traffic = http_clients.stats()
+    breakers = http_clients.breaker_status()
+    return [
+        ('cache_hits_total', 'counter', 'Cache lookups that found an entry.',
+         [({'cache': name}, stats['hits']) for name, stats in cache_stats.items()]),
+        ('cache_misses_total', 'counter', 'Cache lookups that found nothing.',
+         [({'cache': name}, stats['misses']) for name, stats in cache_stats.items()]),
+        ('cache_hit_ratio', 'gauge', 'Fraction of cache lookups that found an entry.',
+         [({'cache': name}, stats['hit_ratio']) for name, stats in cache_stats.items()]),
+        ('upstream_requests_total', 'counter', 'Requests sent to each upstream provider.',
+         [({'provider': provider}, stats['requests']) for provider, stats in traffic.items()]),
+        ('upstream_errors_total', 'counter', 'Upstream requests that failed or returned a server error.',
+         [({'provider': provider}, stats['errors']) for provider, stats in traffic.items()]),
+        ('upstream_retries_total', 'counter', 'Upstream requests retried after a 429 or 503.',
+         [({'provider': provider}, stats['retries']) for provider, stats in traffic.items()]),
+        ('upstream_circuit_open', 'gauge', 'Whether the circuit breaker of a provider is rejecting calls.',
+         [({'provider': provider}, int(breaker['state'] != 'closed')) for provider, breaker in breakers.items()])
+    ]
+
+metrics.register_collector(collect_service_metrics)
+request_seconds = metrics.histogram('http_request_seconds', 'Time to produce a response, by endpoint.',
+                                    ('endpoint', 'method', 'status'))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    # Streamed responses are timed until their first byte is ready
+    started = g.pop('request_started', None)
+    if started is not None and request.endpoint != 'metrics_endpoint':
+        request_seconds.observe(time.perf_counter() - started, endpoint=request.endpoint or 'unmatched',
+                                method=request.method, status=response.status_code)
+    return response
 
 # Helper function to check allowed file extensions
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in config.ALLOWED_EXTENSIONS
 
+# Template helper that lists responsive image sizes for an image URL, as WebP or JPEG
+@app.context_processor
+def image_helpers():
+    def image_srcset(url, fmt='webp'):
+        if url and url.startswith('https://images.unsplash.com/'):
+            # Unsplash resizes on the fly through its w and fm parameters
+            parts = urlsplit(url)
+            query = dict(parse_qsl(parts.query), fm='jpg' if fmt == 'jpeg' else fmt, q=str(config.MEDIA_VARIANT_QUALITY))
+            return ", ".join(f"{urlunsplit(parts._replace(query=urlencode(dict(query, w=str(width)))))} {width}w"
+                             for width in config.MEDIA_VARIANT_WIDTHS)
+        return media_store.srcset(url, fmt)
+    return {'image_srcset': image_srcset, 'media_variant_widths': config.MEDIA_VARIANT_WIDTHS}
+
+# Background job that runs the whole generation pipeline
+def run_generation_job(job, business_data, regenerate=False):
+    def publish_delta(section, text):
+        job.publish('delta', {'section': section, 'text': text}, stage=section)
+    
+    result = generation_pipeline.run(business_data, on_stage=job.stage_completed, on_delta=publish_delta,
+                                     use_cache=not regenerate)
+    
+    # Save the finished generation before the job reports completion
+    result_store.set(job.id, {'business_data': business_data, 'content': result['content'], 'images': result['images']})
+    return result
+
+# Background job that generates a whole batch, publishing progress after each record
+def run_batch_job(job, batch_id, input_path, output_path, lock_path):
+    def publish_record(result, stats):
+        job.publish('record', dict(stats, id=result['id'], status=result['status']))
+    
+    try:
+        return batch_runner.run(input_path, output_path, on_record=publish_record)
+    finally:
+        with batch_start_lock:
+            active_batches.pop(batch_id, None)
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+
+# Batches currently running, by batch id, so a resubmitted batch joins the running job
+active_batches = {}
+batch_start_lock = threading.Lock()
+
+# Start a batch unless one with the same id is already running, in this or another
+# server process. The process running a batch holds <batch_id>.lock, created
+# exclusively and holding the job id, so the others join that job.
+def start_batch(batch_id, body):
+    input_path = os.path.join(config.BATCH_DIR, f"{batch_id}.input.jsonl")
+    output_path = os.path.join(config.BATCH_DIR, f"{batch_id}.jsonl")
+    lock_path = os.path.join(config.BATCH_DIR, f"{batch_id}.lock")
+    
+    with batch_start_lock:
+        job = active_batches.get(batch_id)
+        if job is not None and not job.finished:
+            return job
+        
+        for _ in range(3):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                job = running_batch_job(lock_path)
+                if job is not None:
+                    return job
+                # Left behind by a process that stopped without finishing the batch
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+                continue
+            
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                with open(input_path, 'w', encoding='utf-8') as input_file:
+                    input_file.write(body)
+                job = job_manager.submit(run_batch_job, batch_id, input_path, output_path, lock_path, pool='batch')
+                f.write(job.id)
+            active_batches[batch_id] = job
+            return job
+    raise Exception(f"Could not claim batch {batch_id}")
+
+# Job named in a batch lock file, or None if that job is over or unknown
+def running_batch_job(lock_path):
+    # The claiming process writes the job id right after creating the file
+    for _ in range(20):
+        try:
+            with open(lock_path, 'r', encoding='utf-8') as f:
+                job_id = f.read().strip()
+        except OSError:
+            return None
+        if job_id:
+            job = job_manager.get(job_id)
+            return job if job is not None and not job.finished else None
+        time.sleep(0.05)
+    return None
+
+# Helper function to load the current session's generation, finished or not
+def load_generation():
+    generation_id = session.get('generation_id')
+    # Read through to disk, another worker process may have finished or updated the generation
+    record = result_store.get(generation_id, refresh=True) if generation_id else None
+    
+    if record is None:
+        return {}, [], {}, None
+    job = job_manager.get(generation_id)
+    if record['content'] is not None or job is None:
+        return record['content'] or {}, record['images'] or [], record['business_data'], job
+    
+    # Job still running, use whatever stages have finished so far
+    content = {section: job.partial[section] for section in ('description', 'email', 'social_media') if section in job.partial}
+    return content, job.partial.get('images', []), record['business_data'], job
+
 # Routes
 @app.route('/')
 def index():
@@ -73,26 +344,24 @@ def generate_content():
                 flash(f"Please fill in the {field.replace('_', ' ')} field.", "error")
                 return redirect(url_for('index'))
         
-        # Process business data
-        processed_data = business_processor.process(business_data)
+        # Users can ask for fresh text instead of cached completions
+        regenerate = request.form.get('regenerate') == 'on'
         
-        # Generate content using DeepSeek API
-        content = content_generator.generate(processed_data)
+        # Queue generation in the background and return right away
+        job = job_manager.submit(run_generation_job, business_data, regenerate, stages=GenerationPipeline.STAGES)
+        result_store.set(job.id, {'business_data': business_data, 'content': None, 'images': None})
         
-        # Store content in session immediately
-        session['generated_content'] = content
-        session['business_data'] = business_data
+        # Keep only the opaque generation id in the session cookie
+        session['generation_id'] = job.id
         
-        # Get relevant images after content is generated
-        try:
-            images = image_service.get_images(business_data['type'], business_data['style_preference'])
-            session['images'] = images
-        except Exception as e:
-            print(f"Error fetching images: {e}")
-            # Provide empty images list if image fetching fails
-            session['images'] = []
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({
+                'job_id': job.id,
+                'status_url': url_for('get_job', job_id=job.id),
+                'events_url': url_for('job_events', job_id=job.id)
+            }), 202
         
-        # Redirect to results page
+        # Redirect to results page, which fills in as the job progresses
         return redirect(url_for('results'))
     except Exception as e:
         print(f"Error generating content: {e}")
@@ -103,49 +372,101 @@ def generate_content():
 @app.route('/results')
 def results():
     # Get data from session
-    content = session.get('generated_content', {})
-    images = session.get('images', [])
-    business_data = session.get('business_data', {})
+    content, images, business_data, job = load_generation()
+    content = dict(content)
     
-    # Ensure content has the expected structure
-    if not content:
-        content = {
-            'description': {'short': '', 'medium': '', 'long': ''},
-            'email': {'welcome': {'subject': '', 'body': ''}, 'promotional': {'subject': '', 'body': ''}, 'newsletter': {'subject': '', 'body': ''}},
-            'social_media': []
-        }
-    elif not isinstance(content.get('description'), dict):
+    # Ensure content has the expected structure, including sections still being generated
+    content.setdefault('email', {'welcome': {'subject': '', 'body': ''}, 'promotional': {'subject': '', 'body': ''}, 'newsletter': {'subject': '', 'body': ''}})
+    content.setdefault('social_media', [])
+    if not isinstance(content.get('description'), dict):
         content['description'] = {'short': '', 'medium': '', 'long': ''}
     
     return render_template('results.html', 
                            content=content, 
                            images=images, 
-                           business_data=business_data)
+                           business_data=business_data,
+                           job=job if job and not job.finished else None)
 
 @app.route('/export/<content_type>')
 def export(content_type):
-    content = session.get('generated_content', {})
-    business_data = session.get('business_data', {})
-    images = session.get('images', [])
+    content, images, business_data, job = load_generation()
     
+    if job is not None and not job.finished:
+        flash("Your content is still being generated. Please try again in a moment.", "error")
+        return redirect(url_for('results'))
+    if not content:
+        return redirect(url_for('results'))
+    
+    # Every asset in one ZIP, streamed while the remaining assets are still rendering
+    if content_type == 'bundle':
+        archive = export_service.iter_bundle(content, business_data, images[0]['url'] if images else None)
+        return Response(archive, mimetype='application/zip', headers={
+            'Content-Disposition': f"attachment; filename=\"{secure_filename(business_data['name']) or 'content'}_bundle.zip\""
+        })
+    
+    # Exports are rendered once per unique input and served with their content hash as ETag
+    # (paths are made absolute because Flask resolves relative ones against the app folder, not the working directory)
     if content_type == 'email':
-        file_path = export_service.create_email_template(content['email'], business_data)
-        return send_file(file_path, as_attachment=True, download_name=f"{business_data['name']}_email.html")
+        file_path, etag = export_service.create_cached(export_service.create_email_template, content['email'], business_data)
+        return send_file(os.path.abspath(file_path), as_attachment=True, download_name=f"{business_data['name']}_email.html",
+                         conditional=True, etag=etag)
     
     elif content_type == 'social':
-        file_path = export_service.create_social_post(content['social_media'], business_data, images[0] if images else None)
-        return send_file(file_path, as_attachment=True, download_name=f"{business_data['name']}_social_post.png")
+        file_path, etag = export_service.create_cached(export_service.create_social_post, content['social_media'], business_data,
+                                                       images[0]['url'] if images else None)
+        return send_file(os.path.abspath(file_path), as_attachment=True, download_name=f"{business_data['name']}_social_post.png",
+                         conditional=True, etag=etag)
+    
+    elif content_type == 'pdf':
+        file_path, etag = export_service.create_cached(export_service.create_brand_kit, content, business_data,
+                                                       [image['url'] for image in images])
+        return send_file(os.path.abspath(file_path), as_attachment=True, download_name=f"{business_data['name']}_brand_kit.pdf",
+                         conditional=True, etag=etag)
     
     elif content_type == 'description':
-        file_path = export_service.create_business_description(content['description'], business_data)
-        return send_file(file_path, as_attachment=True, download_name=f"{business_data['name']}_description.txt")
+        file_path, etag = export_service.create_cached(export_service.create_business_description, content['description'], business_data)
+        return send_file(os.path.abspath(file_path), as_attachment=True, download_name=f"{business_data['name']}_description.txt",
+                         conditional=True, etag=etag)
     
     return redirect(url_for('results'))
 
+@app.route('/media/<media_id>')
+def media(media_id):
+    width = request.args.get('w', type=int)
+    fmt = request.args.get('fmt')
+    
+    def send_media(file_path, content_type, etag):
+        return send_file(os.path.abspath(file_path), mimetype=content_type, conditional=True, etag=etag,
+                         max_age=config.MEDIA_MAX_AGE)
+    
+    response = None
+    if width or fmt:
+        # Resized or re-encoded derivative, rendered on first use. One that is evicted between
+        # the lookup and the send is rendered again, and the original is served if that fails too.
+        for _ in range(2):
+            file_path, content_type, tag = media_store.variant(media_id, width, fmt or 'webp')
+            if file_path is None:
+                abort(404)
+            try:
+                response = send_media(file_path, content_type, f"{media_id}-{tag}")
+                break
+            except FileNotFoundError:
+                continue
+    if response is None:
+        file_path, content_type = media_store.path(media_id)
+        if file_path is None:
+            abort(404)
+        response = send_media(file_path, content_type, media_id)
+    
+    # Media ids are content hashes, so the file behind a URL never changes
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/api/content', methods=['GET'])
 def get_content():
     content_type = request.args.get('type')
-    content = session.get('generated_content', {})
+    content = load_generation()[0]
     
     if content_type in content:
         return jsonify({'content': content[content_type]})
@@ -154,9 +475,158 @@ def get_content():
 
 @app.route('/api/images', methods=['GET'])
 def get_images():
-    images = session.get('images', [])
+    images = load_generation()[1]
     return jsonify({'images': images})
 
+@app.route('/api/regenerate/<section>', methods=['POST'])
+def regenerate_section(section):
+    # description, email or social, optionally narrowed to one piece (email.welcome, social.twitter), or images
+    name, _, key = section.partition('.')
+    name = 'social_media' if name == 'social' else name
+    if name != 'images' and (name not in ContentGenerator.STRUCTURED_SECTION_KEYS or
+                             (key and key not in ContentGenerator.STRUCTURED_SECTION_KEYS[name])):
+        return jsonify({'error': 'Section not found'}), 404
+    if name == 'images' and key:
+        return jsonify({'error': 'Section not found'}), 404
+    
+    generation_id = session.get('generation_id')
+    content, images, business_data, job = load_generation()
+    if not business_data:
+        return jsonify({'error': 'No generation to update'}), 404
+    if job is not None and not job.finished:
+        return jsonify({'error': 'Content is still being generated'}), 409
+    
+    try:
+        result = generation_pipeline.regenerate(business_data, name, key or None)
+    except Exception as e:
+        print(f"Error regenerating {section}: {e}")
+        return jsonify({'error': f"Could not regenerate {section}. Please try again."}), 502
+    
+    # Merge into the stored generation, which may have changed while the new content was generated.
+    # The lock is shared with the other server processes, so concurrent regenerations all land.
+    with result_store.lock(generation_id):
+        record = result_store.get(generation_id, refresh=True)
+        if record is None:
+            return jsonify({'error': 'No generation to update'}), 404
+        if name == 'images':
+            record['images'] = result
+        else:
+            record['content'] = dict(record['content'] or {})
+            section_content = record['content'].get(name)
+            record['content'][name] = dict(section_content if isinstance(section_content, dict) else {}, **result)
+        result_store.set(generation_id, record)
+    
+    if name == 'images':
+        return jsonify({'section': section, 'images': record['images']})
+    return jsonify({'section': section, 'content': record['content'][name]})
+
+@app.route('/api/status', methods=['GET'])
+def provider_status():
+    # Circuit breaker state and traffic for every upstream provider used so far
+    breakers = http_clients.breaker_status()
+    traffic = http_clients.stats()
+    providers = {provider: dict(traffic.get(provider, {}), circuit=breaker) for provider, breaker in breakers.items()}
+    degraded = any(breaker['state'] != 'closed' for breaker in breakers.values())
+    return jsonify({'status': 'degraded' if degraded else 'ok', 'providers': providers})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    if not config.METRICS_ENABLED:
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # Resume after the last event the browser saw when it reconnects
+    since = request.headers.get('Last-Event-ID', type=int)
+    since = since + 1 if since is not None else 0
+    
+    def stream():
+        for event in job.iter_events(since=since, keepalive=config.JOB_EVENTS_KEEPALIVE):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/batch', methods=['POST'])
+def submit_batch():
+    # Accept JSONL, or a JSON array of business records
+    if request.is_json:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            return jsonify({'error': 'Expected a JSON array of business records'}), 400
+        body = "".join(json.dumps(record) + "\n" for record in records)
+    else:
+        body = "".join(line.strip() + "\n" for line in request.get_data(as_text=True).splitlines() if line.strip())
+    if not body:
+        return jsonify({'error': 'No business records submitted'}), 400
+    
+    # Identical submissions share a batch id, so resubmitting resumes an interrupted batch
+    batch_id = hashlib.sha256(body.encode('utf-8')).hexdigest()[:16]
+    job = start_batch(batch_id, body)
+    
+    return jsonify({
+        'batch_id': batch_id,
+        'job_id': job.id,
+        'status_url': url_for('get_job', job_id=job.id),
+        'events_url': url_for('job_events', job_id=job.id),
+        'results_url': url_for('batch_results', batch_id=batch_id)
+    }), 202
+
+@app.route('/api/batch/<batch_id>/results', methods=['GET'])
+def batch_results(batch_id):
+    output_path = os.path.join(config.BATCH_DIR, f"{secure_filename(batch_id)}.jsonl")
+    if not os.path.exists(output_path):
+        return jsonify({'error': 'Batch not found'}), 404
+    return send_file(os.path.abspath(output_path), mimetype='application/x-ndjson')
+
+# CLI commands
+@app.cli.command('warm-image-pool')
+@click.option('--business-type', multiple=True, help='Only fill this business type (repeatable).')
+@click.option('--style', multiple=True, help='Only fill this style preference (repeatable).')
+def warm_image_pool(business_type, style):
+    """Fill the image pool ahead of peak hours."""
+    business_types = list(business_type) or config.BUSINESS_TYPES
+    styles = list(style) or config.STYLE_PREFERENCES
+    click.echo(f"Warming image pool for {len(business_types) * len(styles)} combinations...")
+    added = image_pool.warm(business_types, styles)
+    click.echo(f"Added {added} images. {image_pool.stats()['ready']} images ready.")
+
+@app.cli.command('generate-batch')
+@click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+@click.argument('output_path', type=click.Path(dir_okay=False))
+@click.option('--workers', type=int, help='Records generated at the same time.')
+def generate_batch(input_path, output_path, workers):
+    """Generate content for every business in a JSONL file.
+
+    Results are appended to OUTPUT_PATH as JSONL. Rerunning with the same output
+    file skips records that already succeeded.
+    """
+    runner = BatchRunner(generation_pipeline, max_workers=workers) if workers else batch_runner
+    
+    def report(result, stats):
+        done = stats['total'] - stats['remaining']
+        click.echo(f"[{done}/{stats['total']}] {result['status']:<5} {result['id']}  "
+                   f"({stats['records_per_min']} records/min)")
+    
+    stats = runner.run(input_path, output_path, on_record=report)
+    click.echo(f"Done: {stats['succeeded']} succeeded, {stats['failed']} failed, {stats['skipped']} already done "
+               f"in {stats['elapsed']}s ({stats['records_per_min']} records/min).")
+
 # Error handlers
 @app.errorhandler(404)
 def page_not_found(e):
@@ -0,0 +1,79 @@
+# PDF Brand Kit Benchmark
+#
+# Measures how long ExportService takes to build a multi-page PDF brand kit with images.
+# The first kit prepares and caches the downsampled images; later kits reuse them.
+#
+# Usage:
+#     python benchmarks/brand_kit_pdf.py [--kits 50] [--source-size 3000]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.export_service import ExportService
+from modules.media_store import MediaStore
+from social_post_render import make_source_jpeg
+
+BUSINESS_DATA = {
+    "name": "Crumb & Co.",
+    "type": "Bakery",
+    "location": "Portland, OR",
+    "target_audience": "Local families and commuters",
+    "style_preference": "Warm and rustic"
+}
+
+PARAGRAPH = ("Crumb & Co. bakes naturally leavened bread, seasonal pastries and celebration cakes every "
+             "morning from locally milled flour, and serves the neighborhood's favorite coffee alongside. ")
+
+CONTENT = {
+    "description": {"short": PARAGRAPH, "medium": PARAGRAPH * 3, "long": PARAGRAPH * 8},
+    "email": {
+        email_type: {"subject": f"{email_type.capitalize()} from Crumb & Co.", "greeting": "Hi there,",
+                     "body": PARAGRAPH * 4, "cta": "Order Ahead", "sign_off": "Warmly,"}
+        for email_type in ("welcome", "promotional", "newsletter")
+    },
+    "social_media": {
+        platform: [f"{PARAGRAPH}#bakery #local — post {number}" for number in range(1, 4)]
+        for platform in ("facebook", "twitter", "instagram")
+    }
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF brand kit export")
+    parser.add_argument("--kits", type=int, default=50, help="Brand kits to build")
+    parser.add_argument("--source-size", type=int, default=3000, help="Width of each source image in pixels")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as media_dir:
+        media_store = MediaStore(root=media_dir, variant_root=os.path.join(media_dir, "variants"))
+        image_urls = [media_store.url(media_store.put(make_source_jpeg(args.source_size + offset, args.source_size * 2 // 3),
+                                                      "image/jpeg"))
+                      for offset in range(3)]
+        service = ExportService(media_store=media_store)
+        service.pdf_image_dir = os.path.join(media_dir, "pdf_images")
+        os.makedirs(service.pdf_image_dir)
+
+        paths = []
+        start = time.perf_counter()
+        paths.append(service.create_brand_kit(CONTENT, BUSINESS_DATA, image_urls))
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.kits):
+            paths.append(service.create_brand_kit(CONTENT, BUSINESS_DATA, image_urls))
+        elapsed = time.perf_counter() - start
+
+        size = os.path.getsize(paths[-1])
+        # Kits finished within the same second share a file name
+        for path in set(paths):
+            os.remove(path)
+
+    print(f"first kit (images prepared)  {first * 1000:8.1f} ms")
+    print(f"later kits                   {elapsed / args.kits * 1000:8.1f} ms each  ({args.kits / elapsed:.1f} kits/sec, {size // 1024} KB)")
+
+if __name__ == "__main__":
+    main()
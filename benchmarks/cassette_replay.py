@@ -0,0 +1,125 @@
+# Cassette Record and Replay Benchmark
+#
+# Records the upstream traffic of a set of generations into cassettes, or replays it
+# offline, and reports generation latency and how often model output parsed. Saving
+# the summary of one build and passing it as --baseline to the next shows the
+# difference in latency and parse success with no live dependency.
+#
+# Replayed requests are matched to recorded ones by method, URL and body, falling back
+# to any recording of the same endpoint, so prompt changes between builds still replay.
+#
+# Usage:
+#     python benchmarks/cassette_replay.py record --input businesses.jsonl --cassettes cassettes/
+#     python benchmarks/cassette_replay.py replay --input businesses.jsonl --cassettes cassettes/
+#                                         [--speed 1.0] [--output summary.json] [--baseline previous.json]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import percentile
+
+def load_businesses(input_path):
+    """
+    Read business records from a JSONL file in the generate-batch format.
+    """
+    from modules.batch_runner import BatchRunner
+    with open(input_path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [{field: record[field] for field in BatchRunner.REQUIRED_FIELDS} for record in records]
+
+def metric_totals(metrics, name, suffix):
+    """
+    Sum one sample type, e.g. '_count' or '_total', over every label set of a metric.
+    """
+    metric = metrics.histogram(name, "") if suffix in ("_sum", "_count") else metrics.counter(name, "")
+    return sum(value for sample_suffix, _, value in metric.samples() if sample_suffix == suffix)
+
+def start_app(mode, cassette_dir, speed):
+    """
+    Import the app with the cassette mode set, response caching and the image pool
+    off so every generation reaches the (recorded) providers, and storage in a
+    temporary directory.
+    """
+    import config
+    config.HTTP_CASSETTE_MODE = mode
+    config.HTTP_CASSETTE_DIR = cassette_dir
+    config.HTTP_REPLAY_SPEED = speed
+    config.LLM_CACHE_ENABLED = False
+    config.IMAGE_POOL_ENABLED = False
+    if mode == "replay":
+        # Recorded responses already carry the providers' pacing
+        config.HTTP_RATE_LIMITS = {}
+
+    os.chdir(tempfile.mkdtemp(prefix="cassette-replay-"))
+    import app as application
+    return application
+
+def summarize(application, durations, businesses):
+    sections = len(businesses) * 3
+    metrics = application.metrics
+    fallbacks = metric_totals(metrics, "content_fallbacks", "_total")
+    repairs = metric_totals(metrics, "content_repairs", "_total")
+    requests_made = metric_totals(metrics, "content_request_seconds", "_count")
+    durations = sorted(durations)
+    traffic = application.http_clients.stats()
+    return {
+        "generations": len(businesses),
+        "generation_p50": round(percentile(durations, 0.5), 3),
+        "generation_p95": round(percentile(durations, 0.95), 3),
+        "generation_p99": round(percentile(durations, 0.99), 3),
+        "first_token_mean": round(metric_totals(metrics, "content_first_token_seconds", "_sum") / requests_made, 3)
+        if requests_made else 0.0,
+        "content_request_mean": round(metric_totals(metrics, "content_request_seconds", "_sum") / requests_made, 3)
+        if requests_made else 0.0,
+        "content_requests": int(requests_made),
+        "parsed_first_time": round(1 - (fallbacks + repairs) / sections, 3) if sections else 0.0,
+        "parse_success": round(1 - fallbacks / sections, 3) if sections else 0.0,
+        "upstream_errors": sum(stats["errors"] for stats in traffic.values())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay upstream traffic and compare builds")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--input", required=True, help="JSONL file of businesses, as for generate-batch")
+    parser.add_argument("--cassettes", required=True, help="Directory holding one cassette per provider")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay timing factor, 0 replays without delays")
+    parser.add_argument("--workers", type=int, default=4, help="Generations run at the same time")
+    parser.add_argument("--output", help="Write the summary to this JSON file")
+    parser.add_argument("--baseline", help="Summary JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    businesses = load_businesses(args.input)
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    application = start_app(args.mode, os.path.abspath(args.cassettes), args.speed)
+
+    def generate(business_data):
+        started = time.perf_counter()
+        application.generation_pipeline.run(business_data)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        durations = list(executor.map(generate, businesses))
+
+    summary = summarize(application, durations, businesses)
+    for name, value in summary.items():
+        line = f"{name:<22} {value:>10}"
+        if baseline and isinstance(baseline.get(name), (int, float)):
+            line += f"   baseline {baseline[name]:>10}   change {value - baseline[name]:+.3f}"
+        print(line)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# End-to-End Load Benchmark
+#
+# Drives /generate, the job event stream, /results and /export/* with concurrent
+# simulated users and reports throughput and p50/p95/p99 latency per endpoint.
+#
+# By default the app runs in this process against the local stand-ins from
+# mock_upstreams.py, with its storage in a temporary directory and the client-side
+# rate limits lifted so the app itself is measured, not the provider quotas. Use
+# --target to load an app that is already running (pointed at mock upstreams).
+#
+# Exits with status 1 when --max-p95 or --max-error-rate is exceeded, so it can gate
+# a deploy.
+#
+# Usage:
+#     python benchmarks/load_test.py [--users 8] [--generations 40] [--exports description,email,social,pdf]
+#                                    [--latency-scale 1.0] [--error-rate 0.0] [--rate-limit-rate 0.0]
+#                                    [--max-p95 SECONDS] [--max-error-rate 0.01] [--target URL]
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mock_upstreams
+
+BUSINESS_TYPES = ["Restaurant", "Cafe", "Bakery", "Salon", "Gym"]
+STYLES = ["Modern", "Rustic", "Minimalist", "Vibrant"]
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+class Recorder:
+    """
+    Collects latency samples and errors per endpoint from every simulated user.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def timed(self, endpoint, call):
+        """
+        Time one request, counting exceptions and non-2xx responses as errors.
+        """
+        started = time.perf_counter()
+        try:
+            response = call()
+        except requests.RequestException as e:
+            self.record(endpoint, time.perf_counter() - started, False)
+            print(f"Error requesting {endpoint}: {e}")
+            return None
+        self.record(endpoint, time.perf_counter() - started, response.ok)
+        return response
+
+def run_user(base_url, number, exports, recorder):
+    """
+    One simulated user: submit the form, follow the job until it finishes, view the
+    results page and download each export.
+
+    Returns:
+        requests.Session: The user's session, holding its generation, or None if the form was rejected
+    """
+    session = requests.Session()
+    form = {
+        "business_name": f"Load Test Business {number}",
+        "business_type": BUSINESS_TYPES[number % len(BUSINESS_TYPES)],
+        "business_description": f"Neighborhood business number {number}, open every day.",
+        "business_location": "Portland, OR",
+        "target_audience": "Local families and commuters",
+        "style_preference": STYLES[number % len(STYLES)]
+    }
+
+    started = time.perf_counter()
+    response = recorder.timed("POST /generate", lambda: session.post(
+        f"{base_url}/generate", data=form, headers={"Accept": "application/json"}))
+    if response is None or response.status_code != 202:
+        recorder.record("generation", time.perf_counter() - started, False)
+        return None
+
+    # Follow the job's event stream until it reports the outcome
+    events_url = base_url + response.json()["events_url"]
+    outcome = None
+    try:
+        with session.get(events_url, stream=True, timeout=300) as stream:
+            for line in stream.iter_lines():
+                if line.startswith(b"event: ") and line[7:] in (b"completed", b"failed"):
+                    outcome = line[7:].decode()
+                    break
+    except requests.RequestException as e:
+        print(f"Error following job events: {e}")
+    recorder.record("generation", time.perf_counter() - started, outcome == "completed")
+
+    recorder.timed("GET /results", lambda: session.get(f"{base_url}/results"))
+    for export in exports:
+        recorder.timed(f"GET /export/{export}", lambda: session.get(f"{base_url}/export/{export}"))
+    return session
+
+def start_local_app(upstreams, keep_rate_limits):
+    """
+    Import the app pointed at the mock upstreams and serve it on a free local port.
+
+    Returns:
+        str: Base URL of the running app
+    """
+    import config
+    for name, url in upstreams.config_overrides().items():
+        setattr(config, name, url)
+    if not keep_rate_limits:
+        config.HTTP_RATE_LIMITS = {}
+
+    # Storage, caches and exports use relative paths, keep them out of the working tree
+    os.chdir(tempfile.mkdtemp(prefix="load-test-"))
+
+    from werkzeug.serving import make_server
+    import app as application
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, application.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True, name="load-test-app").start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark against mock upstreams")
+    parser.add_argument("--users", type=int, default=8, help="Simulated users running at the same time")
+    parser.add_argument("--generations", type=int, default=40, help="Form submissions in total")
+    parser.add_argument("--exports", default="description,email,social,pdf",
+                        help="Comma-separated exports each user downloads")
+    parser.add_argument("--target", help="Base URL of an already running app instead of starting one")
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="Keep the client-side provider rate limits from config.py")
+    parser.add_argument("--max-p95", type=float, help="Fail if the p95 generation time exceeds this many seconds")
+    parser.add_argument("--max-error-rate", type=float, help="Fail if more than this fraction of requests fail")
+    mock_upstreams.add_arguments(parser)
+    args = parser.parse_args()
+
+    upstreams = None
+    base_url = args.target
+    if base_url is None:
+        upstreams = mock_upstreams.from_arguments(args).start()
+        base_url = start_local_app(upstreams, args.keep_rate_limits)
+    base_url = base_url.rstrip("/")
+    exports = [export for export in args.exports.split(",") if export]
+
+    recorder = Recorder()
+    numbers = itertools.count()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        for future in [executor.submit(run_user, base_url, next(numbers), exports, recorder)
+                       for _ in range(args.generations)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    requests_made = sum(len(samples) for endpoint, samples in recorder.samples.items() if endpoint != "generation")
+    print(f"{args.generations} generations by {args.users} users in {elapsed:.1f}s: "
+          f"{args.generations / elapsed * 60:.1f} generations/min, {requests_made / elapsed:.1f} requests/sec")
+    print(f"{'endpoint':<26} {'count':>6} {'errors':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for endpoint, samples in recorder.samples.items():
+        samples = sorted(samples)
+        print(f"{endpoint:<26} {len(samples):>6} {recorder.errors.get(endpoint, 0):>6} "
+              f"{percentile(samples, 0.5):>7.3f}s {percentile(samples, 0.95):>7.3f}s "
+              f"{percentile(samples, 0.99):>7.3f}s {samples[-1]:>7.3f}s")
+
+    if upstreams is not None:
+        print("upstream responses: " + json.dumps(upstreams.stats(), sort_keys=True))
+
+    failed = []
+    generation_p95 = percentile(sorted(recorder.samples.get("generation", [])), 0.95)
+    if args.max_p95 is not None and generation_p95 > args.max_p95:
+        failed.append(f"p95 generation time {generation_p95:.2f}s exceeds {args.max_p95}s")
+    # Generations that ended without content count as failed requests too
+    total = sum(len(samples) for samples in recorder.samples.values())
+    error_rate = sum(recorder.errors.values()) / total if total else 0.0
+    if args.max_error_rate is not None and error_rate > args.max_error_rate:
+        failed.append(f"error rate {error_rate:.3f} exceeds {args.max_error_rate}")
+    for message in failed:
+        print(f"FAILED: {message}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+# Mock Upstream Servers
+#
+# Local stand-ins for every upstream API the app calls, speaking the same protocols:
+# the OpenAI-compatible streaming chat endpoint (NVIDIA), Stability AI's artifact JSON,
+# Bria2.3's data.output, Unsplash search and TinyCloud /files. Each provider has its own
+# latency, jitter, error rate and 429 injection, so load tests burn no real quota.
+#
+# Used by benchmarks/load_test.py, or run on its own and point the *_API_URL settings
+# in config.py at the URLs it prints.
+#
+# Usage:
+#     python benchmarks/mock_upstreams.py [--port 9100] [--latency-scale 1.0] [--error-rate 0.0] [--rate-limit-rate 0.0]
+
+import argparse
+import base64
+import io
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from PIL import Image
+
+# Latency and failure injection per provider. Latency is the time to the first byte
+# (time to first token for chat), jitter is added or removed uniformly at random.
+DEFAULT_PROFILES = {
+    "nvidia": {"latency": 0.6, "jitter": 0.3, "error_rate": 0.0, "rate_limit_rate": 0.0,
+               "chunk_interval": 0.01, "chunk_words": 4},
+    "stability": {"latency": 3.0, "jitter": 1.0, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "bria": {"latency": 2.5, "jitter": 1.0, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "unsplash": {"latency": 0.25, "jitter": 0.1, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "tinycloud": {"latency": 0.1, "jitter": 0.05, "error_rate": 0.0, "rate_limit_rate": 0.0}
+}
+
+# Seconds clients are asked to wait in injected 429 responses
+RETRY_AFTER = 1
+
+WORDS = ("fresh local seasonal community friendly crafted quality welcoming neighborhood favorite "
+         "handmade daily warm trusted family owned signature experience visit today special offer").split()
+
+def filler(word_count, rng):
+    """
+    Build marketing-like filler text of roughly the given number of words.
+    """
+    words = [rng.choice(WORDS) for _ in range(max(word_count, 1))]
+    return " ".join(words).capitalize() + "."
+
+def fill_skeleton(value, rng):
+    """
+    Replace the placeholder strings of a JSON skeleton from a prompt with filler text,
+    sized after hints like "50-word description".
+    """
+    if isinstance(value, dict):
+        return {key: fill_skeleton(item, rng) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill_skeleton(item, rng) for item in value]
+    match = re.match(r'(\d+)-word', str(value))
+    if match:
+        return filler(int(match.group(1)), rng)
+    return filler(25 if value == "post" else 15, rng)
+
+def completion_text(prompt, rng):
+    """
+    Answer a prompt the way the model would: a JSON document when the prompt asks for
+    one, numbered sections otherwise.
+    """
+    marker = "with no other text:"
+    if marker in prompt:
+        try:
+            skeleton, _ = json.JSONDecoder().raw_decode(prompt.split(marker, 1)[1].strip())
+            return json.dumps(fill_skeleton(skeleton, rng), indent=2)
+        except ValueError:
+            pass
+    return "\n\n".join(f"{number}. {label}: {filler(words, rng)}"
+                       for number, (label, words) in enumerate((("Short", 50), ("Medium", 150), ("Long", 300)), 1))
+
+def make_images(count=8, size=256):
+    """
+    Build a few distinct PNG and JPEG images to hand out as generated and stock photos.
+    """
+    pngs, jpegs = [], []
+    for index in range(count):
+        hue = Image.linear_gradient('L').resize((size, size)).rotate(index * 45)
+        img = Image.merge('RGB', (hue, hue.transpose(Image.FLIP_TOP_BOTTOM), Image.new('L', (size, size), index * 30)))
+        for fmt, target in (('PNG', pngs), ('JPEG', jpegs)):
+            buffer = io.BytesIO()
+            img.save(buffer, fmt)
+            target.append(buffer.getvalue())
+    return pngs, jpegs
+
+class MockUpstreams:
+    """
+    One threaded HTTP server serving every provider under its own path prefix.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, profiles=None, latency_scale=1.0, seed=None):
+        """
+        Initialize the mock servers.
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on, 0 for any free port
+            profiles (dict, optional): Per-provider overrides of DEFAULT_PROFILES
+            latency_scale (float): Factor applied to every latency, jitter and chunk interval
+            seed (int, optional): Seed for reproducible jitter, failures and text
+        """
+        self.profiles = {provider: dict(profile) for provider, profile in DEFAULT_PROFILES.items()}
+        for provider, overrides in (profiles or {}).items():
+            self.profiles[provider].update(overrides)
+        for profile in self.profiles.values():
+            for key in ("latency", "jitter", "chunk_interval"):
+                if key in profile:
+                    profile[key] *= latency_scale
+
+        self.rng = random.Random(seed)
+        self.pngs, self.jpegs = make_images()
+        self.files = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+
+        self.server = _Server((host, port), _Handler)
+        self.server.upstreams = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def config_overrides(self):
+        """
+        Settings that point the app at these servers.
+
+        Returns:
+            dict: config.py setting name to URL
+        """
+        return {
+            "NVIDIA_API_URL": f"{self.base_url}/nvidia/v1",
+            "STABILITY_API_URL": f"{self.base_url}/stability/v1/generation/text-to-image",
+            "BRIA_API_URL": f"{self.base_url}/bria/generate",
+            "UNSPLASH_API_URL": f"{self.base_url}/unsplash/search/photos",
+            "TINYCLOUD_API_URL": f"{self.base_url}/tinycloud/v1"
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True, name="mock-upstreams")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def stats(self):
+        """
+        Requests answered per provider and status code.
+
+        Returns:
+            dict: Provider to {status code: count}
+        """
+        with self._lock:
+            return {provider: dict(statuses) for provider, statuses in self.counts.items()}
+
+    def count(self, provider, status):
+        with self._lock:
+            statuses = self.counts.setdefault(provider, {})
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def roll(self):
+        with self._lock:
+            return self.rng.random()
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping pooled connections or abandoned races are expected under load
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        upstreams = self.server.upstreams
+        parts = urlsplit(self.path)
+        provider, _, route = parts.path.lstrip("/").partition("/")
+        profile = upstreams.profiles.get(provider)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if profile is None:
+            return self._send_json(provider, 404, {"error": "unknown provider"})
+
+        # Stock photo downloads are served like a CDN, without injected failures
+        if provider == "unsplash" and route.startswith("photos/"):
+            index = int(re.sub(r"\D", "", route) or 0) % len(upstreams.jpegs)
+            return self._send(provider, 200, upstreams.jpegs[index], "image/jpeg")
+
+        delay = max(profile["latency"] + (upstreams.roll() * 2 - 1) * profile["jitter"], 0)
+        time.sleep(delay)
+        roll = upstreams.roll()
+        if roll < profile["rate_limit_rate"]:
+            return self._send_json(provider, 429, {"error": "rate limit exceeded"}, {"Retry-After": str(RETRY_AFTER)})
+        if roll < profile["rate_limit_rate"] + profile["error_rate"]:
+            return self._send_json(provider, 500, {"error": "injected failure"})
+
+        payload = json.loads(body) if body else {}
+        if provider == "nvidia":
+            return self._stream_chat(payload, profile)
+        if provider == "stability":
+            samples = payload.get("samples", 1)
+            artifacts = [{"base64": base64.b64encode(upstreams.pngs[seed % len(upstreams.pngs)]).decode("ascii"),
+                          "seed": seed, "finishReason": "SUCCESS"}
+                         for seed in (int(upstreams.roll() * 1e9) for _ in range(samples))]
+            return self._send_json(provider, 200, {"artifacts": artifacts})
+        if provider == "bria":
+            output = [{"image": "data:image/png;base64," +
+                       base64.b64encode(upstreams.pngs[int(upstreams.roll() * len(upstreams.pngs))]).decode("ascii")}
+                      for _ in range(payload.get("num_images", 1))]
+            return self._send_json(provider, 200, {"data": {"output": output}})
+        if provider == "unsplash":
+            per_page = int(parse_qs(parts.query).get("per_page", ["3"])[0])
+            results = [{"urls": {"regular": f"{upstreams.base_url}/unsplash/photos/{int(upstreams.roll() * 1000)}.jpg"},
+                        "user": {"name": "Mock Photographer", "links": {"html": f"{upstreams.base_url}/unsplash"}}}
+                       for _ in range(per_page)]
+            return self._send_json(provider, 200, {"results": results})
+        return self._tinycloud(method, route, payload)
+
+    def _stream_chat(self, payload, profile):
+        upstreams = self.server.upstreams
+        rng = random.Random(upstreams.roll())
+        prompt = payload.get("messages", [{}])[-1].get("content", "")
+        words = re.findall(r"\S+\s*", completion_text(prompt, rng))
+
+        upstreams.count("nvidia", 200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(words), profile["chunk_words"]):
+            if start:
+                time.sleep(profile["chunk_interval"])
+            delta = "".join(words[start:start + profile["chunk_words"]])
+            self._write_chunk(f"data: {json.dumps({'choices': [{'delta': {'content': delta}}]})}\n\n".encode())
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _tinycloud(self, method, route, payload):
+        upstreams = self.server.upstreams
+        file_id = route.rsplit("/", 1)[-1] if route.startswith("v1/files/") else None
+        if method == "POST" and file_id is None:
+            file_id = uuid.uuid4().hex
+            upstreams.files[file_id] = base64.b64decode(payload.get("file_data", ""))
+            return self._send_json("tinycloud", 201, {"file_url": f"{upstreams.base_url}/tinycloud/v1/files/{file_id}"})
+        if file_id not in upstreams.files:
+            return self._send_json("tinycloud", 404, {"error": "file not found"})
+        if method == "DELETE":
+            del upstreams.files[file_id]
+            return self._send("tinycloud", 204, b"", "application/json")
+        return self._send("tinycloud", 200, upstreams.files[file_id], "application/octet-stream")
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, provider, status, data, headers=None):
+        self._send(provider, status, json.dumps(data).encode(), "application/json", headers)
+
+    def _send(self, provider, status, data, content_type, headers=None):
+        self.server.upstreams.count(provider, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+def add_arguments(parser):
+    """
+    Add the mock server options shared with load_test.py.
+    """
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Factor applied to every provider latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream calls answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of upstream calls answered with a 429")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible jitter, failures and text")
+
+def from_arguments(args, port=0):
+    """
+    Build MockUpstreams from parsed add_arguments() options.
+    """
+    profiles = {provider: {"error_rate": args.error_rate, "rate_limit_rate": args.rate_limit_rate}
+                for provider in DEFAULT_PROFILES}
+    return MockUpstreams(port=port, profiles=profiles, latency_scale=args.latency_scale, seed=args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve local stand-ins for the upstream APIs")
+    parser.add_argument("--port", type=int, default=9100, help="Port to listen on")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    upstreams = from_arguments(args, port=args.port)
+    print("Mock upstreams running. Point config.py at them with:")
+    for name, url in upstreams.config_overrides().items():
+        print(f'{name} = "{url}"')
+    try:
+        upstreams.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        upstreams.server.server_close()
+
+if __name__ == "__main__":
+    main()
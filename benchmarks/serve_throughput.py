@@ -0,0 +1,245 @@
+# Serving Throughput Benchmark
+#
+# Compares requests/sec of the development server (app.run as `python app.py` starts
+# it, without the reloader) with the production server (gunicorn with gunicorn.conf.py).
+# Each server runs in its own process against the local stand-ins from
+# mock_upstreams.py, with its storage in a temporary directory and the client-side
+# rate limits lifted.
+#
+# Simulated users first create a few generations, then request the results page, the
+# content API, cached exports and resized media as fast as they can for a fixed time.
+# Clients run in several processes so the load generator is not the bottleneck. The
+# time each server takes to stop after SIGTERM is reported too.
+#
+# Usage:
+#     python benchmarks/serve_throughput.py [--servers dev,gunicorn] [--duration 20] [--clients 32]
+#                                           [--client-processes 4] [--sessions 8] [--workers N] [--threads N]
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mock_upstreams
+from load_test import percentile, Recorder, run_user
+
+GUNICORN_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+def serve(server, port, overrides, storage, workers=None, threads=None):
+    """
+    Run one server in this process until it is stopped. Called in the child process
+    started by start_server().
+    """
+    import config
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    config.HTTP_RATE_LIMITS = {}
+    os.chdir(storage)
+
+    if server == "dev":
+        import app
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        app.app.run(host="127.0.0.1", port=port, debug=config.DEBUG, use_reloader=False)
+        return
+
+    from gunicorn.app.wsgiapp import WSGIApplication
+    sys.argv = ["gunicorn", "--config", GUNICORN_CONFIG, "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    if workers:
+        sys.argv += ["--workers", str(workers)]
+    if threads:
+        sys.argv += ["--threads", str(threads)]
+    WSGIApplication("%(prog)s [OPTIONS] [APP_MODULE]").run()
+
+def start_server(server, upstreams, args):
+    """
+    Start a server in a child process and wait until it answers.
+
+    Returns:
+        tuple: (subprocess.Popen, base URL)
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    command = [sys.executable, os.path.abspath(__file__), "--serve", server, "--port", str(port),
+               "--overrides", json.dumps(upstreams.config_overrides()),
+               "--storage", tempfile.mkdtemp(prefix=f"serve-{server}-")]
+    if args.workers:
+        command += ["--workers", str(args.workers)]
+    if args.threads:
+        command += ["--threads", str(args.threads)]
+    process = subprocess.Popen(command)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} server exited with status {process.returncode}")
+        try:
+            requests.get(base_url + "/", timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{server} server did not start within 60s")
+
+def stop_server(process):
+    """
+    Send SIGTERM and wait for the server to exit.
+
+    Returns:
+        float: Seconds the server took to stop
+    """
+    started = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=300)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    return time.perf_counter() - started
+
+def seed_sessions(base_url, count):
+    """
+    Create generations through the real form and job flow.
+
+    Returns:
+        list: (cookies, paths) for every user whose generation completed, where paths
+        are the URLs that user requests during the measurement
+    """
+    recorder = Recorder()
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        sessions = list(executor.map(lambda number: run_user(base_url, number, [], recorder), range(count)))
+
+    seeded = []
+    for session in sessions:
+        if session is None:
+            continue
+        paths = ["/results", "/api/content?type=description", "/export/description", "/export/social"]
+        images = session.get(f"{base_url}/api/images").json()["images"]
+        if images and images[0]["url"].startswith("/media/"):
+            paths.append(images[0]["url"] + "?w=320&fmt=webp")
+        seeded.append((session.cookies.get_dict(), paths))
+    return seeded
+
+def hammer(base_url, sessions, clients, duration):
+    """
+    Request the seeded paths from `clients` threads for `duration` seconds. Runs in a
+    client process.
+
+    Returns:
+        tuple: (latency samples by endpoint, error counts by endpoint)
+    """
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+
+    def client(number):
+        cookies, paths = sessions[number % len(sessions)]
+        session = requests.Session()
+        session.cookies.update(cookies)
+        index = number
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            endpoint = "GET " + path.split("?")[0] if not path.startswith("/media/") else "GET /media (320w webp)"
+            recorder.timed(endpoint, lambda: session.get(base_url + path))
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.samples, recorder.errors
+
+def measure(server, upstreams, args):
+    process, base_url = start_server(server, upstreams, args)
+    try:
+        sessions = seed_sessions(base_url, args.sessions)
+        if not sessions:
+            raise RuntimeError(f"No generation completed on the {server} server")
+
+        per_process = max(1, args.clients // args.client_processes)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.client_processes) as executor:
+            results = list(executor.map(hammer, [base_url] * args.client_processes,
+                                        [sessions] * args.client_processes,
+                                        [per_process] * args.client_processes,
+                                        [args.duration] * args.client_processes))
+        elapsed = time.perf_counter() - started
+    finally:
+        stopped_in = stop_server(process)
+
+    samples, errors = {}, {}
+    for process_samples, process_errors in results:
+        for endpoint, values in process_samples.items():
+            samples.setdefault(endpoint, []).extend(values)
+        for endpoint, count in process_errors.items():
+            errors[endpoint] = errors.get(endpoint, 0) + count
+    return {"samples": samples, "errors": errors, "elapsed": elapsed, "stopped_in": stopped_in}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare requests/sec of the development and production servers")
+    parser.add_argument("--servers", default="dev,gunicorn", help="Comma-separated servers to measure: dev, gunicorn")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of load per server")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients in total")
+    parser.add_argument("--client-processes", type=int, default=4, help="Processes the clients are spread over")
+    parser.add_argument("--sessions", type=int, default=8, help="Generations created before the measurement")
+    parser.add_argument("--workers", type=int, help="Override SERVE_WORKERS for gunicorn")
+    parser.add_argument("--threads", type=int, help="Override SERVE_THREADS for gunicorn")
+    # Used by start_server() to run a server in a child process
+    parser.add_argument("--serve", choices=["dev", "gunicorn"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--overrides", help=argparse.SUPPRESS)
+    parser.add_argument("--storage", help=argparse.SUPPRESS)
+    mock_upstreams.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, json.loads(args.overrides), args.storage, args.workers, args.threads)
+        return
+
+    upstreams = mock_upstreams.from_arguments(args).start()
+    reports = {}
+    try:
+        for server in [server for server in args.servers.split(",") if server]:
+            print(f"Measuring {server} server...")
+            reports[server] = measure(server, upstreams, args)
+    finally:
+        upstreams.stop()
+
+    print(f"{'server':<10} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'stop':>7}")
+    for server, report in reports.items():
+        values = sorted(value for samples in report["samples"].values() for value in samples)
+        print(f"{server:<10} {len(values):>9} {len(values) / report['elapsed']:>8.1f} "
+              f"{sum(report['errors'].values()):>7} {percentile(values, 0.5):>7.3f}s "
+              f"{percentile(values, 0.95):>7.3f}s {percentile(values, 0.99):>7.3f}s {report['stopped_in']:>6.1f}s")
+
+    for server, report in reports.items():
+        print(f"\n{server}")
+        for endpoint, samples in sorted(report["samples"].items()):
+            samples = sorted(samples)
+            print(f"  {endpoint:<34} {len(samples) / report['elapsed']:>8.1f} req/s "
+                  f"{report['errors'].get(endpoint, 0):>5} errors  p50 {percentile(samples, 0.5):.3f}s  "
+                  f"p95 {percentile(samples, 0.95):.3f}s")
+
+    if "dev" in reports and len(reports) > 1:
+        baseline = sum(len(samples) for samples in reports["dev"]["samples"].values()) / reports["dev"]["elapsed"]
+        for server, report in reports.items():
+            if server != "dev" and baseline:
+                rate = sum(len(samples) for samples in report["samples"].values()) / report["elapsed"]
+                print(f"\n{server}: {rate / baseline:.2f}x the requests/sec of the dev server")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Social Post Render Benchmark
+#
+# Measures how many 1080x1080 social post images ExportService renders per second.
+#
+# Usage:
+#     python benchmarks/social_post_render.py [--renders 50] [--source-size 3000]
+
+import argparse
+import io
+import os
+import sys
+import time
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.export_service import ExportService, _fill_square
+
+POST_TEXT = ("Fresh sourdough is out of the oven! Come by this weekend for warm loaves, "
+             "seasonal pastries and the best coffee in town. #bakery #local")
+
+def make_source_jpeg(width, height):
+    """
+    Build an in-memory JPEG photo stand-in, larger than the post like real camera images.
+    """
+    column = Image.linear_gradient('L').resize((width, height))
+    img = Image.merge('RGB', (column, column.transpose(Image.FLIP_TOP_BOTTOM), column.rotate(90, expand=False)))
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+def measure(label, renders, render):
+    render()  # Warm up caches so steady-state throughput is reported
+    start = time.perf_counter()
+    for _ in range(renders):
+        render()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {renders / elapsed:8.1f} renders/sec  ({elapsed / renders * 1000:.1f} ms each)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark social post rendering")
+    parser.add_argument("--renders", type=int, default=50, help="Renders per scenario")
+    parser.add_argument("--source-size", type=int, default=3000, help="Width of the background photo in pixels")
+    args = parser.parse_args()
+
+    service = ExportService()
+    source = make_source_jpeg(args.source_size, args.source_size * 2 // 3)
+
+    measure("gradient background", args.renders,
+            lambda: service.render_social_post(POST_TEXT, "Crumb & Co."))
+    measure("photo background", args.renders,
+            lambda: service.render_social_post(POST_TEXT, "Crumb & Co.",
+                                               _fill_square(Image.open(io.BytesIO(source)), 1080)))
+    measure("photo background + PNG", args.renders,
+            lambda: service.render_social_post(POST_TEXT, "Crumb & Co.",
+                                               _fill_square(Image.open(io.BytesIO(source)), 1080)).save(io.BytesIO(), 'PNG'))
+
+if __name__ == "__main__":
+    main()
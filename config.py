@@ -13,10 +13,58 @@ TINYCLOUD_API_KEY = "cvvhwn9fyklicc1qzwccmq91b2li680e3lxpa8b4wyacqgj8"
 UNSPLASH_API_KEY = "czgKy4fWZ1XC9gT_WPdkoVXE9zoc_U57whxMb5O1AK8"
 UNSPLASH_SECRET_KEY = "rh4SF48lwdK4QK0pHuVWe4b0NBzaU1ma5Bt9TM5i4g0"
 
+# API Endpoints (point these at local stand-ins, e.g. benchmarks/mock_upstreams.py, for load testing)
+NVIDIA_API_URL = "https://integrate.api.nvidia.com/v1"  # OpenAI-compatible chat completions
+STABILITY_API_URL = "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image"
+BRIA_API_URL = "https://api.nvcf.nvidia.com/v2/nvcf/pexec/functions/bria"
+UNSPLASH_API_URL = "https://api.unsplash.com/search/photos"
+TINYCLOUD_API_URL = "https://api.tinycloud.com/v1"
+
 # Application Settings
 DEBUG = True
 SECRET_KEY = "your-secret-key-for-flask-sessions"
 
+# Production Server Settings (gunicorn with gunicorn.conf.py; `python app.py` runs the development server)
+SERVE_BIND = "0.0.0.0:8000"  # Address and port the server listens on
+SERVE_WORKERS = 4  # Worker processes, about one per CPU core; the provider rate limits are split between them
+SERVE_THREADS = 16  # Requests each worker handles at once; an open job event stream holds one
+SERVE_PRELOAD = True  # Import the app and warm its caches once before forking, so workers share those pages
+SERVE_MAX_REQUESTS = 1000  # Requests after which a worker is replaced, bounding memory growth
+SERVE_MAX_REQUESTS_JITTER = 100  # Random extra requests per worker so they are not all replaced at once
+SERVE_GRACEFUL_TIMEOUT = 120  # Seconds a stopping worker gives in-flight requests and background jobs to finish
+SERVE_WORKER_TIMEOUT = 150  # Seconds a worker may stop checking in, including while draining, before it is killed
+SERVE_KEEPALIVE = 5  # Seconds an idle keep-alive connection is held open
+
+# HTTP Client Settings (one keep-alive connection pool per upstream provider)
+HTTP_POOL_SIZE = 20  # Connections kept alive per provider host
+HTTP_CONNECT_TIMEOUT = 5  # Seconds allowed to establish a connection
+HTTP_READ_TIMEOUT = 60  # Seconds allowed between bytes of a response
+HTTP_PROVIDER_READ_TIMEOUTS = {  # Slower providers get a longer read timeout
+    "stability": 120,
+    "bria": 120
+}
+HTTP_RATE_LIMITS = {  # Requests per second and burst size allowed per provider, shared by every thread
+    "nvidia": (0.6, 5),
+    "stability": (1.5, 5),
+    "bria": (1, 3),
+    "unsplash": (1, 10),
+    "tinycloud": (5, 10)
+}
+HTTP_MAX_RETRIES = 3  # Retries after a 429 or 503 response
+HTTP_BACKOFF_BASE = 0.5  # First retry delay in seconds when the provider gives no Retry-After, doubled each retry
+HTTP_BACKOFF_MAX = 8  # Longest delay between retries in seconds
+HTTP_RETRY_BUDGET = 30  # Seconds a request may spend waiting for the rate limit and retrying
+HTTP_CIRCUIT_BREAKER = {  # Calls to a failing provider are skipped while its breaker is open
+    "failure_threshold": 5,  # Consecutive failures that open the breaker
+    "error_rate_threshold": 0.5,  # Failure rate over the recent calls that opens the breaker
+    "window_size": 20,  # Recent calls the error rate is measured over
+    "min_calls": 10,  # Calls needed before the error rate is used
+    "reset_timeout": 30  # Seconds before a single probe call is let through
+}
+HTTP_CASSETTE_MODE = None  # "record" saves upstream traffic to cassettes, "replay" serves it back without the network
+HTTP_CASSETTE_DIR = "storage/cassettes"  # One <provider>.jsonl cassette per provider
+HTTP_REPLAY_SPEED = 1.0  # Replay timing factor: 1 at the recorded pace, 0.5 twice as fast, 0 without delays
+
 # File Storage Settings
 UPLOAD_FOLDER = "uploads"
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
@@ -36,6 +84,53 @@ STYLE_PREFERENCES = [
     "Playful", "Professional", "Rustic", "Luxurious", "Eco-friendly"
 ]
 
+CONTENT_STRUCTURED_OUTPUT = False  # Generate every section with one JSON prompt instead of one prompt per section
+CONTENT_CONCURRENT_SECTIONS = True  # Generate description, email and social sections in parallel
+CONTENT_MAX_WORKERS = 12  # Thread pool shared by all concurrent generation requests
+CONTENT_SECTION_TIMEOUTS = {  # Per-section deadlines in seconds
+    "description": 60,
+    "email": 60,
+    "social_media": 60
+}
+
+# LLM Response Cache Settings (completions keyed on model, parameters and prompt)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_MAX_ITEMS = 1024  # Completions kept in memory
+LLM_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds a cached completion is reused
+LLM_CACHE_DIR = "storage/llm_cache"  # On-disk tier, set to None to cache in memory only
+LLM_CACHE_MAX_DISK_BYTES = 128 * 1024 * 1024  # Size above which the oldest completions are evicted
+
+GENERATE_REQUEST_TIMEOUT = 90  # Deadline in seconds for text and images in one /generate request
+PIPELINE_MAX_WORKERS = 8  # Threads used to acquire images alongside text generation
+
+# Background Job Settings
+JOB_MAX_WORKERS = 4  # Generation jobs that run at the same time
+JOB_TTL = 3600  # Seconds a finished job is kept for polling
+JOB_EVENTS_KEEPALIVE = 15  # Seconds between keepalive comments on idle event streams
+JOB_STORE_DIR = "storage/jobs"  # Job snapshots shared by server processes, set to None when serving a single process
+JOB_STORE_POLL_INTERVAL = 1  # Seconds between snapshot reads while following a job another process runs
+
+# Batch Generation Settings (JSONL in, JSONL out, via `flask --app app generate-batch` or /api/batch)
+BATCH_MAX_WORKERS = 4  # Records of a batch generated at the same time
+BATCH_MAX_JOBS = 1  # Batches run at the same time, on their own pool so they never hold /generate job slots
+BATCH_DIR = "storage/batches"  # Inputs and results of batches submitted through /api/batch
+
+# Result Store Settings (generated content is kept server-side, the session only holds its id)
+RESULT_STORE_MAX_ITEMS = 256  # Generations kept in memory
+RESULT_STORE_TTL = 24 * 60 * 60  # Seconds a generation stays available
+RESULT_STORE_DIR = "storage/results"  # On-disk tier, set to None to keep results in memory only
+RESULT_STORE_MAX_DISK_BYTES = 512 * 1024 * 1024  # Size above which the oldest results are evicted
+
+# Export Settings
+EXPORT_MAX_WORKERS = 4  # Threads rendering the assets of a /export/bundle download in parallel
+EXPORT_PDF_IMAGE_DPI = 150  # Resolution images are downsampled to at their printed size in PDF brand kits
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Size above which least recently used cached exports and PDF image copies are evicted
+EXPORT_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds a cached export is reused after it was last downloaded
+
+# Metrics Settings (stage latency, fallbacks, errors and cache hit ratios at /metrics in Prometheus text format)
+METRICS_ENABLED = True
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)  # Histogram bucket bounds in seconds
+
 # Image Service Settings
 IMAGE_CATEGORIES = {
     "Restaurant": ["restaurant", "food", "dining"],
@@ -61,4 +156,22 @@ IMAGE_CATEGORIES = {
 }
 
 DEFAULT_IMAGE_COUNT = 3
-IMAGE_QUALITY = "high"
\ No newline at end of file
+IMAGE_QUALITY = "high"
+IMAGE_RACE_ENABLED = True  # Ask Stability AI and Bria2.3 at once and keep the first images to arrive
+IMAGE_HEDGE_DELAY = 2.0  # Seconds a race waits before also asking Unsplash; tune with ImageService.stats()
+IMAGE_RACE_MAX_WORKERS = None  # Threads running raced provider calls; None allows three per generation job and pool refill running at once
+
+# Media Settings (generated images are stored once by content hash and served from /media/<hash>)
+MEDIA_DIR = "storage/media"
+MEDIA_MAX_AGE = 365 * 24 * 60 * 60  # Seconds browsers may cache a media file
+MEDIA_VARIANT_DIR = "storage/media_variants"  # Resized WebP/JPEG derivatives, e.g. /media/<hash>?w=320&fmt=webp
+MEDIA_VARIANT_WIDTHS = [160, 320, 640, 960]  # Widths offered in srcset; other requests round up to these
+MEDIA_VARIANT_MAX_BYTES = 256 * 1024 * 1024  # Size above which least recently used derivatives are evicted
+MEDIA_VARIANT_QUALITY = 80  # Encoder quality for WebP and JPEG derivatives
+
+# Image Pool Settings (ready-made images per business type and style, warm with `flask --app app warm-image-pool`)
+IMAGE_POOL_ENABLED = True
+IMAGE_POOL_DIR = "storage/image_pool"
+IMAGE_POOL_SIZE = 3  # Images kept ready per business type and style combination
+IMAGE_POOL_TTL = 7 * 24 * 60 * 60  # Seconds a pooled image may be served before it is replaced
+IMAGE_POOL_REFILL_WORKERS = 2  # Threads refilling the pool in the background
\ No newline at end of file
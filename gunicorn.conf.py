@@ -0,0 +1,65 @@
+# Gunicorn Configuration for AI-Powered Local Business Booster
+#
+# Production server: preforked worker processes with a thread pool each, tuned with
+# the SERVE_* settings in config.py. Start it from the project directory with
+#     gunicorn
+# `python app.py` still runs the single-process development server.
+
+import gc
+import sys
+import time
+
+# Not imported as `config`, which gunicorn would read as its own config setting
+import config as app_config
+
+wsgi_app = "app:app"
+bind = app_config.SERVE_BIND
+workers = app_config.SERVE_WORKERS
+worker_class = "gthread"
+threads = app_config.SERVE_THREADS
+preload_app = app_config.SERVE_PRELOAD
+max_requests = app_config.SERVE_MAX_REQUESTS
+max_requests_jitter = app_config.SERVE_MAX_REQUESTS_JITTER
+graceful_timeout = app_config.SERVE_GRACEFUL_TIMEOUT
+timeout = app_config.SERVE_WORKER_TIMEOUT
+keepalive = app_config.SERVE_KEEPALIVE
+
+# Seconds kept back from the drain so unfinished jobs are marked failed before the master kills the worker
+JOB_DRAIN_MARGIN = 5
+
+def when_ready(server):
+    # Runs in the master once the preloaded app is imported, before any worker is forked
+    if server.cfg.preload_app:
+        import app
+        app.warm_up()
+        # Keep the garbage collector from writing to, and so copying, the objects every worker inherits
+        gc.freeze()
+
+def post_fork(server, worker):
+    # Provider rate limits are enforced by each process, so every worker gets an equal
+    # share of them, using the worker count in effect after command line overrides
+    count = server.cfg.workers
+    app_config.HTTP_RATE_LIMITS = {provider: (rate / count, max(1, burst // count))
+                                   for provider, (rate, burst) in app_config.HTTP_RATE_LIMITS.items()}
+    if "app" in sys.modules:
+        sys.modules["app"].http_clients.set_rate_limits(app_config.HTTP_RATE_LIMITS)
+    
+    # Note when the master asks the worker to stop, to budget the job drain in worker_exit
+    handle_exit = worker.handle_exit
+    def note_exit(sig, frame):
+        worker.stopping_at = time.monotonic()
+        handle_exit(sig, frame)
+    worker.handle_exit = note_exit
+
+def worker_exit(server, worker):
+    # The worker has stopped serving requests; let its background generations finish too
+    stopping_at = getattr(worker, "stopping_at", None)
+    if stopping_at is not None:
+        # Stopped by the master, which kills it graceful_timeout after asking
+        budget = stopping_at + server.cfg.graceful_timeout - time.monotonic()
+    else:
+        # Recycled after max_requests: killed once silent for timeout, and draining
+        # requests may already have used up to graceful_timeout of that
+        budget = server.cfg.timeout - server.cfg.graceful_timeout
+    import app
+    app.job_manager.shutdown(timeout=max(budget - JOB_DRAIN_MARGIN, 0))
@@ -0,0 +1,174 @@
+# Batch Runner Module
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class BatchRunner:
+    """
+    Generates content for many businesses from a JSONL file, resuming interrupted runs.
+    """
+
+    # Business fields every input record must provide
+    REQUIRED_FIELDS = ["name", "type", "description", "location", "target_audience", "style_preference"]
+
+    def __init__(self, generation_pipeline, max_workers=4):
+        """
+        Initialize the BatchRunner.
+
+        Args:
+            generation_pipeline (GenerationPipeline): Pipeline that generates each record
+            max_workers (int): Records generated at the same time
+        """
+        self.generation_pipeline = generation_pipeline
+        self.max_workers = max_workers
+
+    def run(self, input_path, output_path, on_record=None):
+        """
+        Generate every record of an input file and append the results to an output file.
+
+        The output file doubles as the checkpoint: records that already have a
+        successful result in it are skipped, so rerunning an interrupted batch only
+        generates what is missing. Failed records, and partial ones where any content
+        section fell back to placeholder text, are retried on the next run.
+
+        Args:
+            input_path (str): JSONL file with one business per line
+            output_path (str): JSONL file results are appended to
+            on_record (callable, optional): Called with (result, stats) after each record
+
+        Returns:
+            dict: Final batch statistics, see stats()
+        """
+        completed = self._completed_ids(output_path)
+        records = list(self._read_records(input_path))
+        pending = [(record_id, record) for record_id, record in records if record_id not in completed]
+
+        counters = {
+            "total": len(records),
+            "skipped": len(records) - len(pending),
+            "succeeded": 0,
+            "failed": 0,
+            "started_at": time.time()
+        }
+
+        with open(output_path, 'a', encoding='utf-8') as output, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as executor:
+            # Keep a bounded number of records in flight so large inputs are not queued all at once
+            queue = iter(pending)
+            in_flight = set()
+            while True:
+                for record_id, record in queue:
+                    in_flight.add(executor.submit(self._generate, record_id, record))
+                    if len(in_flight) >= self.max_workers * 2:
+                        break
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    counters["succeeded" if result["status"] == "ok" else "failed"] += 1
+                    self._append(output, result)
+                    if on_record:
+                        on_record(result, self.stats(counters))
+
+        return self.stats(counters)
+
+    @staticmethod
+    def stats(counters):
+        """
+        Add progress and throughput figures to raw batch counters.
+
+        Args:
+            counters (dict): Counters kept by run()
+
+        Returns:
+            dict: Totals, records processed this run, elapsed seconds and records per minute
+        """
+        processed = counters["succeeded"] + counters["failed"]
+        elapsed = time.time() - counters["started_at"]
+        return {
+            "total": counters["total"],
+            "skipped": counters["skipped"],
+            "succeeded": counters["succeeded"],
+            "failed": counters["failed"],
+            "remaining": counters["total"] - counters["skipped"] - processed,
+            "elapsed": round(elapsed, 2),
+            "records_per_min": round(processed / elapsed * 60, 1) if elapsed > 0 else 0.0
+        }
+
+    def _generate(self, record_id, record):
+        """
+        Generate one record, turning any error into a failed result. A record with
+        sections that fell back to placeholder content is marked partial.
+        """
+        try:
+            missing = [field for field in self.REQUIRED_FIELDS if not record.get(field)]
+            if missing:
+                raise ValueError(f"Missing fields: {', '.join(missing)}")
+            business_data = {field: record[field] for field in self.REQUIRED_FIELDS}
+            result = self.generation_pipeline.run(business_data)
+            if result["fallbacks"]:
+                print(f"Batch record {record_id} used fallback content for: {', '.join(result['fallbacks'])}")
+                return {"id": record_id, "status": "partial", "business_data": business_data,
+                        "content": result["content"], "images": result["images"], "fallbacks": result["fallbacks"]}
+            return {"id": record_id, "status": "ok", "business_data": business_data,
+                    "content": result["content"], "images": result["images"]}
+        except Exception as e:
+            print(f"Error generating batch record {record_id}: {e}")
+            return {"id": record_id, "status": "error", "error": str(e)}
+
+    def _read_records(self, input_path):
+        """
+        Yield (record id, record) for every non-empty input line. Records without an
+        'id' are identified by a hash of their content so reruns recognize them.
+        """
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = {"_invalid": line}
+                if not isinstance(record, dict):
+                    record = {"_invalid": line}
+                record_id = str(record.get("id") or hashlib.sha256(
+                    json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()[:16])
+                yield record_id, record
+
+    def _completed_ids(self, output_path):
+        """
+        Collect the ids of records with a successful result in an existing output file,
+        dropping a partly written last line left behind by an interrupted run.
+        """
+        completed = set()
+        if not os.path.exists(output_path):
+            return completed
+
+        with open(output_path, 'rb+') as f:
+            data = f.read()
+            complete_length = data.rfind(b'\n') + 1
+            if complete_length < len(data):
+                f.truncate(complete_length)
+
+        for line in data[:complete_length].splitlines():
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get("status") == "ok":
+                completed.add(result["id"])
+        return completed
+
+    def _append(self, output, result):
+        """
+        Append one result line and force it to disk, so it survives a crash.
+        """
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        os.fsync(output.fileno())
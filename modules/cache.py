@@ -0,0 +1,243 @@
+# Cache Module
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+class TieredCache:
+    """
+    Key-value cache with an in-memory LRU tier and an optional on-disk tier.
+    """
+
+    def __init__(self, max_items=256, ttl=3600, disk_path=None, disk_max_bytes=256 * 1024 * 1024):
+        """
+        Initialize the TieredCache.
+
+        Args:
+            max_items (int): Entries kept in the in-memory LRU tier
+            ttl (int): Seconds an entry stays valid, or None to never expire
+            disk_path (str, optional): Directory for the on-disk tier; disabled if None
+            disk_max_bytes (int): Size above which the oldest disk entries are evicted
+        """
+        self.max_items = max_items
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._disk_bytes = 0
+        if self.disk_path:
+            if not os.path.exists(self.disk_path):
+                os.makedirs(self.disk_path)
+            self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    def get(self, key, refresh=False):
+        """
+        Look up an entry, promoting disk hits into memory.
+
+        Args:
+            key (str): Cache key
+            refresh (bool): Read the disk tier even if the entry is in memory, for
+                entries that other processes sharing the directory may have updated
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            entry = None if refresh and self.disk_path else self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        value = self._read_disk(key, now) if self.disk_path else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                if refresh:
+                    self._memory.pop(key, None)
+                return None
+            self.hits += 1
+            self._remember(key, value, now)
+        return value
+
+    def set(self, key, value):
+        """
+        Store an entry in memory and, if enabled, on disk.
+
+        Args:
+            key (str): Cache key
+            value: JSON-serializable value
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+        if self.disk_path:
+            self._write_disk(key, value)
+
+    def delete(self, key):
+        """
+        Remove an entry from every tier.
+
+        Args:
+            key (str): Cache key
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.disk_path:
+            self._remove_disk_file(self._disk_file(key))
+
+    @contextmanager
+    def lock(self, key, stale_after=10):
+        """
+        Hold an exclusive lock on one entry, for read-modify-write updates.
+
+        Threads of this process wait for each other. With a disk tier, other processes
+        sharing the directory are kept out by a lock file beside the entry, created
+        exclusively. A lock file older than stale_after seconds is treated as left
+        behind by a process that stopped, and is removed.
+
+        Args:
+            key (str): Cache key
+            stale_after (float): Seconds after which another holder's lock file is removed
+        """
+        with self._update_lock:
+            if not self.disk_path:
+                yield
+                return
+
+            lock_path = f"{os.path.splitext(self._disk_file(key))[0]}.lock"
+            while True:
+                try:
+                    os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    break
+                except FileExistsError:
+                    try:
+                        if time.time() - os.path.getmtime(lock_path) > stale_after:
+                            os.remove(lock_path)
+                            continue
+                    except OSError:
+                        continue
+                    time.sleep(0.01)
+            try:
+                yield
+            finally:
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        Report cache effectiveness and size.
+
+        Returns:
+            dict: Hit and miss counts, hit ratio and tier sizes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes
+            }
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _remember(self, key, value, now):
+        """
+        Insert into the memory tier and evict least recently used entries. Must hold the lock.
+        """
+        self._memory[key] = (now, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _disk_file(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_path, f"{digest}.json")
+
+    def _read_disk(self, key, now):
+        file_path = self._disk_file(key)
+        try:
+            if self._expired(os.path.getmtime(file_path), now):
+                self._remove_disk_file(file_path)
+                return None
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        file_path = self._disk_file(key)
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            previous_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, file_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing cache entry to disk: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            self._disk_bytes += size - previous_size
+            over_limit = self._disk_bytes > self.disk_max_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _remove_disk_file(self, file_path):
+        try:
+            size = os.path.getsize(file_path)
+            os.remove(file_path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+
+    def _disk_entries(self):
+        """
+        List disk entries as (path, mtime, size) tuples, oldest first.
+        """
+        entries = []
+        for name in os.listdir(self.disk_path):
+            if not name.endswith('.json'):
+                continue
+            file_path = os.path.join(self.disk_path, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            entries.append((file_path, stat.st_mtime, stat.st_size))
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def _evict_disk(self):
+        """
+        Drop expired disk entries, then the oldest ones until under the size limit.
+        """
+        now = time.time()
+        for file_path, mtime, _ in self._disk_entries():
+            with self._lock:
+                over_limit = self._disk_bytes > self.disk_max_bytes
+            if not over_limit and not self._expired(mtime, now):
+                break
+            self._remove_disk_file(file_path)
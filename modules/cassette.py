@@ -0,0 +1,277 @@
+# Cassette Module
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers that describe the wire encoding, which no longer applies to the decoded body kept in a cassette
+_WIRE_HEADERS = ("Content-Encoding", "Content-Length", "Transfer-Encoding", "Connection")
+
+class Cassette:
+    """
+    Recorded upstream interactions of one provider, stored as JSON lines.
+
+    Each interaction keeps the request method, URL and body (never its headers, so
+    API keys stay out of cassettes), the response status and headers, and the body
+    as the chunks the caller read with their arrival times.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize a Cassette and load any interactions already recorded.
+
+        Args:
+            path (str): JSONL file interactions are read from and appended to
+        """
+        self.path = path
+        self._exact = {}
+        self._by_endpoint = {}
+        self._next = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        interaction = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._exact.setdefault(interaction["key"], []).append(interaction)
+                    self._by_endpoint.setdefault(interaction["endpoint"], []).append(interaction)
+
+    def __len__(self):
+        return sum(len(interactions) for interactions in self._exact.values())
+
+    def append(self, interaction):
+        """
+        Add a finished interaction to the cassette file.
+
+        Args:
+            interaction (dict): Interaction built by RecordingAdapter
+        """
+        line = json.dumps(interaction) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def match(self, request):
+        """
+        Find the recorded interaction to play back for a request.
+
+        Identical requests are matched first. Otherwise any interaction recorded for
+        the same method and endpoint is used, so traffic with new prompts can still
+        be replayed against recorded model output. Repeated matches cycle through
+        the candidates in recording order.
+
+        Args:
+            request (requests.PreparedRequest): Outgoing request
+
+        Returns:
+            dict: The interaction, or None if nothing was recorded for the endpoint
+        """
+        for index, key in ((self._exact, request_key(request)), (self._by_endpoint, endpoint_key(request))):
+            candidates = index.get(key)
+            if candidates:
+                with self._lock:
+                    position = self._next.get(key, 0)
+                    self._next[key] = position + 1
+                return candidates[position % len(candidates)]
+        return None
+
+def request_key(request):
+    """
+    Hash identifying a request by method, path, query and body. The host is left out
+    because each provider has its own cassette, so recordings still match when a
+    provider's base URL changes.
+    """
+    parts = urlsplit(request.url)
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    target = f"{request.method} {parts.path}?{parts.query}".encode('utf-8')
+    return hashlib.sha256(target + b"\n" + body).hexdigest()
+
+def endpoint_key(request):
+    """
+    Method and path, without host or query string.
+    """
+    return f"{request.method} {urlsplit(request.url).path}"
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Transport adapter that sends requests as usual and records every interaction to a cassette.
+    """
+
+    def __init__(self, cassette, **kwargs):
+        """
+        Initialize the RecordingAdapter.
+
+        Args:
+            cassette (Cassette): Cassette interactions are appended to
+            **kwargs: Passed to HTTPAdapter
+        """
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        response = super().send(request, **kwargs)
+
+        body = request.body or b""
+        if isinstance(body, bytes):
+            try:
+                body = body.decode('utf-8')
+            except UnicodeDecodeError:
+                body = None
+        interaction = {
+            "key": request_key(request),
+            "endpoint": endpoint_key(request),
+            "method": request.method,
+            "url": request.url,
+            "request_body": body,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items() if name not in _WIRE_HEADERS},
+            "headers_at": round(time.monotonic() - started, 4)
+        }
+        response.raw = _RecordingBody(response.raw, self.cassette, interaction, started)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter that answers requests from a cassette instead of the network,
+    reproducing the recorded response timing scaled by a speed factor.
+    """
+
+    def __init__(self, cassette, speed=1.0):
+        """
+        Initialize the ReplayAdapter.
+
+        Args:
+            cassette (Cassette): Recorded interactions
+            speed (float): Factor applied to recorded delays; 1 replays at the recorded
+                pace, 0.5 twice as fast, 0 without any delay
+        """
+        super().__init__()
+        self.cassette = cassette
+        self.speed = speed
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        interaction = self.cassette.match(request)
+        if interaction is None:
+            raise requests.ConnectionError(f"No recorded response for {endpoint_key(request)}", request=request)
+
+        started = time.monotonic()
+        _sleep_until(started + interaction["headers_at"] * self.speed)
+
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = _ReplayBody(interaction["chunks"], started, self.speed)
+        return response
+
+    def close(self):
+        pass
+
+class _RecordingBody:
+    """
+    Wraps a urllib3 response, recording every chunk the caller reads and saving the
+    interaction once the body is exhausted or closed.
+    """
+
+    def __init__(self, raw, cassette, interaction, started):
+        self._raw = raw
+        self._cassette = cassette
+        self._interaction = interaction
+        self._started = started
+        self._chunks = []
+        self._saved = False
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        for chunk in self._raw.stream(amt, decode_content=True):
+            self._record(chunk)
+            yield chunk
+        self._save(complete=True)
+
+    def read(self, amt=None, decode_content=None, **kwargs):
+        chunk = self._raw.read(amt, decode_content=True, **kwargs)
+        if chunk:
+            self._record(chunk)
+        if not chunk or amt is None:
+            self._save(complete=True)
+        return chunk
+
+    def close(self):
+        self._save(complete=False)
+        self._raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def _record(self, chunk):
+        offset = round(time.monotonic() - self._started, 4)
+        try:
+            self._chunks.append({"at": offset, "text": chunk.decode('utf-8')})
+        except UnicodeDecodeError:
+            self._chunks.append({"at": offset, "base64": base64.b64encode(chunk).decode('ascii')})
+
+    def _save(self, complete):
+        if self._saved:
+            return
+        self._saved = True
+        self._cassette.append(dict(self._interaction, chunks=self._chunks, complete=complete))
+
+class _ReplayBody:
+    """
+    File-like response body that hands out recorded chunks at their recorded times.
+    """
+
+    def __init__(self, chunks, started, speed):
+        self._chunks = [(chunk["at"], chunk["text"].encode('utf-8') if "text" in chunk else base64.b64decode(chunk["base64"]))
+                        for chunk in chunks]
+        self._started = started
+        self._speed = speed
+        self._position = 0
+        self._pending = b""
+        self.closed = False
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        while True:
+            data = self.read(amt)
+            if not data:
+                return
+            yield data
+
+    def read(self, amt=None, decode_content=None, **kwargs):
+        if amt is None:
+            return b"".join(iter(lambda: self.read(2 ** 16), b""))
+        if not self._pending and self._position < len(self._chunks):
+            at, self._pending = self._chunks[self._position]
+            self._position += 1
+            _sleep_until(self._started + at * self._speed)
+        data, self._pending = self._pending[:amt], self._pending[amt:]
+        return data
+
+    def close(self):
+        self.closed = True
+
+def _sleep_until(moment):
+    delay = moment - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
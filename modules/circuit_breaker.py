@@ -0,0 +1,129 @@
+# Circuit Breaker Module
+
+import threading
+import time
+from collections import deque
+
+class CircuitBreaker:
+    """
+    Tracks the health of one upstream provider and stops calls to it while it is failing.
+
+    The breaker is closed while the provider is healthy. It opens after too many
+    consecutive failures or a high error rate over recent calls, rejecting calls
+    for reset_timeout seconds. It then half-opens and lets a single probe through:
+    success closes it again, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, error_rate_threshold=0.5, window_size=20, min_calls=10, reset_timeout=30):
+        """
+        Initialize a closed CircuitBreaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker
+            error_rate_threshold (float): Failure fraction over the window that opens the breaker
+            window_size (int): Number of recent calls the error rate is measured over
+            min_calls (int): Calls needed in the window before the error rate is used
+            reset_timeout (float): Seconds the breaker stays open before probing
+        """
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window_size)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Decide whether a call may go out now.
+
+        Returns:
+            bool: True if the call may be made; the caller must then report its outcome
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.state == self.HALF_OPEN:
+                # The probe succeeded, start over with a clean window
+                self.state = self.CLOSED
+                self._probing = False
+                self._outcomes.clear()
+
+    def release(self):
+        """
+        Report a call that says nothing about the provider's health, because it was never
+        sent or was only rate limited. A half-open breaker lets the next call probe instead.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN:
+                self._open()
+            elif self.state == self.CLOSED and (self.consecutive_failures >= self.failure_threshold or
+                                                self._error_rate() >= self.error_rate_threshold):
+                self._open()
+
+    def to_dict(self):
+        """
+        Build a JSON-serializable snapshot of the breaker.
+
+        Returns:
+            dict: State, failure counts, error rate and when the breaker retries
+        """
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(self.reset_timeout - (time.monotonic() - self.opened_at), 0), 1)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "error_rate": round(self._error_rate(), 3),
+                "recent_calls": len(self._outcomes),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "retry_in": retry_in
+            }
+
+    def _error_rate(self):
+        """
+        Failure fraction over the window, or 0 until the window has enough calls. Must hold the lock.
+        """
+        if len(self._outcomes) < self.min_calls:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self):
+        """
+        Start rejecting calls. Must hold the lock.
+        """
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._probing = False
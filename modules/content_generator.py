@@ -3,54 +3,161 @@
 import requests
 import json
 import random
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from modules.http_client import ProviderClients, RateLimitError
+from modules.json_stream import JsonStreamParser
+from modules.metrics import Metrics
 
 class ContentGenerator:
     """
     Generates marketing content using Qwen2.5 and Mistral AI APIs.
     """
     
-    def __init__(self, api_key=None):
+    # Model and sampling parameters used for every completion
+    MODEL = "google/gemma-3-1b-it"
+    GENERATION_PARAMS = {
+        "temperature": 0.1,
+        "top_p": 0.7,
+        "max_tokens": 512
+    }
+    
+    # Structured mode writes every section in one completion, so it needs a larger budget
+    STRUCTURED_GENERATION_PARAMS = dict(GENERATION_PARAMS, max_tokens=2048)
+    
+    # Regenerated text is sampled more freely so it differs from the text it replaces
+    REGENERATE_PARAMS = dict(GENERATION_PARAMS, temperature=0.7)
+    
+    # Keys each section must contain in structured output
+    STRUCTURED_SECTION_KEYS = {
+        "description": ["short", "medium", "long"],
+        "email": ["welcome", "promotional", "newsletter"],
+        "social_media": ["facebook", "twitter", "instagram"]
+    }
+    
+    # JSON shape requested for each piece of content
+    JSON_ITEM_SHAPES = {
+        "description": {
+            "short": '"50-word description"',
+            "medium": '"150-word description"',
+            "long": '"300-word description"'
+        },
+        "email": {
+            email_type: '{"subject": "...", "greeting": "...", "body": "...", "cta": "...", "sign_off": "..."}'
+            for email_type in ("welcome", "promotional", "newsletter")
+        },
+        "social_media": {
+            platform: '["post", "post", "post"]' for platform in ("facebook", "twitter", "instagram")
+        }
+    }
+    
+    # Default per-section deadlines (in seconds) for concurrent generation
+    DEFAULT_SECTION_TIMEOUTS = {
+        "description": 60,
+        "email": 60,
+        "social_media": 60
+    }
+    
+    def __init__(self, api_key=None, concurrent=True, max_workers=12, section_timeouts=None, http_clients=None,
+                 response_cache=None, structured=False, metrics=None, api_url="https://integrate.api.nvidia.com/v1"):
         """
         Initialize the ContentGenerator with API key.
         
         Args:
             api_key (str): NVIDIA API key for Gemma model
+            concurrent (bool): Generate the content sections in parallel
+            max_workers (int): Size of the thread pool shared by all concurrent requests
+            section_timeouts (dict, optional): Per-section deadlines in seconds
+            http_clients (ProviderClients, optional): Shared pooled HTTP clients
+            response_cache (TieredCache, optional): Cache for completions keyed on the
+                model, generation parameters and prompt
+            structured (bool): Generate every section with one prompt that returns JSON,
+                instead of one prompt per section
+            metrics (Metrics, optional): Registry that request latency and fallbacks are recorded in
+            api_url (str): Base URL of the OpenAI-compatible chat completions API
         """
         self.api_key = api_key
-        self.api_url = "https://integrate.api.nvidia.com/v1"
+        self.api_url = api_url
+        self.http_clients = http_clients or ProviderClients()
+        self.response_cache = response_cache
+        self.structured = structured
+        
+        # Concurrent generation settings
+        self.concurrent = concurrent
+        self.section_timeouts = dict(self.DEFAULT_SECTION_TIMEOUTS)
+        if section_timeouts:
+            self.section_timeouts.update(section_timeouts)
+        self._executor = (ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="content")
+                          if concurrent or structured else None)
+        
+        self.metrics = metrics or Metrics()
+        self._first_token_seconds = self.metrics.histogram(
+            "content_first_token_seconds", "Time until the first generated text arrives from the model.", ("request",))
+        self._request_seconds = self.metrics.histogram(
+            "content_request_seconds", "Time to receive a complete generation from the model.", ("request",))
+        self._errors = self.metrics.counter(
+            "content_errors", "Failed model requests.", ("request",))
+        self._repairs = self.metrics.counter(
+            "content_repairs", "Follow-up requests for content that failed to parse.", ("section",))
+        self._fallbacks = self.metrics.counter(
+            "content_fallbacks", "Content sections replaced by fallback content.", ("section",))
     
-    def _make_api_request(self, prompt, request_type="content"):
-        """Helper method to make API requests with error handling"""
+    def stream_completion(self, prompt, request_type="content", params=None, deadline=None):
+        """
+        Stream a completion from the API as it is generated.
+        
+        Args:
+            prompt (str): Prompt to send to the model
+            request_type (str): Description of the request used in error messages
+            params (dict, optional): Sampling parameters; defaults to GENERATION_PARAMS
+            deadline (float, optional): Monotonic time by which retries and rate limit
+                waits must end; defaults to the HTTP client's retry budget
+            
+        Yields:
+            str: Text deltas in the order the model produced them
+        """
         if not self.api_key:
             raise Exception("No valid API key provided for content generation.")
 
         try:
-            from openai import OpenAI
-            
-            client = OpenAI(
-                base_url=self.api_url,
-                api_key=self.api_key
-            )
-            
-            completion = client.chat.completions.create(
-                model="google/gemma-3-1b-it",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                top_p=0.7,
-                max_tokens=512,
-                stream=True
-            )
-            
-            # Collect the streamed response
-            generated_text = ""
-            for chunk in completion:
-                if chunk.choices[0].delta.content is not None:
-                    generated_text += chunk.choices[0].delta.content
-            
-            return generated_text
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream"
+            }
+            
+            data = {
+                "model": self.MODEL,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": True,
+                **(params or self.GENERATION_PARAMS)
+            }
+            
+            response = self.http_clients.post("nvidia", f"{self.api_url}/chat/completions",
+                                              headers=headers, json=data, stream=True, deadline=deadline)
+            
+            with response:
+                if response.status_code != 200:
+                    raise Exception(f"Error code: {response.status_code} - {response.text}")
+                
+                # Read the server-sent events as they arrive
+                for line in response.iter_lines(chunk_size=64):
+                    if not line.startswith(b"data:"):
+                        continue
+                    payload = line[len(b"data:"):].strip()
+                    if payload == b"[DONE]":
+                        break
+                    
+                    choices = json.loads(payload).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta is not None:
+                        yield delta
             
         except Exception as e:
-            if "429" in str(e):
+            self._errors.inc(request=request_type)
+            if isinstance(e, RateLimitError) or "429" in str(e):
                 raise Exception("API rate limit reached. Please try again later.")
             elif "401" in str(e):
                 raise Exception("Invalid API key or authentication error.")
@@ -59,75 +166,624 @@ class ContentGenerator:
             else:
                 raise Exception(f"Failed to generate {request_type}: {str(e)}")
 
-    def generate(self, business_data):
+    def _make_api_request(self, prompt, request_type="content", on_delta=None, use_cache=True, params=None,
+                          deadline=None):
+        """
+        Helper method to make API requests with error handling.
+        
+        Args:
+            prompt (str): Prompt to send to the model
+            request_type (str): Description of the request used in error messages
+            on_delta (callable, optional): Called with each text delta as it arrives
+            use_cache (bool): Serve identical earlier completions from the response cache;
+                a fresh completion is cached either way
+            params (dict, optional): Sampling parameters; defaults to GENERATION_PARAMS
+            deadline (float, optional): Monotonic time by which retries and rate limit waits must end
+            
+        Returns:
+            str: The complete generated text
+        """
+        cache_key = self._cache_key(prompt, params) if self.response_cache else None
+        if cache_key and use_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if on_delta:
+                    on_delta(cached)
+                return cached
+        
+        # Collect the streamed response
+        chunks = []
+        started = time.perf_counter()
+        for delta in self.stream_completion(prompt, request_type, params, deadline):
+            if not chunks:
+                self._first_token_seconds.observe(time.perf_counter() - started, request=request_type)
+            chunks.append(delta)
+            if on_delta:
+                on_delta(delta)
+        self._request_seconds.observe(time.perf_counter() - started, request=request_type)
+        
+        generated_text = "".join(chunks)
+        if cache_key:
+            self.response_cache.set(cache_key, generated_text)
+        return generated_text
+    
+    def _cache_key(self, prompt, params=None):
+        """
+        Build the response cache key for a prompt.
+        
+        Args:
+            prompt (str): Prompt sent to the model
+            params (dict, optional): Sampling parameters; defaults to GENERATION_PARAMS
+            
+        Returns:
+            str: Hash of the model, generation parameters and prompt
+        """
+        key_data = json.dumps({"model": self.MODEL, "params": params or self.GENERATION_PARAMS, "prompt": prompt},
+                              sort_keys=True)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+    
+    def _forget_response(self, prompt, params=None):
+        """
+        Drop a cached completion that could not be parsed so it is not served again.
+        
+        Args:
+            prompt (str): Prompt whose completion should be forgotten
+            params (dict, optional): Sampling parameters the completion was made with
+        """
+        if self.response_cache:
+            self.response_cache.delete(self._cache_key(prompt, params))
+
+    def generate(self, business_data, deadline=None, on_section=None, on_delta=None, use_cache=True, fallbacks=None):
         """
         Generate marketing content based on business data.
         
         Args:
             business_data (dict): Processed business information
+            deadline (float, optional): Monotonic time after which concurrent sections
+                fall back instead of waiting
+            on_section (callable, optional): Called with (section, content) as soon as
+                each section is ready
+            on_delta (callable, optional): Called with (section, text) for every chunk
+                of generated text as it streams in
+            use_cache (bool): Reuse cached completions; False forces fresh generations
+            fallbacks (set, optional): Collects the names of sections replaced by fallback content
             
         Returns:
             dict: Generated content including business description, email templates,
                  and social media posts
         """
         try:
+            if self.structured:
+                return self._generate_structured(business_data, deadline, on_section, on_delta, use_cache, fallbacks)
+            if self.concurrent:
+                return self._generate_concurrently(business_data, deadline, on_section, on_delta, use_cache, fallbacks)
+            
             # Generate different types of content
-            description = self._generate_business_description(business_data)
-            email = self._generate_email_templates(business_data)
-            social_media = self._generate_social_media_posts(business_data)
+            content = {}
+            for section, call in self._section_calls().items():
+                content[section] = call(business_data, on_delta=self._section_delta(on_delta, section), use_cache=use_cache,
+                                        deadline=deadline, fallbacks=fallbacks)
+                if on_section:
+                    on_section(section, content[section])
             
             # Return all generated content
-            return {
-                "description": description,
-                "email": email,
-                "social_media": social_media
-            }
+            return content
         except Exception as e:
             print(f"Error in content generation: {str(e)}")
+            for section in self.STRUCTURED_SECTION_KEYS:
+                self._record_fallback(section, fallbacks)
             # Return fallback content
-            return {
-                "description": {
-                    "short": "Error generating content. Please try again.",
-                    "medium": "We're experiencing technical difficulties with our content generation service.",
-                    "long": "Our content generation service is temporarily unavailable. Please try again later."
+            return self._fallback_content()
+    
+    def _section_calls(self):
+        """
+        Map each content section to the method that generates it.
+        
+        Returns:
+            dict: Section name to generator method, in display order
+        """
+        return {
+            "description": self._generate_business_description,
+            "email": self._generate_email_templates,
+            "social_media": self._generate_social_media_posts
+        }
+    
+    def _section_delta(self, on_delta, section):
+        """
+        Bind a section name to a delta callback.
+        
+        Args:
+            on_delta (callable): Callback taking (section, text), or None
+            section (str): Section the deltas belong to
+            
+        Returns:
+            callable: Callback taking only the text, or None
+        """
+        if on_delta is None:
+            return None
+        return lambda text: on_delta(section, text)
+    
+    def _generate_concurrently(self, business_data, deadline=None, on_section=None, on_delta=None, use_cache=True,
+                               fallbacks=None):
+        """
+        Generate all content sections in parallel on the shared thread pool.
+        
+        Each section is joined against its own deadline, measured from the moment
+        the sections are submitted, and falls back independently when it fails or
+        runs out of time.
+        
+        Args:
+            business_data (dict): Processed business information
+            deadline (float, optional): Monotonic time that caps every section deadline
+            on_section (callable, optional): Called with (section, content) as each
+                section completes or falls back
+            on_delta (callable, optional): Called with (section, text) for every chunk
+                of generated text
+            use_cache (bool): Reuse cached completions
+            fallbacks (set, optional): Collects the names of sections replaced by fallback content
+            
+        Returns:
+            dict: Generated content with the same structure as generate()
+        """
+        section_calls = self._section_calls()
+        
+        started = time.monotonic()
+        pending = {}
+        deadlines = {}
+        for section, call in section_calls.items():
+            timeout = self.section_timeouts.get(section)
+            section_deadline = None if timeout is None else started + timeout
+            if deadline is not None:
+                section_deadline = deadline if section_deadline is None else min(section_deadline, deadline)
+            deadlines[section] = section_deadline
+            pending[section] = self._executor.submit(call, business_data, on_delta=self._section_delta(on_delta, section),
+                                                     use_cache=use_cache, deadline=section_deadline, fallbacks=fallbacks)
+        
+        fallback = self._fallback_content()
+        content = {}
+        
+        def finish(section, value):
+            content[section] = value
+            if on_section:
+                on_section(section, value)
+        
+        while pending:
+            # Fall back for every section whose deadline has passed
+            now = time.monotonic()
+            for section in [s for s in pending if deadlines[s] is not None and deadlines[s] <= now]:
+                pending.pop(section).cancel()
+                print(f"Timed out generating {section}. Using fallback content.")
+                self._record_fallback(section, fallbacks)
+                finish(section, fallback[section])
+            if not pending:
+                break
+            
+            # Wait for the next section to finish or the nearest deadline
+            open_deadlines = [deadlines[s] for s in pending if deadlines[s] is not None]
+            wait_time = max(0, min(open_deadlines) - now) if open_deadlines else None
+            done, _ = wait(pending.values(), timeout=wait_time, return_when=FIRST_COMPLETED)
+            
+            for section in [s for s, future in pending.items() if future in done]:
+                future = pending.pop(section)
+                try:
+                    finish(section, future.result())
+                except Exception as e:
+                    print(f"Error generating {section}: {str(e)}")
+                    self._record_fallback(section, fallbacks)
+                    finish(section, fallback[section])
+        
+        return {section: content[section] for section in section_calls}
+    
+    def _generate_structured(self, business_data, deadline=None, on_section=None, on_delta=None, use_cache=True,
+                             fallbacks=None):
+        """
+        Generate all content sections with a single prompt that returns one JSON document.
+        
+        The completion is parsed while it streams, so each section is reported as soon
+        as its JSON object closes. Pieces that are missing or malformed are then asked
+        for in one follow-up prompt and merged in. Sections that still cannot be
+        completed, or are not finished by the deadline, fall back on their own while
+        the others are kept.
+        
+        Args:
+            business_data (dict): Processed business information
+            deadline (float, optional): Monotonic time after which unfinished sections fall back
+            on_section (callable, optional): Called with (section, content) as each
+                section completes or falls back
+            on_delta (callable, optional): Called with (section, text) for every chunk
+                of generated text, attributed to the section being written
+            use_cache (bool): Reuse a cached completion for the same prompt
+            fallbacks (set, optional): Collects the names of sections replaced by fallback content
+            
+        Returns:
+            dict: Generated content with the same structure as generate()
+        """
+        prompt = self._structured_prompt(business_data)
+        params = self.STRUCTURED_GENERATION_PARAMS
+        
+        section_deadline = time.monotonic() + max(self.section_timeouts.values())
+        if deadline is not None:
+            section_deadline = min(section_deadline, deadline)
+        
+        parser = JsonStreamParser()
+        content = {}
+        partial = {}
+        # Set once the deadline passes, so a request still streaming in the background stops
+        # at its next chunk and cannot change the content after it has been returned
+        state_lock = threading.Lock()
+        abandoned = threading.Event()
+        
+        def finish(section, value):
+            content[section] = value
+            if on_section:
+                on_section(section, value)
+        
+        def handle_delta(text):
+            with state_lock:
+                if abandoned.is_set() or time.monotonic() > section_deadline:
+                    raise TimeoutError("deadline reached before every section was generated")
+                if on_delta:
+                    on_delta(parser.current_key if parser.current_key in self.STRUCTURED_SECTION_KEYS else "description", text)
+                for section, value in parser.feed(text):
+                    if section not in self.STRUCTURED_SECTION_KEYS or section in content:
+                        continue
+                    items = self._valid_items(section, value)
+                    if len(items) == len(self.STRUCTURED_SECTION_KEYS[section]):
+                        finish(section, items)
+                    else:
+                        partial[section] = items
+        
+        repair_abandoned = threading.Event()
+        
+        def repair_delta(section, text):
+            if repair_abandoned.is_set():
+                raise TimeoutError("deadline reached before the missing pieces were generated")
+            if on_delta:
+                on_delta(section, text)
+        
+        completed = False
+        try:
+            # Run the request on the pool and wait only until the deadline, since a stream that
+            # stalls between chunks would otherwise only be bounded by the read timeout
+            self._call_until(section_deadline, self._make_api_request, prompt, "structured content",
+                             on_delta=handle_delta, use_cache=use_cache, params=params, deadline=section_deadline)
+            completed = True
+        except Exception as e:
+            print(f"Error generating structured content: {str(e)}")
+        with state_lock:
+            abandoned.set()
+        
+        incomplete = {section: partial.get(section, {}) for section in self.STRUCTURED_SECTION_KEYS if section not in content}
+        if incomplete:
+            # Never serve an incomplete document from the cache again
+            self._forget_response(prompt, params)
+        
+        # The model answered but left pieces out, so ask for just those
+        if incomplete and completed:
+            try:
+                repaired = self._call_until(section_deadline, self._repair_sections, business_data, incomplete,
+                                            on_delta=repair_delta, use_cache=use_cache, deadline=section_deadline)
+            except Exception as e:
+                print(f"Error repairing structured content: {str(e)}")
+                repaired = {}
+            repair_abandoned.set()
+            for section, items in repaired.items():
+                if len(items) == len(self.STRUCTURED_SECTION_KEYS[section]):
+                    del incomplete[section]
+                    finish(section, items)
+        
+        fallback = self._fallback_content()
+        for section in incomplete:
+            print(f"Structured output had no usable {section}. Using fallback content.")
+            self._record_fallback(section, fallbacks)
+            finish(section, fallback[section])
+        
+        return {section: content[section] for section in self.STRUCTURED_SECTION_KEYS}
+    
+    def _call_until(self, until, call, *args, **kwargs):
+        """
+        Run a blocking call on the shared thread pool and wait for it until a deadline.
+        
+        A call that is still running at the deadline is left to finish in the background,
+        so it must stop by itself, e.g. from its on_delta callback.
+        
+        Args:
+            until (float): Monotonic time to wait until
+            call (callable): Function to run
+            *args, **kwargs: Arguments for the call
+            
+        Returns:
+            The result of the call
+            
+        Raises:
+            TimeoutError: If the call has not finished by the deadline
+        """
+        future = self._executor.submit(call, *args, **kwargs)
+        done, _ = wait([future], timeout=max(0, until - time.monotonic()))
+        if not done:
+            raise TimeoutError("deadline reached while waiting for the model")
+        return future.result()
+    
+    def _repair_sections(self, business_data, partial, on_delta=None, use_cache=True, deadline=None):
+        """
+        Ask the model for only the pieces missing from partially parsed sections and
+        merge them with what was kept.
+        
+        Args:
+            business_data (dict): Processed business information
+            partial (dict): Section name to the items already parsed for it
+            on_delta (callable, optional): Called with (section, text) for every chunk
+                of the follow-up completion
+            use_cache (bool): Reuse a cached completion for the same follow-up prompt
+            deadline (float, optional): Monotonic time by which retries must end
+            
+        Returns:
+            dict: Section name to merged items; sections may still be incomplete if the
+                follow-up failed
+        """
+        wanted = {section: [key for key in self.STRUCTURED_SECTION_KEYS[section] if key not in items]
+                  for section, items in partial.items()}
+        wanted = {section: keys for section, keys in wanted.items() if keys}
+        merged = {section: dict(items) for section, items in partial.items()}
+        if not wanted:
+            return merged
+        for section in wanted:
+            self._repairs.inc(section=section)
+        
+        try:
+            repaired = self._generate_pieces(business_data, wanted, on_delta=on_delta, use_cache=use_cache,
+                                             deadline=deadline)
+        except Exception as e:
+            print(f"Error repairing generated content: {str(e)}")
+            repaired = {}
+        for section, items in repaired.items():
+            merged[section].update(items)
+        
+        # Keep the usual key order
+        return {section: {key: items[key] for key in self.STRUCTURED_SECTION_KEYS[section] if key in items}
+                for section, items in merged.items()}
+    
+    def _generate_pieces(self, business_data, wanted, on_delta=None, use_cache=True, params=None, deadline=None):
+        """
+        Generate selected pieces of content with one JSON prompt.
+        
+        Args:
+            business_data (dict): Processed business information
+            wanted (dict): Section name to the keys to generate
+            on_delta (callable, optional): Called with (section, text) for every chunk
+                of the completion
+            use_cache (bool): Reuse a cached completion for the same prompt
+            params (dict, optional): Sampling parameters; defaults to GENERATION_PARAMS
+            deadline (float, optional): Monotonic time by which retries must end
+            
+        Returns:
+            dict: Section name to the usable pieces; pieces that could not be parsed are left out
+        """
+        prompt = self._pieces_prompt(business_data, wanted)
+        parser = JsonStreamParser()
+        pieces = {section: {} for section in wanted}
+        
+        def handle_delta(text):
+            if on_delta:
+                on_delta(parser.current_key if parser.current_key in wanted else next(iter(wanted)), text)
+            for section, value in parser.feed(text):
+                if section in wanted:
+                    items = self._valid_items(section, value)
+                    pieces[section].update({key: items[key] for key in wanted[section] if key in items})
+        
+        try:
+            self._make_api_request(prompt, "content", on_delta=handle_delta, use_cache=use_cache, params=params,
+                                   deadline=deadline)
+        finally:
+            if any(len(pieces[section]) < len(keys) for section, keys in wanted.items()):
+                self._forget_response(prompt, params)
+        return pieces
+    
+    def regenerate(self, business_data, section, keys=None, on_delta=None):
+        """
+        Generate fresh text for one section, or only some of its pieces, with a single request.
+        
+        Args:
+            business_data (dict): Processed business information
+            section (str): Section name, one of STRUCTURED_SECTION_KEYS
+            keys (list, optional): Pieces of the section to regenerate; defaults to all of them
+            on_delta (callable, optional): Called with (section, text) for every chunk
+                of generated text
+            
+        Returns:
+            dict: Key to the new content for every requested piece
+            
+        Raises:
+            Exception: If the request fails or any piece could not be parsed
+        """
+        keys = keys or self.STRUCTURED_SECTION_KEYS[section]
+        pieces = self._generate_pieces(business_data, {section: keys}, on_delta=on_delta, use_cache=False,
+                                       params=self.REGENERATE_PARAMS)[section]
+        missing = [key for key in keys if key not in pieces]
+        if missing:
+            raise Exception(f"Failed to regenerate {section} content for: {', '.join(missing)}")
+        return pieces
+    
+    def _repair_section(self, section, business_data, items, on_delta=None, use_cache=True, deadline=None):
+        """
+        Complete one partially parsed section, for the per-section generators.
+        
+        Args:
+            section (str): Section name
+            business_data (dict): Processed business information
+            items (dict): Items already parsed for the section
+            on_delta (callable, optional): Called with each chunk of the follow-up completion
+            use_cache (bool): Reuse a cached completion for the same follow-up prompt
+            deadline (float, optional): Monotonic time by which retries must end
+            
+        Returns:
+            dict: The complete section
+            
+        Raises:
+            Exception: If the missing pieces could not be generated
+        """
+        section_delta = None if on_delta is None else (lambda _, text: on_delta(text))
+        merged = self._repair_sections(business_data, {section: items}, on_delta=section_delta,
+                                       use_cache=use_cache, deadline=deadline)[section]
+        missing = [key for key in self.STRUCTURED_SECTION_KEYS[section] if key not in merged]
+        if missing:
+            raise Exception(f"Failed to generate {section} content for: {', '.join(missing)}")
+        return merged
+    
+    def _json_shape(self, wanted):
+        """
+        Describe the JSON document the model should return.
+        
+        Args:
+            wanted (dict): Section name to the keys requested for it
+            
+        Returns:
+            str: JSON skeleton with one line per section
+        """
+        lines = []
+        for section, keys in wanted.items():
+            members = ", ".join(f'"{key}": {self.JSON_ITEM_SHAPES[section][key]}' for key in keys)
+            lines.append(f'  "{section}": {{{members}}}')
+        return "{\n" + ",\n".join(lines) + "\n}"
+    
+    def _business_brief(self, business_data):
+        """
+        Describe the business once for the JSON prompts.
+        """
+        return f"""'{business_data['name']}', a {business_data['type']} located in {business_data['location']}.
+
+Business details:
+- Description provided by owner: {business_data['description']}
+- Target audience: {business_data['target_audience']}
+- Style preference: {business_data['style_preference']}
+
+Use a {business_data['tone']['voice']} tone. Highlight {', '.join(business_data['business_context']['key_selling_points'])} and focus on {', '.join(business_data['business_context']['marketing_focus'])}."""
+    
+    def _structured_prompt(self, business_data):
+        """
+        Build the single prompt used by structured generation.
+        
+        Args:
+            business_data (dict): Processed business information
+            
+        Returns:
+            str: Prompt asking for every section as one JSON document
+        """
+        return f"""Create marketing content for {self._business_brief(business_data)}
+
+Respond with only a JSON object in exactly this structure, with no other text:
+{self._json_shape(self.STRUCTURED_SECTION_KEYS)}
+
+The welcome email greets new subscribers, the promotional email presents a special offer and the newsletter shares updates. Facebook posts are longer and engaging, Twitter/X posts short and punchy, Instagram posts visual-focused."""
+    
+    def _pieces_prompt(self, business_data, wanted):
+        """
+        Build a prompt asking for only some pieces of content.
+        
+        Args:
+            business_data (dict): Processed business information
+            wanted (dict): Section name to the keys wanted
+            
+        Returns:
+            str: Prompt asking for the pieces as one JSON document
+        """
+        return f"""Write the following marketing content for {self._business_brief(business_data)}
+
+Respond with only a JSON object in exactly this structure, with no other text:
+{self._json_shape(wanted)}"""
+    
+    def _valid_items(self, section, value):
+        """
+        Keep the usable pieces of a section parsed from JSON, in the usual shape.
+        
+        Args:
+            section (str): Section name
+            value: Parsed JSON value
+            
+        Returns:
+            dict: Key to normalized content for every usable piece
+        """
+        if not isinstance(value, dict):
+            return {}
+        
+        items = {}
+        for key in self.STRUCTURED_SECTION_KEYS[section]:
+            item = value.get(key)
+            if not item:
+                continue
+            if section == "description":
+                items[key] = str(item).strip()
+            elif section == "email":
+                if isinstance(item, dict) and item.get("subject") and item.get("body"):
+                    items[key] = {field: str(text).strip() for field, text in item.items() if text}
+            else:
+                posts = [str(post).strip() for post in (item if isinstance(item, list) else [item]) if post]
+                if posts:
+                    items[key] = posts
+        return items
+    
+    def _record_fallback(self, section, fallbacks=None):
+        """
+        Count a section replaced by fallback content, and note it for the caller.
+        """
+        self._fallbacks.inc(section=section)
+        if fallbacks is not None:
+            fallbacks.add(section)
+    
+    def _fallback_content(self):
+        """
+        Build the fallback content used when generation fails.
+        
+        Returns:
+            dict: Placeholder content with the same structure as generate()
+        """
+        return {
+            "description": {
+                "short": "Error generating content. Please try again.",
+                "medium": "We're experiencing technical difficulties with our content generation service.",
+                "long": "Our content generation service is temporarily unavailable. Please try again later."
+            },
+            "email": {
+                "welcome": {
+                    "subject": "Welcome to Our Business",
+                    "greeting": "Dear valued customer,",
+                    "body": "We're excited to have you join us!",
+                    "cta": "Visit us soon!",
+                    "sign_off": "Best regards,"
                 },
-                "email": {
-                    "welcome": {
-                        "subject": "Welcome to Our Business",
-                        "greeting": "Dear valued customer,",
-                        "body": "We're excited to have you join us!",
-                        "cta": "Visit us soon!",
-                        "sign_off": "Best regards,"
-                    },
-                    "promotional": {
-                        "subject": "Special Offer",
-                        "greeting": "Hello!",
-                        "body": "Check out our latest offers!",
-                        "cta": "Don't miss out!",
-                        "sign_off": "Best regards,"
-                    },
-                    "newsletter": {
-                        "subject": "Monthly Update",
-                        "greeting": "Hello!",
-                        "body": "Here's what's new with us!",
-                        "cta": "Stay tuned for more!",
-                        "sign_off": "Best regards,"
-                    }
+                "promotional": {
+                    "subject": "Special Offer",
+                    "greeting": "Hello!",
+                    "body": "Check out our latest offers!",
+                    "cta": "Don't miss out!",
+                    "sign_off": "Best regards,"
                 },
-                "social_media": {
-                    "instagram": "Follow us for updates!",
-                    "facebook": "Like our page for news!",
-                    "twitter": "Follow us for updates!",
-                    "linkedin": "Connect with us professionally!"
+                "newsletter": {
+                    "subject": "Monthly Update",
+                    "greeting": "Hello!",
+                    "body": "Here's what's new with us!",
+                    "cta": "Stay tuned for more!",
+                    "sign_off": "Best regards,"
                 }
+            },
+            "social_media": {
+                "instagram": "Follow us for updates!",
+                "facebook": "Like our page for news!",
+                "twitter": "Follow us for updates!",
+                "linkedin": "Connect with us professionally!"
             }
+        }
     
-    def _generate_business_description(self, business_data):
+    def _generate_business_description(self, business_data, on_delta=None, use_cache=True, deadline=None, fallbacks=None):
         """
         Generate a professional business description.
         
         Args:
             business_data (dict): Processed business information
+            on_delta (callable, optional): Called with each chunk of generated text
+            use_cache (bool): Reuse a cached completion for the same prompt
+            deadline (float, optional): Monotonic time by which retries must end
+            fallbacks (set, optional): Collects "description" if fallback content is returned
             
         Returns:
             dict: Generated business description content
@@ -149,7 +805,8 @@ Generate three versions:
 Each description should highlight what makes this business unique and appeal to their target audience."""
 
         try:
-            content = self._make_api_request(prompt, "business description")
+            content = self._make_api_request(prompt, "business description", on_delta=on_delta, use_cache=use_cache,
+                                             deadline=deadline)
             
             # Parse the content into sections
             sections = content.split("\n\n")
@@ -177,10 +834,16 @@ Each description should highlight what makes this business unique and appeal to
             medium_desc = medium_desc.lstrip("123.").strip()
             long_desc = long_desc.lstrip("123.").strip()
 
-            if not any([short_desc, medium_desc, long_desc]):
-                raise Exception("Failed to parse generated content properly")
+            # Ask for only the descriptions that could not be parsed
+            descriptions = {key: text for key, text in (("short", short_desc), ("medium", medium_desc), ("long", long_desc))
+                            if text}
+            if len(descriptions) < 3:
+                descriptions = self._repair_section("description", business_data, descriptions, on_delta, use_cache, deadline)
+            short_desc, medium_desc, long_desc = descriptions["short"], descriptions["medium"], descriptions["long"]
 
         except Exception as e:
+            self._forget_response(prompt)
+            self._record_fallback("description", fallbacks)
             # Provide fallback content when API fails
             return {
                 "short": f"Error generating content: {str(e)}",
@@ -194,7 +857,7 @@ Each description should highlight what makes this business unique and appeal to
             "long": long_desc.strip()
         }
     
-    def _generate_email_templates(self, business_data):
+    def _generate_email_templates(self, business_data, on_delta=None, use_cache=True, deadline=None, fallbacks=None):
         prompt = f"""Create email marketing templates for '{business_data['name']}', a {business_data['type']} business.
         
 Business details:
@@ -211,7 +874,8 @@ Each template should have a subject line and body content.
 Use a {business_data['tone']['voice']} tone and focus on {', '.join(business_data['business_context']['marketing_focus'])}."""
 
         try:
-            content = self._make_api_request(prompt, "email templates")
+            content = self._make_api_request(prompt, "email templates", on_delta=on_delta, use_cache=use_cache,
+                                             deadline=deadline)
             
             # Parse the content into templates
             templates = {}
@@ -259,13 +923,15 @@ Use a {business_data['tone']['voice']} tone and focus on {', '.join(business_dat
             if current_template and subject and body:
                 templates[current_template] = {"subject": subject, "body": body}
             
-            # Verify we have all templates
+            # Keep the parsed templates and ask for only the missing ones
             if not all(key in templates for key in ["welcome", "promotional", "newsletter"]):
-                raise Exception("Failed to generate all email templates")
+                templates = self._repair_section("email", business_data, templates, on_delta, use_cache, deadline)
             
             return templates
             
         except Exception as e:
+            self._forget_response(prompt)
+            self._record_fallback("email", fallbacks)
             # Provide fallback content when API fails
             return {
                 "welcome": {
@@ -282,7 +948,7 @@ Use a {business_data['tone']['voice']} tone and focus on {', '.join(business_dat
                 }
             }
     
-    def _generate_social_media_posts(self, business_data):
+    def _generate_social_media_posts(self, business_data, on_delta=None, use_cache=True, deadline=None, fallbacks=None):
         prompt = f"""Create social media posts for '{business_data['name']}', a {business_data['type']} business.
         
 Business details:
@@ -297,7 +963,8 @@ Generate three posts each for:
 Use a {business_data['tone']['voice']} tone and focus on {', '.join(business_data['business_context']['marketing_focus'])}."""
 
         try:
-            content = self._make_api_request(prompt, "social media posts")
+            content = self._make_api_request(prompt, "social media posts", on_delta=on_delta, use_cache=use_cache,
+                                             deadline=deadline)
             
             # Parse the content into platform-specific posts
             posts = {}
@@ -332,13 +999,15 @@ Use a {business_data['tone']['voice']} tone and focus on {', '.join(business_dat
             if current_platform and platform_posts:
                 posts[current_platform] = platform_posts
             
-            # Verify we have content for all platforms
+            # Keep the parsed platforms and ask for only the missing ones
             if not all(key in posts for key in ["facebook", "twitter", "instagram"]):
-                raise Exception("Failed to generate posts for all platforms")
+                posts = self._repair_section("social_media", business_data, posts, on_delta, use_cache, deadline)
             
             return posts
             
         except Exception as e:
+            self._forget_response(prompt)
+            self._record_fallback("social_media", fallbacks)
             # Provide fallback content when API fails
             return {
                 "facebook": [
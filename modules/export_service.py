@@ -2,41 +2,400 @@
 
 import os
 import io
+import json
+import hashlib
+import threading
+import time
 from datetime import datetime
 from PIL import Image, ImageDraw, ImageFont
-import requests
 from fpdf import FPDF
 import textwrap
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from modules.http_client import ProviderClients
+from modules.metrics import Metrics
+
+# Lookup table that scales every channel by 127/255, as compositing black at alpha 128 does
+_HALF_SHADE_LUT = [value * 127 // 255 for value in range(256)] * 3
+
+@lru_cache(maxsize=None)
+def _load_font(size):
+    """
+    Load the post font once per size for the whole process, falling back to the default font.
+    """
+    try:
+        return ImageFont.truetype("Arial.ttf", size)
+    except IOError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=8)
+def _gradient_background(size):
+    """
+    Build the fallback vertical gradient. A single column is filled and stretched
+    sideways, so each row is computed once instead of drawn as its own line.
+    Callers must copy the result before drawing on it.
+    """
+    column = Image.new('RGB', (1, size))
+    column.putdata([(int(220 + (y / size) * 35), int(220 + (y / size) * 35), int(240 - (y / size) * 40))
+                    for y in range(size)])
+    return column.resize((size, size), Image.NEAREST)
+
+def _fill_square(img, size):
+    """
+    Center-crop an image to a square and scale it to size x size in one resample.
+    Only the cropped region is resampled, and JPEG sources are decoded at a reduced
+    scale first when they are much larger than needed.
+    """
+    # draft() only applies to JPEG and must run before the pixels are loaded
+    img.draft('RGB', (size, size))
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    
+    side = min(img.width, img.height)
+    left = (img.width - side) / 2
+    top = (img.height - side) / 2
+    img = img.resize((size, size), Image.LANCZOS, box=(left, top, left + side, top + side), reducing_gap=2.0)
+    return img.convert('RGB') if img.mode != 'RGB' else img
+
+# Typographic characters the PDF core fonts cannot encode, mapped to Latin-1 equivalents
+_LATIN1_REPLACEMENTS = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+    '\u2013': '-', '\u2014': '-', '\u2022': '-', '\u2026': '...', '\u00a0': ' '
+})
+
+def _latin1(text):
+    """
+    Make text printable with the PDF core fonts, dropping characters such as emoji
+    that Latin-1 has no equivalent for.
+    """
+    return str(text or '').translate(_LATIN1_REPLACEMENTS).encode('latin-1', 'ignore').decode('latin-1')
+
+@lru_cache(maxsize=64)
+def _pdf_image_info(file_path):
+    """
+    Read a JPEG into the image record FPDF embeds, once per file for the whole process.
+    The data is kept as a Latin-1 string, the form FPDF writes it in, so documents
+    embed it without decoding it again.
+    """
+    with Image.open(file_path) as img:
+        width, height = img.size
+    with open(file_path, 'rb') as f:
+        data = f.read().decode('latin-1')
+    return {'w': width, 'h': height, 'cs': 'DeviceRGB', 'bpc': 8, 'f': 'DCTDecode', 'data': data}
+
+class _BrandKitPDF(FPDF):
+    """
+    A4 brand kit layout with a running header and page numbers.
+    """
+    
+    MARGIN = 20
+    CONTENT_WIDTH = 210 - 2 * MARGIN
+    
+    def __init__(self, business_name):
+        super().__init__('P', 'mm', 'A4')
+        self.business_name = _latin1(business_name)
+        self.set_margins(self.MARGIN, self.MARGIN, self.MARGIN)
+        self.set_auto_page_break(True, self.MARGIN)
+        self.set_title(f"{self.business_name} Brand Kit")
+    
+    def header(self):
+        if self.page_no() > 1:
+            self.set_font('Arial', 'I', 9)
+            self.set_text_color(120, 120, 120)
+            self.cell(0, 8, f"{self.business_name} - Brand Kit", 0, 1, 'R')
+            self.ln(2)
+    
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.set_text_color(120, 120, 120)
+        self.cell(0, 10, f"Page {self.page_no()}", 0, 0, 'C')
+    
+    def section_title(self, title):
+        self.set_font('Arial', 'B', 20)
+        self.set_text_color(76, 175, 80)
+        self.cell(0, 12, _latin1(title), 0, 1)
+        self.ln(2)
+    
+    def heading(self, text):
+        self.set_font('Arial', 'B', 13)
+        self.set_text_color(51, 51, 51)
+        self.multi_cell(0, 7, _latin1(text))
+        self.ln(1)
+    
+    def paragraph(self, text, style=''):
+        self.set_font('Arial', style, 11)
+        self.set_text_color(51, 51, 51)
+        self.multi_cell(0, 6, _latin1(text))
+        self.ln(3)
+    
+    def place_image(self, file_path, x, y, max_width, max_height):
+        """
+        Draw a cached image centered in a box, scaled to fit without distortion.
+        
+        Returns:
+            float: Height of the drawn image in mm
+        """
+        info = _pdf_image_info(file_path)
+        # Register a copy, because FPDF discards the data of its records after writing them
+        if file_path not in self.images:
+            self.images[file_path] = dict(info, i=len(self.images) + 1)
+        
+        width = max_width
+        height = width * info['h'] / info['w']
+        if height > max_height:
+            height = max_height
+            width = height * info['w'] / info['h']
+        self.image(file_path, x + (max_width - width) / 2, y, width, height)
+        return height
 
 class ExportService:
     """
     Handles exporting generated content to various file formats.
     """
     
-    def __init__(self):
+    # Social post side length (Instagram size) and font sizes
+    POST_SIZE = 1080
+    POST_TITLE_FONT_SIZE = 60
+    POST_BODY_FONT_SIZE = 40
+    
+    # Seconds after its last use that a cached file is never evicted, so a file just handed
+    # to a request, or read by a brand kit render, is still there when it is opened
+    CACHE_IN_USE_SECONDS = 60
+    
+    # File extension each create_* method renders, so cached exports are found by name
+    CACHE_EXTENSIONS = {
+        'email_template': '.html',
+        'social_post': '.png',
+        'brand_kit': '.pdf',
+        'business_description': '.txt'
+    }
+    
+    def __init__(self, http_clients=None, media_store=None, max_workers=4, pdf_image_dpi=150, metrics=None,
+                 cache_max_bytes=256 * 1024 * 1024, cache_ttl=7 * 24 * 60 * 60):
         """
         Initialize the ExportService.
+        
+        Args:
+            http_clients (ProviderClients, optional): Shared pooled HTTP clients
+            media_store (MediaStore, optional): Store that /media image URLs are read from
+            max_workers (int): Threads used to render the assets of a bundle in parallel
+            pdf_image_dpi (int): Resolution images are downsampled to at their printed size in PDFs
+            metrics (Metrics, optional): Registry that render times and export cache use are recorded in
+            cache_max_bytes (int): Size above which least recently used cached exports and PDF image copies are evicted
+            cache_ttl (int): Seconds a cached export is reused after it was last served
         """
         self.export_dir = "exports"
+        self.cache_dir = os.path.join(self.export_dir, "cache")
+        self.http_clients = http_clients or ProviderClients()
+        self.media_store = media_store
+        self.pdf_image_dpi = pdf_image_dpi
+        self.pdf_image_dir = os.path.join(self.cache_dir, "pdf_images")
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_ttl = cache_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        
+        # Renders in progress, so identical concurrent exports are only rendered once
+        self._render_locks = {}
+        self._render_locks_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        
+        self.metrics = metrics or Metrics()
+        self._render_seconds = self.metrics.histogram(
+            "export_render_seconds", "Time to render one export file.", ("export",))
+        self._cache_lookups = self.metrics.counter(
+            "export_cache_lookups", "Export requests served from the export cache or rendered.", ("export", "result"))
+        self._errors = self.metrics.counter(
+            "export_errors", "Exports that failed to render.", ("export",))
+        
+        # Create export directories if they don't exist
+        if not os.path.exists(self.pdf_image_dir):
+            os.makedirs(self.pdf_image_dir)
+    
+    def create_cached(self, create_method, *args):
+        """
+        Render an export once per unique input and reuse the stored file afterwards.
         
-        # Create export directory if it doesn't exist
-        if not os.path.exists(self.export_dir):
-            os.makedirs(self.export_dir)
+        Args:
+            create_method (callable): One of the create_* methods of this service
+            *args: Arguments for create_method; they must be JSON-serializable and
+                include everything that affects the output (content, business data, image URL)
+                
+        Returns:
+            tuple: (file path, content hash usable as an ETag)
+        """
+        key_data = json.dumps({"export": create_method.__name__, "args": args}, sort_keys=True)
+        export = create_method.__name__[len("create_"):]
+        digest = hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+        cached_path = os.path.join(self.cache_dir, f"{digest}{self.CACHE_EXTENSIONS[export]}")
+        
+        with self._render_locks_lock:
+            lock = self._render_locks.setdefault(digest, threading.Lock())
+        
+        try:
+            with lock:
+                try:
+                    if time.time() - os.path.getmtime(cached_path) < self.cache_ttl:
+                        # Mark the export as recently used for eviction
+                        os.utime(cached_path)
+                        self._cache_lookups.inc(export=export, result="hit")
+                        return cached_path, digest
+                except OSError:
+                    pass
+                self._cache_lookups.inc(export=export, result="miss")
+                
+                # Render and move the file into the cache under its content hash
+                try:
+                    with self._render_seconds.time(export=export):
+                        rendered_path = create_method(*args)
+                except Exception:
+                    self._errors.inc(export=export)
+                    raise
+                os.replace(rendered_path, cached_path)
+        finally:
+            with self._render_locks_lock:
+                self._render_locks.pop(digest, None)
+        
+        # Renders only happen once per unique export, so the cache is swept after each one
+        self._evict_cache()
+        
+        return cached_path, digest
+    
+    def _cache_entries(self):
+        """
+        List cached exports and the PDF copies of images as (path, last used, size)
+        tuples, least recently used first.
+        """
+        entries = []
+        for directory in (self.cache_dir, self.pdf_image_dir):
+            for name in os.listdir(directory):
+                file_path = os.path.join(directory, name)
+                if name.endswith('.tmp') or not os.path.isfile(file_path):
+                    continue
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entries.append((file_path, stat.st_mtime, stat.st_size))
+        return sorted(entries, key=lambda entry: entry[1])
     
+    def _evict_cache(self):
+        """
+        Delete expired exports and PDF image copies, then least recently used ones until
+        the cache is under its size limit. Files used in the last CACHE_IN_USE_SECONDS
+        are kept, even if that leaves the cache over its limit for a while.
+        """
+        with self._evict_lock:
+            entries = self._cache_entries()
+            total = sum(entry[2] for entry in entries)
+            now = time.time()
+            expires_before = now - self.cache_ttl
+            for file_path, last_used, size in entries:
+                if total <= self.cache_max_bytes and last_used >= expires_before:
+                    break
+                if last_used > now - self.CACHE_IN_USE_SECONDS:
+                    break
+                try:
+                    os.remove(file_path)
+                    total -= size
+                except OSError:
+                    continue
+    
+    def warm_up(self):
+        """
+        Load the fonts and fallback background social posts are drawn with, ahead of the first export.
+        """
+        _load_font(self.POST_TITLE_FONT_SIZE)
+        _load_font(self.POST_BODY_FONT_SIZE)
+        _gradient_background(self.POST_SIZE)
+    
+    def _file_stamp(self):
+        """
+        Timestamp for rendered file names, with the process and thread, so renders running
+        at the same time in any worker process never write to the same file.
+        """
+        return f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{os.getpid()}_{threading.get_ident()}"
+    
+    def iter_bundle(self, content, business_data, image_url=None, chunk_size=64 * 1024):
+        """
+        Render every exportable asset in parallel and stream them as one ZIP archive.
+        
+        Assets are added in the order they finish rendering, and archive bytes are
+        yielded as soon as they are written, so the archive is never held in full
+        in memory or on disk.
+        
+        Args:
+            content (dict): Generated content with 'description', 'email' and 'social_media'
+            business_data (dict): Business information
+            image_url (str, optional): URL of an image to use as the social post background
+            chunk_size (int): Bytes read from each rendered file at a time
+            
+        Yields:
+            bytes: Consecutive chunks of the ZIP archive
+        """
+        # Archive name and cached render call for each asset
+        renders = {}
+        if content.get('description'):
+            renders["description.txt"] = (self.create_business_description, content['description'], business_data)
+        for email_type in content.get('email') or {}:
+            renders[f"email/{email_type}.html"] = (self.create_email_template, content['email'], business_data, email_type)
+        for platform in content.get('social_media') or {}:
+            renders[f"social/{platform}.png"] = (self.create_social_post, content['social_media'], business_data,
+                                                 image_url, platform)
+        
+        futures = {self._executor.submit(self.create_cached, *args): arcname for arcname, args in renders.items()}
+        
+        stream = _ZipStream()
+        errors = []
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for future in as_completed(futures):
+                arcname = futures[future]
+                # The response has already started, so a failed asset is left out instead of
+                # breaking the archive, and listed in errors.txt
+                try:
+                    file_path, _ = future.result()
+                    source = open(file_path, 'rb')
+                except Exception as e:
+                    print(f"Error adding {arcname} to bundle: {e}")
+                    errors.append(f"{arcname}: {e}")
+                    continue
+                
+                # PNG data is already compressed
+                info = zipfile.ZipInfo(arcname, date_time=datetime.now().timetuple()[:6])
+                info.compress_type = zipfile.ZIP_STORED if arcname.endswith('.png') else zipfile.ZIP_DEFLATED
+                
+                with source, archive.open(info, 'w') as target:
+                    while True:
+                        chunk = source.read(chunk_size)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        yield from stream.drain()
+                yield from stream.drain()
+            
+            if errors:
+                archive.writestr("errors.txt", "These files could not be created:\n" + "\n".join(errors) + "\n")
+                yield from stream.drain()
+        
+        # Central directory written when the archive closes
+        yield from stream.drain()
     
-    def create_email_template(self, email_content, business_data):
+    def create_email_template(self, email_content, business_data, email_type=None):
         """
         Create an HTML email template.
         
         Args:
             email_content (dict): Generated email content
             business_data (dict): Business information
+            email_type (str, optional): Template to export; defaults to the first one
             
         Returns:
             str: Path to the created HTML file
         """
         # Determine which email template to use
-        email_type = list(email_content.keys())[0] if email_content else "welcome"
+        if email_type is None:
+            email_type = list(email_content.keys())[0] if email_content else "welcome"
         email_data = email_content.get(email_type, {})
         
         # Create HTML content
@@ -109,7 +468,7 @@ class ExportService:
         """
         
         # Generate filename and save
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        timestamp = self._file_stamp()
         filename = f"{business_data['name'].replace(' ', '_')}_{timestamp}_{email_type}_email.html"
         file_path = os.path.join(self.export_dir, filename)
         
@@ -118,7 +477,7 @@ class ExportService:
         
         return file_path
     
-    def create_social_post(self, social_content, business_data, image_url=None):
+    def create_social_post(self, social_content, business_data, image_url=None, platform=None):
         """
         Create a social media post image with text overlay.
         
@@ -126,72 +485,80 @@ class ExportService:
             social_content (dict): Generated social media content
             business_data (dict): Business information
             image_url (str, optional): URL of an image to use as background
+            platform (str, optional): Platform to export; defaults to the first one
             
         Returns:
             str: Path to the created image file
         """
         # Determine which social platform to use
-        platform = list(social_content.keys())[0] if social_content else "instagram"
+        if platform is None:
+            platform = list(social_content.keys())[0] if social_content else "instagram"
         post_text = social_content.get(platform, "")
         
-        # Create image
-        width, height = 1080, 1080  # Instagram size
+        # Parsed content holds several posts per platform, use the first one
+        if isinstance(post_text, list):
+            post_text = post_text[0] if post_text else ""
         
-        # Start with a background image if provided, otherwise create a blank one
+        size = self.POST_SIZE
+        
+        # Start with a background image if provided, otherwise use a gradient
+        background = None
         if image_url:
             try:
-                # Download image
-                response = requests.get(image_url)
-                if response.status_code == 200:
-                    img = Image.open(io.BytesIO(response.content))
-                    
-                    # Resize and crop to square
-                    img_ratio = img.width / img.height
-                    if img_ratio > 1:
-                        # Image is wider than tall
-                        new_width = int(height * img_ratio)
-                        img = img.resize((new_width, height), Image.LANCZOS)
-                        left = (new_width - width) // 2
-                        img = img.crop((left, 0, left + width, height))
-                    else:
-                        # Image is taller than wide
-                        new_height = int(width / img_ratio)
-                        img = img.resize((width, new_height), Image.LANCZOS)
-                        top = (new_height - height) // 2
-                        img = img.crop((0, top, width, top + height))
+                image_bytes = self._load_image(image_url)
+                if not image_bytes:
+                    raise Exception("Background image could not be loaded")
+                background = _fill_square(Image.open(io.BytesIO(image_bytes)), size)
             except Exception as e:
                 print(f"Error processing image for social post: {e}")
                 # Create a blank image if there's an error
-                img = Image.new('RGB', (width, height), color=(240, 240, 240))
+                background = Image.new('RGB', (size, size), color=(240, 240, 240))
+        
+        img = self.render_social_post(post_text, business_data['name'], background, size)
+        
+        # Generate filename and save
+        timestamp = self._file_stamp()
+        filename = f"{business_data['name'].replace(' ', '_')}_{timestamp}_{platform}_post.png"
+        file_path = os.path.join(self.export_dir, filename)
+        img.save(file_path)
+        
+        return file_path
+    
+    def render_social_post(self, post_text, business_name, background=None, size=1080):
+        """
+        Render a square social media post image.
+        
+        Args:
+            post_text (str): Post text shown on the lower half
+            business_name (str): Name shown at the top
+            background (PIL.Image.Image, optional): Image cropped to fill the post; a
+                gradient is used if None
+            size (int): Width and height in pixels
+            
+        Returns:
+            PIL.Image.Image: The rendered RGB image
+        """
+        width, height = size, size
+        
+        if background is not None:
+            if background.size == (size, size) and background.mode == 'RGB':
+                img = background.copy()
+            else:
+                img = _fill_square(background, size)
         else:
-            # Create a blank image with a gradient background
-            img = Image.new('RGB', (width, height), color=(240, 240, 240))
-            draw = ImageDraw.Draw(img)
-            for y in range(height):
-                r = int(220 + (y / height) * 35)
-                g = int(220 + (y / height) * 35)
-                b = int(240 - (y / height) * 40)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-        
-        # Add semi-transparent overlay to make text more readable
-        overlay = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-        draw.rectangle([(0, height//2), (width, height)], fill=(0, 0, 0, 128))
-        img = Image.alpha_composite(img.convert('RGBA'), overlay).convert('RGB')
+            img = _gradient_background(size).copy()
+        
+        # Darken the lower half to make text more readable, the same as a 50% black overlay
+        lower_half = (0, height // 2, width, height)
+        img.paste(img.crop(lower_half).point(_HALF_SHADE_LUT), lower_half)
         
         # Add text
         draw = ImageDraw.Draw(img)
-        
-        # Try to load a font, fall back to default if not available
-        try:
-            title_font = ImageFont.truetype("Arial.ttf", 60)
-            body_font = ImageFont.truetype("Arial.ttf", 40)
-        except IOError:
-            title_font = ImageFont.load_default()
-            body_font = ImageFont.load_default()
+        title_font = _load_font(self.POST_TITLE_FONT_SIZE)
+        body_font = _load_font(self.POST_BODY_FONT_SIZE)
         
         # Add business name at the top
-        draw.text((width//2, 100), business_data['name'], fill=(255, 255, 255), font=title_font, anchor="mm")
+        draw.text((width//2, 100), business_name, fill=(255, 255, 255), font=title_font, anchor="mm")
         
         # Add post text in the middle
         # Wrap text to fit width
@@ -203,13 +570,24 @@ class ExportService:
                 draw.text((width//2, y_position), line, fill=(255, 255, 255), font=body_font, anchor="mm")
                 y_position += 50
         
-        # Generate filename and save
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{business_data['name'].replace(' ', '_')}_{timestamp}_{platform}_post.png"
-        file_path = os.path.join(self.export_dir, filename)
-        img.save(file_path)
+        return img
+    
+    def _load_image(self, image_url):
+        """
+        Load image bytes from the media store, or download them.
         
-        return file_path
+        Args:
+            image_url (str): Image URL
+            
+        Returns:
+            bytes: Image content, or None if it could not be loaded
+        """
+        media_id = self.media_store.media_id_from_url(image_url) if self.media_store else None
+        if media_id:
+            return self.media_store.read(media_id)
+        
+        response = self.http_clients.get("download", image_url)
+        return response.content if response.status_code == 200 else None
     
     def create_business_description(self, description_content, business_data):
         """
@@ -234,11 +612,160 @@ LONG DESCRIPTION:\n{description_content.get('long', '')}\n\n
 Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n"""
         
         # Generate filename and save
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        timestamp = self._file_stamp()
         filename = f"{business_data['name'].replace(' ', '_')}_{timestamp}_description.txt"
         file_path = os.path.join(self.export_dir, filename)
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        return file_path
\ No newline at end of file
+        return file_path
+    
+    def create_brand_kit(self, content, business_data, image_urls=None):
+        """
+        Create a multi-page PDF brand kit with the descriptions, email templates,
+        social media posts and images.
+        
+        Args:
+            content (dict): Generated content with 'description', 'email' and 'social_media'
+            business_data (dict): Business information
+            image_urls (list, optional): URLs of the generated images; the first one is the cover image
+            
+        Returns:
+            str: Path to the created PDF file
+        """
+        image_urls = image_urls or []
+        pdf = _BrandKitPDF(business_data['name'])
+        width = pdf.CONTENT_WIDTH
+        
+        # Cover page
+        pdf.add_page()
+        pdf.set_font('Arial', 'B', 28)
+        pdf.set_text_color(51, 51, 51)
+        pdf.multi_cell(0, 12, _latin1(business_data['name']), 0, 'C')
+        pdf.set_font('Arial', '', 14)
+        pdf.cell(0, 10, _latin1(f"{business_data['type']} in {business_data['location']}"), 0, 1, 'C')
+        pdf.ln(6)
+        
+        cover_image = self._print_image(image_urls[0], width) if image_urls else None
+        if cover_image:
+            pdf.set_y(pdf.get_y() + pdf.place_image(cover_image, pdf.MARGIN, pdf.get_y(), width, 120) + 8)
+        
+        pdf.paragraph(f"Target Audience: {business_data['target_audience']}")
+        pdf.paragraph(f"Brand Style: {business_data['style_preference']}")
+        
+        # Descriptions
+        description = content.get('description') or {}
+        pdf.add_page()
+        pdf.section_title("Business Descriptions")
+        for length in ('short', 'medium', 'long'):
+            if description.get(length):
+                pdf.heading(f"{length.capitalize()} Description")
+                pdf.paragraph(description[length])
+        
+        # Email templates
+        emails = content.get('email') or {}
+        if emails:
+            pdf.add_page()
+            pdf.section_title("Email Templates")
+            for email_type, email_data in emails.items():
+                pdf.heading(f"{email_type.capitalize()} Email: {email_data.get('subject', '')}")
+                pdf.paragraph(email_data.get('greeting', 'Hello,'))
+                pdf.paragraph(email_data.get('body', ''))
+                pdf.paragraph(email_data.get('cta', 'Learn More'), 'B')
+                pdf.paragraph(f"{email_data.get('sign_off', 'Best regards,')}\n{business_data['name']} Team")
+        
+        # Social media posts
+        social = content.get('social_media') or {}
+        if social:
+            pdf.add_page()
+            pdf.section_title("Social Media Posts")
+            for platform, posts in social.items():
+                pdf.heading(platform.capitalize())
+                for post in (posts if isinstance(posts, list) else [posts]):
+                    pdf.paragraph(post)
+        
+        # Image gallery, two per row
+        gallery = [path for path in (self._print_image(url, width / 2) for url in image_urls) if path]
+        if gallery:
+            pdf.add_page()
+            pdf.section_title("Brand Images")
+            column_width = (width - 6) / 2
+            for index in range(0, len(gallery), 2):
+                y = pdf.get_y()
+                if y + 90 > pdf.h - pdf.MARGIN:
+                    pdf.add_page()
+                    y = pdf.get_y()
+                heights = [pdf.place_image(path, pdf.MARGIN + column * (column_width + 6), y, column_width, 90)
+                           for column, path in enumerate(gallery[index:index + 2])]
+                pdf.set_y(y + max(heights) + 6)
+        
+        # Generate filename and save
+        timestamp = self._file_stamp()
+        filename = f"{business_data['name'].replace(' ', '_')}_{timestamp}_brand_kit.pdf"
+        file_path = os.path.join(self.export_dir, filename)
+        pdf.output(file_path, 'F')
+        
+        return file_path
+    
+    def _print_image(self, image_url, width_mm):
+        """
+        Get a JPEG copy of an image downsampled to the configured DPI at its printed
+        width, creating and caching it on first use.
+        
+        Args:
+            image_url (str): Image URL
+            width_mm (float): Width the image is printed at, in millimetres
+            
+        Returns:
+            str: Path to the JPEG, or None if the image could not be loaded
+        """
+        max_pixels = int(width_mm / 25.4 * self.pdf_image_dpi)
+        digest = hashlib.sha256(f"{image_url}|{max_pixels}".encode('utf-8')).hexdigest()
+        file_path = os.path.join(self.pdf_image_dir, f"{digest}.jpg")
+        try:
+            # Mark the copy as recently used for eviction
+            os.utime(file_path)
+            return file_path
+        except OSError:
+            pass
+        
+        try:
+            image_bytes = self._load_image(image_url)
+            if not image_bytes:
+                raise Exception("Image could not be loaded")
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                img.draft('RGB', (max_pixels, max_pixels))
+                img = img.convert('RGB')
+                img.thumbnail((max_pixels, max_pixels), Image.LANCZOS, reducing_gap=2.0)
+                temp_path = f"{file_path}.{os.getpid()}_{threading.get_ident()}.tmp"
+                img.save(temp_path, 'JPEG', quality=85, optimize=True)
+            os.replace(temp_path, file_path)
+            return file_path
+        except Exception as e:
+            print(f"Error preparing image for PDF: {e}")
+            return None
+
+
+class _ZipStream:
+    """
+    Write-only file object that collects ZIP output until it is drained. It cannot
+    seek, so zipfile writes sizes after each entry instead of going back to patch them.
+    """
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        """
+        Hand over and forget everything written so far.
+        """
+        chunks, self._chunks = self._chunks, []
+        return chunks
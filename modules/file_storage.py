@@ -1,27 +1,38 @@
 # File Storage Module
 
-import requests
 import json
 import os
 import base64
 from datetime import datetime
+from modules.http_client import ProviderClients
+from modules.metrics import Metrics
 
 class FileStorage:
     """
     Handles file storage and retrieval using TinyCloud API.
     """
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, http_clients=None, metrics=None, api_url="https://api.tinycloud.com/v1"):
         """
         Initialize the FileStorage with API key.
         
         Args:
             api_key (str): TinyCloud API key
+            http_clients (ProviderClients, optional): Shared pooled HTTP clients
+            metrics (Metrics, optional): Registry that storage operations are recorded in
+            api_url (str): Base URL of the TinyCloud API
         """
         self.api_key = api_key
-        self.api_url = "https://api.tinycloud.com/v1"
+        self.http_clients = http_clients or ProviderClients()
+        self.api_url = api_url
         self.local_storage_path = "storage"
         
+        self.metrics = metrics or Metrics()
+        self._operation_seconds = self.metrics.histogram(
+            "storage_operation_seconds", "Time taken by one file storage operation.", ("operation", "backend"))
+        self._errors = self.metrics.counter(
+            "storage_errors", "File storage operations that failed.", ("operation", "backend"))
+        
         # Create local storage directory if it doesn't exist
         if not os.path.exists(self.local_storage_path):
             os.makedirs(self.local_storage_path)
@@ -40,11 +51,14 @@ class FileStorage:
         """
         try:
             # Try to store using TinyCloud API
-            return self._store_with_tinycloud(file_data, file_name, file_type)
+            with self._operation_seconds.time(operation="store", backend="tinycloud"):
+                return self._store_with_tinycloud(file_data, file_name, file_type)
         except Exception as e:
             print(f"Error storing file with TinyCloud: {e}")
+            self._errors.inc(operation="store", backend="tinycloud")
             # Fall back to local storage
-            return self._store_locally(file_data, file_name)
+            with self._operation_seconds.time(operation="store", backend="local"):
+                return self._store_locally(file_data, file_name)
     
     def _store_with_tinycloud(self, file_data, file_name, file_type):
         """
@@ -74,7 +88,7 @@ class FileStorage:
         }
         
         # Make API request
-        response = requests.post(f"{self.api_url}/files", headers=headers, json=data)
+        response = self.http_clients.post("tinycloud", f"{self.api_url}/files", headers=headers, json=data)
         
         if response.status_code == 200 or response.status_code == 201:
             result = response.json()
@@ -116,18 +130,20 @@ class FileStorage:
         """
         # Check if it's a local file path
         if os.path.exists(file_url):
-            with open(file_url, 'rb') as f:
+            with self._operation_seconds.time(operation="get", backend="local"), open(file_url, 'rb') as f:
                 return f.read()
         
         # Otherwise, try to download from URL
         try:
-            response = requests.get(file_url)
+            with self._operation_seconds.time(operation="get", backend="tinycloud"):
+                response = self.http_clients.get("tinycloud", file_url)
             if response.status_code == 200:
                 return response.content
             else:
                 raise Exception(f"Error downloading file: {response.status_code}")
         except Exception as e:
             print(f"Error retrieving file: {e}")
+            self._errors.inc(operation="get", backend="tinycloud")
             return None
     
     def delete_file(self, file_url):
@@ -143,10 +159,12 @@ class FileStorage:
         # Check if it's a local file path
         if os.path.exists(file_url):
             try:
-                os.remove(file_url)
+                with self._operation_seconds.time(operation="delete", backend="local"):
+                    os.remove(file_url)
                 return True
             except Exception as e:
                 print(f"Error deleting local file: {e}")
+                self._errors.inc(operation="delete", backend="local")
                 return False
         
         # Otherwise, try to delete from TinyCloud
@@ -158,9 +176,14 @@ class FileStorage:
                 "Authorization": f"Bearer {self.api_key}"
             }
             
-            response = requests.delete(f"{self.api_url}/files/{file_id}", headers=headers)
+            with self._operation_seconds.time(operation="delete", backend="tinycloud"):
+                response = self.http_clients.delete("tinycloud", f"{self.api_url}/files/{file_id}", headers=headers)
             
-            return response.status_code == 200 or response.status_code == 204
+            if response.status_code == 200 or response.status_code == 204:
+                return True
+            self._errors.inc(operation="delete", backend="tinycloud")
+            return False
         except Exception as e:
             print(f"Error deleting file from TinyCloud: {e}")
+            self._errors.inc(operation="delete", backend="tinycloud")
             return False
\ No newline at end of file
@@ -0,0 +1,161 @@
+# Generation Pipeline Module
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from modules.metrics import Metrics
+
+class GenerationPipeline:
+    """
+    Runs business processing, content generation and image acquisition for a single submission.
+    """
+
+    # Stages reported to progress callbacks, in the order they usually finish
+    STAGES = ["processing", "description", "email", "social_media", "images"]
+
+    def __init__(self, business_processor, content_generator, image_service, max_workers=8, request_timeout=90, image_count=3,
+                 metrics=None, image_pool=None):
+        """
+        Initialize the GenerationPipeline with the services it coordinates.
+
+        Args:
+            business_processor (BusinessProcessor): Processes raw business information
+            content_generator (ContentGenerator): Generates the marketing copy
+            image_service (ImageService): Acquires images for the business
+            max_workers (int): Size of the thread pool used for image acquisition
+            request_timeout (float): Deadline in seconds for the whole generation
+            image_count (int): Number of images to acquire
+            metrics (Metrics, optional): Registry that stage durations are recorded in
+            image_pool (ImagePool, optional): Pool of pre-generated images new generations are served from
+        """
+        self.business_processor = business_processor
+        self.content_generator = content_generator
+        self.image_service = image_service
+        self.image_pool = image_pool
+        self.request_timeout = request_timeout
+        self.image_count = image_count
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+
+        self.metrics = metrics or Metrics()
+        self._stage_seconds = self.metrics.histogram(
+            "generation_stage_seconds", "Time taken by each generation stage.", ("stage",))
+        self._generation_seconds = self.metrics.histogram(
+            "generation_seconds", "Time to generate all content and images for one submission.")
+
+    def run(self, business_data, on_stage=None, on_delta=None, use_cache=True):
+        """
+        Generate content and images for a business.
+
+        Images only depend on the business type and style preference, so they are
+        requested at the same time as the text and both are joined under one deadline.
+
+        Args:
+            business_data (dict): Raw business information from the form
+            on_stage (callable, optional): Called with (stage, data) as each stage in
+                STAGES finishes
+            on_delta (callable, optional): Called with (section, text) as generated
+                text streams in
+            use_cache (bool): Reuse cached completions; False forces fresh text
+
+        Returns:
+            dict: Generated 'content' and 'images', and 'fallbacks', the sorted names of
+                content sections that were replaced by fallback content
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.request_timeout
+
+        # Start image acquisition before any text work
+        image_future = self._executor.submit(self._acquire_images, business_data, deadline, on_stage)
+
+        # Generate the text in the calling thread
+        with self._stage_seconds.time(stage="processing"):
+            processed_data = self.business_processor.process(business_data)
+        if on_stage:
+            on_stage("processing", None)
+        fallbacks = set()
+        with self._stage_seconds.time(stage="content"):
+            content = self.content_generator.generate(processed_data, deadline=deadline, on_section=on_stage,
+                                                      on_delta=on_delta, use_cache=use_cache, fallbacks=fallbacks)
+
+        images = self._join_images(image_future, deadline)
+        self._generation_seconds.observe(time.perf_counter() - started)
+        return {
+            "content": content,
+            "images": images,
+            "fallbacks": sorted(fallbacks)
+        }
+
+    def regenerate(self, business_data, section, key=None):
+        """
+        Generate one section of an existing generation again, leaving the rest alone.
+
+        Args:
+            business_data (dict): Raw business information the generation was made from
+            section (str): 'images' or a content section name
+            key (str, optional): Single piece of the content section to regenerate,
+                e.g. an email type or social platform
+
+        Returns:
+            list or dict: New images, or key to new content for the regenerated pieces
+
+        Raises:
+            Exception: If fewer images than requested could be acquired, or the content
+                could not be regenerated
+        """
+        # Regenerated images always come from the image service, since pooled ones may
+        # have been generated for the same business type before
+        if section == "images":
+            images = self.image_service.get_images(
+                business_data['type'],
+                business_data['style_preference'],
+                self.image_count
+            )
+            # The providers report failures as missing images, so a short result must not replace the stored ones
+            if len(images) < self.image_count:
+                raise Exception(f"Only {len(images)} of {self.image_count} images could be generated")
+            return images
+
+        processed_data = self.business_processor.process(business_data)
+        return self.content_generator.regenerate(processed_data, section, [key] if key else None)
+
+    def _acquire_images(self, business_data, deadline, on_stage=None):
+        """
+        Fetch images for a business and report them if they arrive in time.
+
+        Args:
+            business_data (dict): Raw business information from the form
+            deadline (float): Monotonic time by which the images must be ready
+            on_stage (callable, optional): Progress callback for the 'images' stage
+
+        Returns:
+            list: Acquired images
+        """
+        with self._stage_seconds.time(stage="images"):
+            images = (self.image_pool or self.image_service).get_images(
+                business_data['type'],
+                business_data['style_preference'],
+                self.image_count,
+                deadline=deadline
+            )
+        if on_stage and time.monotonic() <= deadline:
+            on_stage("images", images)
+        return images
+
+    def _join_images(self, image_future, deadline):
+        """
+        Wait for image acquisition until the request deadline.
+
+        Args:
+            image_future (Future): Pending image acquisition
+            deadline (float): Monotonic time by which the images must be ready
+
+        Returns:
+            list: Acquired images, or an empty list on failure or timeout
+        """
+        try:
+            return image_future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            image_future.cancel()
+            print(f"Timed out fetching images after {self.request_timeout}s")
+        except Exception as e:
+            print(f"Error fetching images: {e}")
+        return []
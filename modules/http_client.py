@@ -0,0 +1,345 @@
+# HTTP Client Module
+
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from modules.rate_limiter import TokenBucket
+from modules.circuit_breaker import CircuitBreaker
+from modules.cassette import Cassette, RecordingAdapter, ReplayAdapter
+
+class RateLimitError(requests.RequestException):
+    """
+    Raised when a provider's rate limit leaves no room for a request before its deadline.
+    """
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised instead of calling a provider whose circuit breaker is open.
+    """
+
+class ProviderClients:
+    """
+    Process-wide HTTP client layer with a keep-alive connection pool per upstream provider.
+    """
+
+    # Responses that mean the request was not processed and may be sent again
+    RETRY_STATUSES = (429, 503)
+
+    def __init__(self, pool_size=10, connect_timeout=5, read_timeout=60, read_timeouts=None,
+                 rate_limits=None, max_retries=3, backoff_base=0.5, backoff_max=8, retry_budget=30, breaker_settings=None,
+                 cassette_mode=None, cassette_dir="storage/cassettes", replay_speed=1.0):
+        """
+        Initialize the ProviderClients.
+
+        Args:
+            pool_size (int): Keep-alive connections kept per provider host
+            connect_timeout (float): Seconds allowed to establish a connection
+            read_timeout (float): Seconds allowed between bytes of a response
+            read_timeouts (dict, optional): Per-provider read timeout overrides
+            rate_limits (dict, optional): Per-provider (requests per second, burst) limits;
+                providers without one are not limited
+            max_retries (int): Retries after a 429 or 503 response
+            backoff_base (float): First retry delay in seconds, doubled on every retry
+            backoff_max (float): Longest delay between retries in seconds
+            retry_budget (float): Seconds a request may spend waiting and retrying when
+                the caller gives no deadline
+            breaker_settings (dict, optional): CircuitBreaker arguments used for every provider
+            cassette_mode (str, optional): 'record' to save every upstream interaction to a
+                cassette per provider, 'replay' to answer requests from those cassettes
+                instead of the network; None talks to the providers as usual
+            cassette_dir (str): Directory holding one <provider>.jsonl cassette per provider
+            replay_speed (float): Factor applied to recorded timing when replaying; 0 replays
+                without delays
+        """
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.read_timeouts = read_timeouts or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+        self.breaker_settings = breaker_settings or {}
+        self._breakers = {}
+        self._limiters = {provider: TokenBucket(rate, burst) for provider, (rate, burst) in (rate_limits or {}).items()}
+        if cassette_mode not in (None, "record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {cassette_mode}")
+        self.cassette_mode = cassette_mode
+        self.cassette_dir = cassette_dir
+        self.replay_speed = replay_speed
+
+        self._sessions = {}
+        self._counters = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def set_rate_limits(self, rate_limits):
+        """
+        Replace the per-provider rate limits, e.g. with one server process's share of them.
+
+        Args:
+            rate_limits (dict): Provider name to (requests per second, burst size)
+        """
+        limiters = {provider: TokenBucket(rate, burst) for provider, (rate, burst) in rate_limits.items()}
+        with self._lock:
+            self._limiters = limiters
+
+    def session(self, provider):
+        """
+        Get the pooled session for a provider, creating it on first use.
+
+        Args:
+            provider (str): Provider name, e.g. 'nvidia' or 'stability'
+
+        Returns:
+            requests.Session: Session shared by every caller of this provider
+        """
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                session = requests.Session()
+                adapter = self._adapter(provider)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.hooks['response'].append(lambda response, *args, **kwargs: self._record(provider, response))
+                self._sessions[provider] = session
+                self._breakers[provider] = CircuitBreaker(**self.breaker_settings)
+                self._counters[provider] = {"requests": 0, "errors": 0, "retries": 0}
+            return session
+
+    def request(self, provider, method, url, deadline=None, **kwargs):
+        """
+        Send a request through a provider's pooled session.
+
+        The request waits for the provider's rate limit. A 429 or 503 response is
+        retried after the delay the provider asks for in Retry-After, or with
+        jittered exponential backoff, as long as that fits before the deadline.
+        Connection errors, timeouts and 5xx responses count against the provider's
+        circuit breaker, while a 429 counts neither way. While the breaker is open the
+        request fails at once, before waiting for the rate limit.
+
+        Args:
+            provider (str): Provider name
+            method (str): HTTP method
+            url (str): Request URL
+            deadline (float, optional): Monotonic time by which retries must be sent;
+                defaults to retry_budget seconds from now
+            **kwargs: Passed to requests; a (connect, read) timeout is applied unless given
+
+        Returns:
+            requests.Response: The response; the last one if every retry was rejected
+
+        Raises:
+            RateLimitError: If the rate limit allows no request before the deadline
+            CircuitOpenError: If the provider's circuit breaker is open
+        """
+        kwargs.setdefault("timeout", self.timeout(provider))
+        if deadline is None:
+            deadline = time.monotonic() + self.retry_budget
+        session = self.session(provider)
+        limiter = self._limiters.get(provider)
+        breaker = self._breakers[provider]
+
+        attempt = 0
+        while True:
+            # Check the breaker first, so calls to an unavailable provider neither wait for nor use up rate limit tokens
+            if not breaker.allow():
+                raise CircuitOpenError(f"{provider} is unavailable, circuit breaker is open")
+            if limiter and not limiter.acquire(deadline):
+                breaker.release()
+                with self._lock:
+                    self._counters[provider]["errors"] += 1
+                raise RateLimitError(f"{provider} rate limit reached before the request deadline")
+            try:
+                response = session.request(method, url, **kwargs)
+            except Exception:
+                breaker.record_failure()
+                with self._lock:
+                    self._counters[provider]["errors"] += 1
+                raise
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            elif response.status_code == 429:
+                # Being rate limited says nothing about whether the provider is healthy
+                breaker.release()
+            else:
+                breaker.record_success()
+
+            retry_after = self._retry_after(response)
+            if limiter and retry_after is not None:
+                # Every thread waits, not only this one
+                limiter.pause(retry_after)
+            if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                return self._final(provider, response)
+
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            if time.monotonic() + delay > deadline:
+                return self._final(provider, response)
+            response.close()
+            with self._lock:
+                self._counters[provider]["retries"] += 1
+            attempt += 1
+            # A paused limiter already holds the next attempt back
+            if not (limiter and retry_after is not None):
+                time.sleep(delay)
+
+    def _final(self, provider, response):
+        """
+        Count a server error handed back to the caller once retries are over.
+        """
+        if response.status_code >= 500:
+            with self._lock:
+                self._counters[provider]["errors"] += 1
+        return response
+
+    def get(self, provider, url, **kwargs):
+        return self.request(provider, "GET", url, **kwargs)
+
+    def post(self, provider, url, **kwargs):
+        return self.request(provider, "POST", url, **kwargs)
+
+    def delete(self, provider, url, **kwargs):
+        return self.request(provider, "DELETE", url, **kwargs)
+
+    def timeout(self, provider):
+        """
+        Get the (connect, read) timeout used for a provider.
+
+        Args:
+            provider (str): Provider name
+
+        Returns:
+            tuple: Connect and read timeouts in seconds
+        """
+        return (self.connect_timeout, self.read_timeouts.get(provider, self.read_timeout))
+
+    def breaker_status(self):
+        """
+        Report the circuit breaker state of every provider used so far.
+
+        Returns:
+            dict: Per-provider breaker snapshots, see CircuitBreaker.to_dict()
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {provider: breaker.to_dict() for provider, breaker in breakers.items()}
+
+    def add_hook(self, callback):
+        """
+        Register a callback invoked as callback(provider, response) after every response.
+
+        Args:
+            callback (callable): Hook to register
+        """
+        with self._lock:
+            self._hooks.append(callback)
+
+    def stats(self):
+        """
+        Report request counts and connection reuse per provider.
+
+        Returns:
+            dict: Per-provider requests, errors, connections opened and reuse ratio
+        """
+        with self._lock:
+            report = {}
+            for provider, session in self._sessions.items():
+                connections = 0
+                pooled_requests = 0
+                for adapter in set(session.adapters.values()):
+                    # Replayed sessions have no connections
+                    if not hasattr(adapter, "poolmanager"):
+                        continue
+                    pools = adapter.poolmanager.pools
+                    for key in pools.keys():
+                        pool = pools.get(key)
+                        if pool is not None:
+                            connections += pool.num_connections
+                            pooled_requests += pool.num_requests
+                counters = self._counters[provider]
+                limiter = self._limiters.get(provider)
+                report[provider] = {
+                    "requests": counters["requests"],
+                    "errors": counters["errors"],
+                    "retries": counters["retries"],
+                    "rate_limited_waits": limiter.waits if limiter else 0,
+                    "connections_opened": connections,
+                    "connection_reuse_ratio": round(1 - connections / pooled_requests, 3) if pooled_requests else 0.0
+                }
+            return report
+
+    def _adapter(self, provider):
+        """
+        Build the transport adapter for a provider's session, taking the cassette mode into account.
+        """
+        if self.cassette_mode is None:
+            return HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        cassette = Cassette(os.path.join(self.cassette_dir, f"{provider}.jsonl"))
+        if self.cassette_mode == "replay":
+            return ReplayAdapter(cassette, speed=self.replay_speed)
+        return RecordingAdapter(cassette, pool_connections=4, pool_maxsize=self.pool_size)
+
+    def _backoff(self, attempt):
+        """
+        Retry delay with full jitter, so threads rejected together do not retry together.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retry_after(self, response):
+        """
+        Work out how long the provider wants us to wait before the next request.
+
+        Uses Retry-After (seconds or an HTTP date), or the X-RateLimit-Reset headers
+        once X-RateLimit-Remaining reaches zero.
+
+        Returns:
+            float: Seconds to wait, or None if the response asks for no pause
+        """
+        headers = response.headers
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                try:
+                    return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+                except (TypeError, ValueError):
+                    pass
+
+        remaining = headers.get("X-RateLimit-Remaining") or headers.get("X-RateLimit-Remaining-Requests")
+        if remaining is None or remaining.strip() != "0":
+            return None
+        reset = headers.get("X-RateLimit-Reset") or headers.get("X-RateLimit-Reset-Requests")
+        if not reset:
+            return None
+        try:
+            value = float(reset)
+            # Either an epoch timestamp or seconds from now
+            return max(value - time.time(), 0.0) if value > 1e9 else value
+        except ValueError:
+            return self._parse_duration(reset)
+
+    def _parse_duration(self, text):
+        """
+        Parse durations such as '1m30s', '6s' or '250ms' into seconds.
+        """
+        units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+        parts = re.findall(r'([\d.]+)(ms|h|m|s)', text)
+        return sum(float(number) * units[unit] for number, unit in parts) if parts else None
+
+    def _record(self, provider, response):
+        with self._lock:
+            self._counters[provider]["requests"] += 1
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                hook(provider, response)
+            except Exception as e:
+                print(f"Error in HTTP client hook: {e}")
+        return response
@@ -0,0 +1,192 @@
+# Image Pool Module
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+class ImagePool:
+    """
+    Keeps ready-made images for every business type and style combination on local disk.
+    """
+
+    def __init__(self, image_service, pool_dir="storage/image_pool", pool_size=3, ttl=7 * 24 * 60 * 60, refill_workers=2):
+        """
+        Initialize the ImagePool.
+
+        Args:
+            image_service (ImageService): Service used to generate new images
+            pool_dir (str): Directory holding one folder of images per combination
+            pool_size (int): Images kept ready per combination
+            ttl (int): Seconds a pooled image may be served before it is replaced
+            refill_workers (int): Threads used to refill the pool in the background
+        """
+        self.image_service = image_service
+        self.pool_dir = pool_dir
+        self.pool_size = pool_size
+        self.ttl = ttl
+
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refill_workers, thread_name_prefix="image-pool")
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.exists(self.pool_dir):
+            os.makedirs(self.pool_dir)
+
+    def get_images(self, business_type, style_preference, count=3, deadline=None):
+        """
+        Serve images from the pool, generating any shortfall live.
+
+        Args:
+            business_type (str): Type of business
+            style_preference (str): Preferred style
+            count (int): Number of images to return
+            deadline (float, optional): Monotonic time by which live generation retries must end
+
+        Returns:
+            list: List of image metadata, in the same format as ImageService.get_images
+        """
+        images = self._take(business_type, style_preference, count)
+
+        with self._lock:
+            self.hits += len(images)
+            self.misses += count - len(images)
+
+        if len(images) < count:
+            images += self.image_service.get_images(business_type, style_preference, count - len(images), deadline)
+
+        # Replace what was just used
+        self.schedule_refill(business_type, style_preference)
+        return images[:count]
+
+    def schedule_refill(self, business_type, style_preference):
+        """
+        Top the pool up for a combination in the background, unless already in progress.
+
+        Args:
+            business_type (str): Type of business
+            style_preference (str): Preferred style
+
+        Returns:
+            Future: The pending refill, or None if one is already running
+        """
+        combo = (business_type, style_preference)
+        with self._lock:
+            if combo in self._refilling:
+                return None
+            self._refilling.add(combo)
+        return self._executor.submit(self._refill, business_type, style_preference)
+
+    def warm(self, business_types, style_preferences):
+        """
+        Fill the pool for every combination ahead of time and wait for it to finish.
+
+        Args:
+            business_types (list): Business types to fill
+            style_preferences (list): Style preferences to fill
+
+        Returns:
+            int: Number of images added to the pool
+        """
+        futures = [self.schedule_refill(business_type, style)
+                   for business_type in business_types
+                   for style in style_preferences]
+        return sum(future.result() for future in futures if future is not None)
+
+    def stats(self):
+        """
+        Report how often requests were served from the pool.
+
+        Returns:
+            dict: Pooled image hits and misses and the number of images ready
+        """
+        ready = 0
+        for name in os.listdir(self.pool_dir):
+            combo_dir = os.path.join(self.pool_dir, name)
+            if os.path.isdir(combo_dir):
+                ready += sum(1 for entry in os.listdir(combo_dir) if entry.endswith('.json'))
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "ready": ready}
+
+    def _combo_dir(self, business_type, style_preference):
+        slug = re.sub(r'[^a-z0-9]+', '-', f"{business_type}__{style_preference}".lower()).strip('-')
+        combo_dir = os.path.join(self.pool_dir, slug)
+        if not os.path.exists(combo_dir):
+            os.makedirs(combo_dir, exist_ok=True)
+        return combo_dir
+
+    def _fresh_entries(self, combo_dir):
+        """
+        List pooled image files oldest first, deleting any that have expired.
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(combo_dir):
+            if not name.endswith('.json'):
+                continue
+            file_path = os.path.join(combo_dir, name)
+            try:
+                mtime = os.path.getmtime(file_path)
+                if now - mtime > self.ttl:
+                    os.remove(file_path)
+                    continue
+            except OSError:
+                continue
+            entries.append((mtime, file_path))
+        return [file_path for _, file_path in sorted(entries)]
+
+    def _take(self, business_type, style_preference, count):
+        """
+        Claim up to count images from the pool. Each file is renamed before reading so
+        concurrent requests, even from other processes, never receive the same image.
+        """
+        images = []
+        for file_path in self._fresh_entries(self._combo_dir(business_type, style_preference)):
+            if len(images) >= count:
+                break
+            claimed_path = f"{file_path}.{uuid.uuid4().hex}.claimed"
+            try:
+                os.rename(file_path, claimed_path)
+            except OSError:
+                continue
+            try:
+                with open(claimed_path, 'r', encoding='utf-8') as f:
+                    images.append(json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Error reading pooled image: {e}")
+            finally:
+                os.remove(claimed_path)
+        return images
+
+    def _refill(self, business_type, style_preference):
+        """
+        Generate images until the combination holds pool_size fresh images.
+
+        Returns:
+            int: Number of images added
+        """
+        added = 0
+        try:
+            combo_dir = self._combo_dir(business_type, style_preference)
+            missing = self.pool_size - len(self._fresh_entries(combo_dir))
+            if missing <= 0:
+                return 0
+
+            for image in self.image_service.get_images(business_type, style_preference, missing):
+                file_path = os.path.join(combo_dir, f"{time.time():.6f}_{uuid.uuid4().hex}.json")
+                temp_path = f"{file_path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(image, f)
+                os.replace(temp_path, file_path)
+                added += 1
+        except Exception as e:
+            print(f"Error refilling image pool for {business_type} / {style_preference}: {e}")
+        finally:
+            with self._lock:
+                self._refilling.discard((business_type, style_preference))
+        return added
@@ -1,15 +1,23 @@
 # Image Service Module
 
-import requests
 import random
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from modules.http_client import ProviderClients
+from modules.metrics import Metrics
 
 class ImageService:
     """
     Handles image generation using Stability AI and Bria2.3 APIs based on business type and style.
     """
     
-    def __init__(self, stability_api_key=None, bria_api_key=None, unsplash_api_key=None, unsplash_secret_key=None):
+    def __init__(self, stability_api_key=None, bria_api_key=None, unsplash_api_key=None, unsplash_secret_key=None, http_clients=None,
+                 media_store=None, race=False, hedge_delay=2.0, max_workers=6, metrics=None,
+                 stability_api_url="https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
+                 bria_api_url="https://api.nvcf.nvidia.com/v2/nvcf/pexec/functions/bria",
+                 unsplash_api_url="https://api.unsplash.com/search/photos"):
         """
         Initialize the ImageService with API keys.
         
@@ -18,18 +26,43 @@ class ImageService:
             bria_api_key (str): Bria2.3 API key
             unsplash_api_key (str): Unsplash API key (for fallback)
             unsplash_secret_key (str): Unsplash Secret key (for fallback)
+            http_clients (ProviderClients, optional): Shared pooled HTTP clients
+            media_store (MediaStore, optional): Store generated images are saved to; without
+                one they are returned as inline data URIs
+            race (bool): Request Stability AI and Bria2.3 at the same time and keep the
+                first images to arrive, instead of trying one provider after another
+            hedge_delay (float): Seconds a race waits before also asking Unsplash
+            max_workers (int): Threads used for raced provider calls
+            metrics (Metrics, optional): Registry that provider latency and failures are recorded in
+            stability_api_url (str): Stability AI text-to-image endpoint
+            bria_api_url (str): Bria2.3 generation endpoint
+            unsplash_api_url (str): Unsplash photo search endpoint
         """
         self.stability_api_key = stability_api_key
         self.bria_api_key = bria_api_key
         self.unsplash_api_key = unsplash_api_key
         self.unsplash_secret_key = unsplash_secret_key
+        self.http_clients = http_clients or ProviderClients()
+        self.media_store = media_store
+        self.race = race
+        self.hedge_delay = hedge_delay
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-race")
+        self._race_stats = {}
+        self._race_stats_lock = threading.Lock()
+        
+        self.metrics = metrics or Metrics()
+        self._provider_seconds = self.metrics.histogram(
+            "image_provider_seconds", "Time taken by one image provider call.", ("provider",))
+        self._provider_failures = self.metrics.counter(
+            "image_provider_failures", "Image provider calls that returned no images.", ("provider",))
         
         # API endpoints
-        self.stability_api_url = "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image"
-        self.bria_api_url = "https://api.nvcf.nvidia.com/v2/nvcf/pexec/functions/bria"
-        self.unsplash_api_url = "https://api.unsplash.com/search/photos"
+        self.stability_api_url = stability_api_url
+        self.bria_api_url = bria_api_url
+        self.unsplash_api_url = unsplash_api_url
     
-    def get_images(self, business_type, style_preference, count=3):
+    def get_images(self, business_type, style_preference, count=3, deadline=None):
         """
         Get relevant images based on business type and style preference.
         
@@ -37,6 +70,8 @@ class ImageService:
             business_type (str): Type of business
             style_preference (str): Preferred style
             count (int): Number of images to return
+            deadline (float, optional): Monotonic time by which provider retries and
+                rate limit waits must end; defaults to the HTTP client's retry budget
             
         Returns:
             list: List of image URLs
@@ -47,23 +82,161 @@ class ImageService:
         # Create a prompt for AI image generation
         prompt = self._create_image_prompt(business_type, style_preference)
         
+        if self.race:
+            return self._race_images(prompt, search_terms, count, deadline)
+        
         # Try to generate images with Stability AI first
-        stability_images = self._generate_with_stability(prompt, count=count)
+        stability_images = self._call_provider("Stability AI", self._generate_with_stability, prompt, count, deadline)
         
         # If we don't have enough images from Stability AI, try Bria2.3
         if len(stability_images) < count:
-            bria_images = self._generate_with_bria(prompt, count=count-len(stability_images))
+            bria_images = self._call_provider("Bria2.3", self._generate_with_bria, prompt, count-len(stability_images),
+                                              deadline)
             images = stability_images + bria_images
         else:
             images = stability_images[:count]
         
         # If we still don't have enough images, try Unsplash as fallback
         if len(images) < count and self.unsplash_api_key:
-            unsplash_images = self._get_unsplash_images(search_terms, count-len(images))
+            unsplash_images = self._call_provider("Unsplash", self._get_unsplash_images, search_terms, count-len(images),
+                                                  deadline)
             images = images + unsplash_images
         
         return images[:count]  # Ensure we only return the requested number of images
     
+    def stats(self):
+        """
+        Report how each provider performed in image races, for tuning the hedge delay.
+        
+        Returns:
+            dict: Per-provider races entered, wins (first to deliver images), images
+                used, empty results and average latency in seconds
+        """
+        with self._race_stats_lock:
+            report = {}
+            for source, counters in self._race_stats.items():
+                report[source] = dict(counters)
+                report[source]["win_rate"] = round(counters["wins"] / counters["races"], 3) if counters["races"] else 0.0
+                finished = counters["races"] - counters["pending"]
+                report[source]["avg_latency"] = round(counters["latency_total"] / finished, 3) if finished else 0.0
+                del report[source]["latency_total"]
+            return report
+    
+    def _race_images(self, prompt, search_terms, count, deadline=None):
+        """
+        Request images from Stability AI and Bria2.3 at once, add Unsplash if they are
+        slow, and return the first count images to arrive. Calls that lose the race keep
+        running in the background but their images are ignored.
+        
+        Args:
+            prompt (str): Detailed prompt for image generation
+            search_terms (list): Search terms for Unsplash
+            count (int): Number of images to return
+            deadline (float, optional): Monotonic time by which provider retries must end
+            
+        Returns:
+            list: List of image metadata
+        """
+        started = time.monotonic()
+        pending = {
+            self._start_racer("Stability AI", self._generate_with_stability, prompt, count, deadline),
+            self._start_racer("Bria2.3", self._generate_with_bria, prompt, count, deadline)
+        }
+        hedged = not self.unsplash_api_key
+        
+        images = []
+        first_source = None
+        while len(images) < count and (pending or not hedged):
+            # Wake up for the hedge deadline if Unsplash has not been asked yet
+            timeout = None if hedged else max(started + self.hedge_delay - time.monotonic(), 0)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                source, racer_images = future.result()
+                if racer_images and first_source is None:
+                    first_source = source
+                images.extend(racer_images[:count - len(images)])
+            
+            # Hedge with Unsplash once the delay has passed, or right away if every generator came back short
+            if not hedged and len(images) < count and (not pending or time.monotonic() >= started + self.hedge_delay):
+                pending.add(self._start_racer("Unsplash", self._get_unsplash_images, search_terms, count - len(images),
+                                               deadline))
+                hedged = True
+        
+        # Calls still queued behind other races are dropped, running ones are left to finish
+        for future in pending:
+            if future.cancel():
+                with self._race_stats_lock:
+                    counters = self._race_stats[future.source]
+                    counters["races"] -= 1
+                    counters["pending"] -= 1
+        
+        with self._race_stats_lock:
+            if first_source:
+                self._race_stats[first_source]["wins"] += 1
+            for image in images:
+                self._race_stats[image["source"]]["images_used"] += 1
+        
+        return images[:count]
+    
+    def _start_racer(self, source, generate, *args):
+        """
+        Run one provider call of a race in the background and track its outcome.
+        
+        Returns:
+            Future: Resolves to (source, images)
+        """
+        with self._race_stats_lock:
+            counters = self._race_stats.setdefault(source, {"races": 0, "wins": 0, "images_used": 0, "empty": 0,
+                                                            "pending": 0, "latency_total": 0.0})
+            counters["races"] += 1
+            counters["pending"] += 1
+        
+        def run():
+            started = time.monotonic()
+            images = []
+            try:
+                images = self._call_provider(source, generate, *args)
+            finally:
+                # Recorded for stragglers too, so slow providers show up in the latency figures
+                with self._race_stats_lock:
+                    counters["pending"] -= 1
+                    counters["latency_total"] += time.monotonic() - started
+                    if not images:
+                        counters["empty"] += 1
+            return source, images
+        
+        future = self._executor.submit(run)
+        future.source = source
+        return future
+    
+    def _timeout(self, provider, deadline=None):
+        """
+        Get the (connect, read) timeout for a provider call, with the read timeout cut
+        to the time left before the deadline. Calls that lost a race then free their
+        pool thread once the generation has given up on them, instead of at the read timeout.
+        """
+        connect_timeout, read_timeout = self.http_clients.timeout(provider)
+        if deadline is not None:
+            read_timeout = max(min(read_timeout, deadline - time.monotonic()), 1)
+        return (connect_timeout, read_timeout)
+    
+    def _call_provider(self, source, generate, *args):
+        """
+        Call one image provider and record how long it took and whether it delivered.
+        
+        Returns:
+            list: Images from the provider
+        """
+        images = []
+        try:
+            with self._provider_seconds.time(provider=source):
+                images = generate(*args)
+        finally:
+            if not images:
+                self._provider_failures.inc(provider=source)
+        return images
+    
     def _get_search_terms(self, business_type, style_preference):
         """
         Generate search terms based on business type and style preference.
@@ -186,13 +359,14 @@ class ImageService:
         
         return prompt
     
-    def _generate_with_stability(self, prompt, count=1):
+    def _generate_with_stability(self, prompt, count=1, deadline=None):
         """
         Generate images using Stability AI API.
         
         Args:
             prompt (str): Detailed prompt for image generation
             count (int): Number of images to generate
+            deadline (float, optional): Monotonic time by which retries must end
             
         Returns:
             list: List of generated image URLs and metadata
@@ -228,7 +402,8 @@ class ImageService:
                 "steps": 30
             }
             
-            response = requests.post(self.stability_api_url, headers=headers, json=data)
+            response = self.http_clients.post("stability", self.stability_api_url, headers=headers, json=data,
+                                              deadline=deadline, timeout=self._timeout("stability", deadline))
             
             if response.status_code == 200:
                 result = response.json()
@@ -238,15 +413,11 @@ class ImageService:
                     if i >= count:
                         break
                     
-                    # In a real app, you would save this base64 image to a file or cloud storage
-                    # For this example, we'll create a placeholder URL structure
                     image_data = artifact.get("base64", None)
                     seed = artifact.get("seed", 0)
                     
                     if image_data:
-                        # In a real implementation, you would save this image and get a real URL
-                        # For now, we'll use a placeholder structure
-                        image_url = f"data:image/png;base64,{image_data}"
+                        image_url = self._store_image(image_data)
                         
                         images.append({
                             "url": image_url,
@@ -272,13 +443,29 @@ class ImageService:
         
         return images
     
-    def _generate_with_bria(self, prompt, count=1):
+    def _store_image(self, image_data, content_type="image/png"):
+        """
+        Save a base64 image and get the URL it is served from.
+        
+        Args:
+            image_data (str): Base64 image data or a data: URI
+            content_type (str): MIME type of the image when it is not a data: URI
+            
+        Returns:
+            str: URL of the stored image, or a data URI when no media store is configured
+        """
+        if self.media_store is None:
+            return image_data if image_data.startswith("data:") else f"data:{content_type};base64,{image_data}"
+        return self.media_store.url(self.media_store.put_base64(image_data, content_type))
+    
+    def _generate_with_bria(self, prompt, count=1, deadline=None):
         """
         Generate images using Bria2.3 API.
         
         Args:
             prompt (str): Detailed prompt for image generation
             count (int): Number of images to generate
+            deadline (float, optional): Monotonic time by which retries must end
             
         Returns:
             list: List of generated image URLs and metadata
@@ -305,7 +492,8 @@ class ImageService:
                 "num_inference_steps": 30
             }
             
-            response = requests.post(self.bria_api_url, headers=headers, json=data)
+            response = self.http_clients.post("bria", self.bria_api_url, headers=headers, json=data, deadline=deadline,
+                                              timeout=self._timeout("bria", deadline))
             
             if response.status_code == 200:
                 result = response.json()
@@ -315,11 +503,13 @@ class ImageService:
                     if i >= count:
                         break
                     
-                    # For this example, we'll create a placeholder URL structure
-                    # In a real app, you would save this image to a file or cloud storage
                     image_url = image_data.get("image", None)
                     
                     if image_url:
+                        # Inline image data is saved once instead of travelling in every page
+                        if not image_url.startswith(("http://", "https://")):
+                            image_url = self._store_image(image_url)
+
                         images.append({
                             "url": image_url,
                             "source": "Bria2.3",
@@ -344,13 +534,14 @@ class ImageService:
         
         return images
     
-    def _get_unsplash_images(self, search_terms, count):
+    def _get_unsplash_images(self, search_terms, count, deadline=None):
         """
         Get images from Unsplash API as fallback.
         
         Args:
             search_terms (list): List of search terms
             count (int): Number of images to return
+            deadline (float, optional): Monotonic time by which retries must end
             
         Returns:
             list: List of image URLs
@@ -376,7 +567,8 @@ class ImageService:
                     "Authorization": f"Client-ID {self.unsplash_api_key}"
                 }
                 
-                response = requests.get(self.unsplash_api_url, params=params, headers=headers)
+                response = self.http_clients.get("unsplash", self.unsplash_api_url, params=params, headers=headers,
+                                                     deadline=deadline, timeout=self._timeout("unsplash", deadline))
                 
                 if response.status_code == 200:
                     data = response.json()
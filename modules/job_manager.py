@@ -0,0 +1,438 @@
+# Job Manager Module
+
+import bisect
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+class Job:
+    """
+    Tracks the progress, partial results and event history of one background job.
+    """
+
+    # Events that change the job's state, kept in snapshots for other processes
+    STATE_EVENTS = ("status", "stage", "completed", "failed")
+
+    def __init__(self, stages=None, on_change=None):
+        """
+        Initialize a queued Job.
+
+        Args:
+            stages (list, optional): Names of the stages the job reports
+            on_change (callable, optional): Called with the job after every state change
+        """
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.stages = {stage: "pending" for stage in (stages or [])}
+        self.partial = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.events = []
+        self._next_event_id = 0
+        # Ids of the stream events still kept for each stage that has not completed yet
+        self._stage_event_ids = {}
+        self._on_change = on_change
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def _publish(self, event_type, data, stage=None):
+        """
+        Record an event and wake up every listener. Must hold the condition.
+        """
+        event_id = self._next_event_id
+        self._next_event_id += 1
+        self.events.append({"id": event_id, "type": event_type, "data": data})
+        if stage is not None:
+            self._stage_event_ids.setdefault(stage, set()).add(event_id)
+        self._condition.notify_all()
+
+    def _drop_stage_events(self, stages):
+        """
+        Remove the stream events of stages from the history, once listeners no longer
+        need them. Must hold the condition.
+        """
+        dropped = set()
+        for stage in stages:
+            dropped |= self._stage_event_ids.pop(stage, set())
+        if dropped:
+            self.events = [event for event in self.events if event["id"] not in dropped]
+
+    def start(self):
+        """
+        Mark the job as running.
+        """
+        with self._condition:
+            self.status = "running"
+            self._publish("status", {"status": self.status})
+        self._changed()
+
+    def stage_completed(self, stage, data=None):
+        """
+        Record a finished stage and its partial result.
+
+        Args:
+            stage (str): Name of the finished stage
+            data: Partial result produced by the stage
+        """
+        with self._condition:
+            self.stages[stage] = "completed"
+            self.partial[stage] = data
+            self._publish("stage", {"stage": stage, "data": data, "progress": self.progress})
+            # The stage event carries the whole result, so its stream events are not kept
+            self._drop_stage_events([stage])
+        self._changed()
+
+    def publish(self, event_type, data, stage=None):
+        """
+        Record an event that is not tied to a stage transition.
+
+        Args:
+            event_type (str): Name of the event
+            data: JSON-serializable event payload
+            stage (str, optional): Stage the event streams a part of, e.g. a text delta.
+                Such events are only sent to current listeners and dropped from the
+                history once the stage completes or the job finishes.
+        """
+        with self._condition:
+            self._publish(event_type, data, stage)
+
+    def complete(self, result):
+        """
+        Mark the job as completed with its final result.
+
+        Args:
+            result: Final job result
+        """
+        with self._condition:
+            self.status = "completed"
+            self.result = result
+            self.finished_at = time.time()
+            self._publish("completed", {"status": self.status})
+            self._drop_stage_events(list(self._stage_event_ids))
+        self._changed()
+
+    def fail(self, error):
+        """
+        Mark the job as failed.
+
+        Args:
+            error (str): Error message shown to the client
+        """
+        with self._condition:
+            self.status = "failed"
+            self.error = error
+            self.finished_at = time.time()
+            self._publish("failed", {"status": self.status, "error": error})
+            self._drop_stage_events(list(self._stage_event_ids))
+        self._changed()
+
+    def wait(self, timeout=None):
+        """
+        Block until the job finishes.
+
+        Args:
+            timeout (float, optional): Most seconds to wait
+
+        Returns:
+            bool: True if the job finished
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self.finished, timeout=timeout)
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change(self)
+
+    @property
+    def progress(self):
+        """
+        Fraction of stages that have completed.
+        """
+        if not self.stages:
+            return 1.0 if self.finished else 0.0
+        done = sum(1 for status in self.stages.values() if status == "completed")
+        return round(done / len(self.stages), 2)
+
+    def iter_events(self, since=0, keepalive=15):
+        """
+        Yield events as they are published until the job finishes.
+
+        Args:
+            since (int): Id of the first event to yield
+            keepalive (float): Seconds to wait before yielding None so callers can
+                keep idle connections alive
+
+        Yields:
+            dict: Event with 'id', 'type' and 'data', or None on keepalive
+        """
+        position = since
+        while True:
+            with self._condition:
+                if position >= self._next_event_id and not self.finished:
+                    self._condition.wait(timeout=keepalive)
+                # Ids only grow, but dropped stream events leave gaps
+                new_events = self.events[bisect.bisect_left(self.events, position, key=lambda event: event["id"]):]
+                finished = self.finished
+            if new_events:
+                position = new_events[-1]["id"] + 1
+
+            if not new_events and not finished:
+                yield None
+            for event in new_events:
+                yield event
+            if finished:
+                return
+
+    def to_dict(self):
+        """
+        Build a JSON-serializable snapshot of the job.
+
+        Returns:
+            dict: Job status, stage progress and results
+        """
+        with self._condition:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "stages": dict(self.stages),
+                "progress": self.progress,
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error
+            }
+
+    def snapshot(self):
+        """
+        Build a JSON-serializable copy of the job's state for other processes.
+
+        Returns:
+            dict: to_dict() plus the state events published so far
+        """
+        with self._condition:
+            return dict(self.to_dict(), events=[event for event in self.events if event["type"] in self.STATE_EVENTS])
+
+
+class StoredJob:
+    """
+    Read-only view of a job running in another process, followed through the
+    snapshots its process saves to a shared store.
+    """
+
+    def __init__(self, store, snapshot, poll_interval=1.0):
+        """
+        Initialize a StoredJob.
+
+        Args:
+            store (TieredCache): Store the owning process saves snapshots to
+            snapshot (dict): Latest snapshot of the job
+            poll_interval (float): Seconds between reads of the store while following events
+        """
+        self.store = store
+        self.poll_interval = poll_interval
+        self._load(snapshot)
+
+    @property
+    def finished(self):
+        return self.status in ("completed", "failed")
+
+    def _load(self, snapshot):
+        self.id = snapshot["id"]
+        self.status = snapshot["status"]
+        self.stages = snapshot["stages"]
+        self.progress = snapshot["progress"]
+        self.partial = snapshot["partial"]
+        self.result = snapshot["result"]
+        self.error = snapshot["error"]
+        self.events = snapshot["events"]
+
+    def _reload(self):
+        snapshot = self.store.get(self.id, refresh=True)
+        if snapshot is not None:
+            self._load(snapshot)
+        elif not self.finished:
+            # Expired or removed, so its outcome will never be known
+            self.status = "failed"
+            self.error = "Job is no longer available"
+            next_id = self.events[-1]["id"] + 1 if self.events else 0
+            self.events = self.events + [{"id": next_id, "type": "failed",
+                                          "data": {"status": self.status, "error": self.error}}]
+
+    def iter_events(self, since=0, keepalive=15):
+        """
+        Yield the job's state events as its process saves them, until it finishes.
+        Stream deltas and other events that are not saved are skipped.
+
+        Args:
+            since (int): Id of the first event to yield
+            keepalive (float): Seconds to wait before yielding None so callers can
+                keep idle connections alive
+
+        Yields:
+            dict: Event with 'id', 'type' and 'data', or None on keepalive
+        """
+        position = since
+        idle = 0.0
+        while True:
+            new_events = [event for event in self.events if event["id"] >= position]
+            for event in new_events:
+                yield event
+            if new_events:
+                position = new_events[-1]["id"] + 1
+                idle = 0.0
+            if self.finished:
+                return
+
+            if idle >= keepalive:
+                yield None
+                idle = 0.0
+            time.sleep(self.poll_interval)
+            idle += self.poll_interval
+            self._reload()
+
+    def to_dict(self):
+        """
+        Build a JSON-serializable snapshot of the job.
+
+        Returns:
+            dict: Job status, stage progress and results as last saved
+        """
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stages": dict(self.stages),
+            "progress": self.progress,
+            "partial": dict(self.partial),
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded worker pool and keeps them around for polling.
+
+    With a store, every state change is saved as a snapshot, so processes serving
+    the same application can report on jobs that another process runs.
+    """
+
+    def __init__(self, max_workers=4, job_ttl=3600, store=None, poll_interval=1.0, pools=None):
+        """
+        Initialize the JobManager.
+
+        Args:
+            max_workers (int): Number of jobs that run at the same time
+            job_ttl (int): Seconds a finished job is kept for polling
+            store (TieredCache, optional): Store with an on-disk tier shared by every
+                process, for job snapshots
+            poll_interval (float): Seconds between store reads while following a job
+                running in another process
+            pools (dict, optional): Extra worker pools by name to their size, so long-running
+                kinds of jobs never hold the slots of interactive ones
+        """
+        self.job_ttl = job_ttl
+        self.store = store
+        self.poll_interval = poll_interval
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._pools = {name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"job-{name}")
+                       for name, size in (pools or {}).items()}
+
+    def submit(self, func, *args, stages=None, pool=None):
+        """
+        Queue a job.
+
+        Args:
+            func (callable): Called as func(job, *args); its return value becomes the
+                job result
+            *args: Extra arguments for func
+            stages (list, optional): Names of the stages the job reports
+            pool (str, optional): Name of one of the extra pools to run on instead of the shared one
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(stages=stages, on_change=self._save if self.store else None)
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job.id] = job
+        self._save(job)
+        executor = self._pools[pool] if pool else self._executor
+        executor.submit(self._run, job, func, args)
+        return job
+
+    def get(self, job_id):
+        """
+        Look up a job by id, falling back to snapshots saved by other processes.
+
+        Args:
+            job_id (str): Job id
+
+        Returns:
+            Job: The job, a StoredJob if another process runs it, or None if unknown or expired
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            snapshot = self.store.get(job_id, refresh=True)
+            if snapshot is not None:
+                job = StoredJob(self.store, snapshot, poll_interval=self.poll_interval)
+        return job
+
+    def shutdown(self, timeout=None):
+        """
+        Stop taking jobs and wait for queued and running ones to finish. Jobs still
+        unfinished after the timeout are marked failed, so clients following them
+        from other processes learn the outcome.
+
+        Args:
+            timeout (float, optional): Most seconds to wait for all jobs together
+        """
+        executors = [self._executor] + list(self._pools.values())
+        for executor in executors:
+            executor.shutdown(wait=False)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            pending = [job for job in self._jobs.values() if not job.finished]
+        for job in pending:
+            remaining = max(deadline - time.monotonic(), 0) if deadline is not None else None
+            job.wait(remaining)
+
+        # Drop jobs that never started and give up on the rest
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for job in pending:
+            if not job.finished:
+                job.fail("Server shut down before the job finished")
+
+    def _run(self, job, func, args):
+        job.start()
+        try:
+            job.complete(func(job, *args))
+        except Exception as e:
+            print(f"Error running job {job.id}: {e}")
+            job.fail(str(e))
+
+    def _save(self, job):
+        if self.store is None:
+            return
+        try:
+            self.store.set(job.id, job.snapshot())
+        except Exception as e:
+            print(f"Error saving job {job.id}: {e}")
+
+    def _evict_expired(self):
+        """
+        Drop finished jobs older than the TTL. Must hold the lock.
+        """
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
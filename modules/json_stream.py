@@ -0,0 +1,117 @@
+# JSON Stream Module
+
+import json
+
+class JsonStreamParser:
+    """
+    Incrementally parses a JSON object arriving in chunks, reporting each top-level
+    member as soon as its value is complete.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty JsonStreamParser.
+        """
+        self.current_key = None
+        self.finished = False
+        self.errors = []
+
+        self._text = ""
+        self._position = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._state = "key"
+        self._token_start = None
+
+    def feed(self, chunk):
+        """
+        Add the next chunk of text.
+
+        Text before the opening brace, such as a Markdown code fence, is skipped, and
+        so is anything after the closing brace. Members whose value is not valid JSON
+        are recorded in errors and left out.
+
+        Args:
+            chunk (str): Next piece of the streamed document
+
+        Returns:
+            list: (key, value) tuples for every member completed by this chunk
+        """
+        completed = []
+        self._text += chunk
+        text = self._text
+
+        while self._position < len(text) and not self.finished:
+            index = self._position
+            char = text[index]
+            self._position += 1
+
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self.current_key = self._decode(text[self._token_start:index + 1])
+                        self._state = "colon"
+                    elif self._depth == 1 and self._state == "value":
+                        self._complete(completed, text[self._token_start:index + 1])
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and (self._state == "key" or (self._state == "value" and self._token_start is None)):
+                    self._token_start = index
+            elif char in "{[":
+                if self._depth == 1 and self._state == "value" and self._token_start is None:
+                    self._token_start = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._state == "value":
+                    self._complete(completed, text[self._token_start:index + 1])
+                elif self._depth == 0:
+                    # A number, true, false or null can be the last value before the closing brace
+                    if self._state == "value" and self._token_start is not None:
+                        self._complete(completed, text[self._token_start:index])
+                    self.finished = True
+            elif self._depth == 1:
+                if char == ":" and self._state == "colon":
+                    self._state = "value"
+                    self._token_start = None
+                elif char == ",":
+                    if self._state == "value" and self._token_start is not None:
+                        self._complete(completed, text[self._token_start:index])
+                    self._state = "key"
+                    self._token_start = None
+                elif not char.isspace() and self._state == "value" and self._token_start is None:
+                    self._token_start = index
+
+        return completed
+
+    def _complete(self, completed, raw_value):
+        """
+        Decode a finished member value and queue it for the caller.
+        """
+        try:
+            completed.append((self.current_key, json.loads(raw_value)))
+        except ValueError as e:
+            self.errors.append((self.current_key, str(e)))
+        self._state = "after_value"
+        self._token_start = None
+
+    def _decode(self, raw_key):
+        try:
+            return json.loads(raw_key)
+        except ValueError:
+            return raw_key.strip('"')
@@ -0,0 +1,288 @@
+# Media Store Module
+
+import base64
+import hashlib
+import os
+import re
+import threading
+import uuid
+from PIL import Image
+
+class MediaStore:
+    """
+    Content-addressed file store for generated media, served from the /media endpoint.
+    """
+
+    # File extension used for each supported content type
+    EXTENSIONS = {
+        "image/png": "png",
+        "image/jpeg": "jpg",
+        "image/webp": "webp",
+        "image/gif": "gif"
+    }
+
+    # Pillow format name for each derivative format
+    VARIANT_FORMATS = {
+        "webp": ("WEBP", "image/webp"),
+        "jpeg": ("JPEG", "image/jpeg"),
+        "png": ("PNG", "image/png")
+    }
+
+    def __init__(self, root="storage/media", url_prefix="/media/", variant_root="storage/media_variants",
+                 variant_widths=(160, 320, 640, 960), variant_max_bytes=256 * 1024 * 1024, variant_quality=80):
+        """
+        Initialize the MediaStore.
+
+        Args:
+            root (str): Directory the media files are written to
+            url_prefix (str): URL path the media files are served from
+            variant_root (str): Directory resized derivatives are cached in
+            variant_widths (tuple): Widths derivatives are rendered at; requests are
+                rounded up to the nearest one so the cache stays small
+            variant_max_bytes (int): Size above which least recently used derivatives are evicted
+            variant_quality (int): Encoder quality for WebP and JPEG derivatives
+        """
+        self.root = root
+        self.url_prefix = url_prefix
+        self.variant_root = variant_root
+        self.variant_widths = sorted(variant_widths)
+        self.variant_max_bytes = variant_max_bytes
+        self.variant_quality = variant_quality
+
+        self._variant_lock = threading.Lock()
+        self._variant_bytes = None
+
+        for directory in (self.root, self.variant_root):
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+    def put(self, data, content_type="image/png"):
+        """
+        Store media bytes under the hash of their content.
+
+        Args:
+            data (bytes): Media content
+            content_type (str): MIME type of the content
+
+        Returns:
+            str: Media id (SHA-256 of the content)
+        """
+        media_id = hashlib.sha256(data).hexdigest()
+        extension = self.EXTENSIONS.get(content_type, "bin")
+        file_path = self._file_path(media_id, extension)
+
+        # Identical content is already stored under the same name
+        if not os.path.exists(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, file_path)
+
+        return media_id
+
+    def put_base64(self, encoded, content_type="image/png"):
+        """
+        Decode base64 media, including data URIs, and store it.
+
+        Args:
+            encoded (str): Base64 content or a data: URI
+            content_type (str): MIME type used when the data has none of its own
+
+        Returns:
+            str: Media id
+        """
+        match = re.match(r'data:([\w/+.-]+);base64,', encoded)
+        if match:
+            content_type = match.group(1)
+            encoded = encoded[match.end():]
+        return self.put(base64.b64decode(encoded), content_type)
+
+    def url(self, media_id):
+        """
+        Build the URL a media file is served from.
+
+        Args:
+            media_id (str): Media id
+
+        Returns:
+            str: URL path of the media file
+        """
+        return f"{self.url_prefix}{media_id}"
+
+    def media_id_from_url(self, url):
+        """
+        Extract the media id from a URL served by this store.
+
+        Args:
+            url (str): Image URL
+
+        Returns:
+            str: Media id, or None if the URL does not point at this store
+        """
+        if not url or not url.startswith(self.url_prefix):
+            return None
+        media_id = url[len(self.url_prefix):].split('?', 1)[0]
+        return media_id if self._valid_id(media_id) else None
+
+    def path(self, media_id):
+        """
+        Find the file holding a media id.
+
+        Args:
+            media_id (str): Media id
+
+        Returns:
+            tuple: (file path, content type), or (None, None) if not stored
+        """
+        if not self._valid_id(media_id):
+            return None, None
+        for content_type, extension in self.EXTENSIONS.items():
+            file_path = self._file_path(media_id, extension)
+            if os.path.exists(file_path):
+                return file_path, content_type
+        return None, None
+
+    def read(self, media_id):
+        """
+        Read the content of a media id.
+
+        Args:
+            media_id (str): Media id
+
+        Returns:
+            bytes: Media content, or None if not stored
+        """
+        file_path, _ = self.path(media_id)
+        if file_path is None:
+            return None
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    def variant(self, media_id, width=None, fmt="webp"):
+        """
+        Get a width-bounded derivative of an image, rendering and caching it on first use.
+
+        Args:
+            media_id (str): Media id of the original image
+            width (int, optional): Requested maximum width in pixels
+            fmt (str): Output format, one of VARIANT_FORMATS
+
+        Returns:
+            tuple: (file path, content type, variant tag), or (None, None, None) if the
+                original is missing or the format is unsupported
+        """
+        source_path, _ = self.path(media_id)
+        if source_path is None or fmt not in self.VARIANT_FORMATS:
+            return None, None, None
+
+        width = self._variant_width(width)
+        pil_format, content_type = self.VARIANT_FORMATS[fmt]
+        tag = f"{width or 'full'}.{fmt}"
+        variant_path = os.path.join(self.variant_root, media_id[:2], f"{media_id}-{tag}")
+
+        if os.path.exists(variant_path):
+            # Touch the file so eviction treats it as recently used
+            try:
+                os.utime(variant_path)
+                return variant_path, content_type, tag
+            except OSError:
+                pass
+
+        self._render_variant(source_path, variant_path, width, pil_format)
+        return variant_path, content_type, tag
+
+    def srcset(self, url, fmt="webp"):
+        """
+        Build a srcset attribute value for a media URL.
+
+        Args:
+            url (str): Image URL served by this store
+            fmt (str): Derivative format
+
+        Returns:
+            str: srcset value, or an empty string for URLs outside this store
+        """
+        media_id = self.media_id_from_url(url)
+        if media_id is None:
+            return ""
+        return ", ".join(f"{self.url(media_id)}?w={width}&fmt={fmt} {width}w" for width in self.variant_widths)
+
+    def _variant_width(self, width):
+        """
+        Round a requested width up to the nearest configured variant width.
+        """
+        if not width:
+            return None
+        for candidate in self.variant_widths:
+            if candidate >= width:
+                return candidate
+        return self.variant_widths[-1]
+
+    def _render_variant(self, source_path, variant_path, width, pil_format):
+        with Image.open(source_path) as img:
+            if width and img.width > width:
+                # thumbnail() uses draft() and reduce() before resampling large images
+                img.thumbnail((width, img.height), Image.LANCZOS, reducing_gap=2.0)
+            if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+
+            os.makedirs(os.path.dirname(variant_path), exist_ok=True)
+            temp_path = f"{variant_path}.{uuid.uuid4().hex}.tmp"
+            save_options = {"quality": self.variant_quality} if pil_format in ("WEBP", "JPEG") else {"optimize": True}
+            if pil_format == "JPEG":
+                save_options["progressive"] = True
+            img.save(temp_path, pil_format, **save_options)
+
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, variant_path)
+
+        with self._variant_lock:
+            if self._variant_bytes is None:
+                self._variant_bytes = sum(entry[2] for entry in self._variant_entries())
+            else:
+                self._variant_bytes += size
+            over_limit = self._variant_bytes > self.variant_max_bytes
+        if over_limit:
+            self._evict_variants()
+
+    def _variant_entries(self):
+        """
+        List cached derivatives as (path, last used, size) tuples, least recently used first.
+        """
+        entries = []
+        for directory, _, names in os.walk(self.variant_root):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                file_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                entries.append((file_path, stat.st_mtime, stat.st_size))
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def _evict_variants(self):
+        """
+        Delete least recently used derivatives until the cache is under its size limit.
+        """
+        with self._variant_lock:
+            entries = self._variant_entries()
+            total = sum(entry[2] for entry in entries)
+            for file_path, _, size in entries:
+                if total <= self.variant_max_bytes:
+                    break
+                try:
+                    os.remove(file_path)
+                    total -= size
+                except OSError:
+                    continue
+            self._variant_bytes = total
+
+    def _valid_id(self, media_id):
+        return bool(re.fullmatch(r'[0-9a-f]{64}', media_id or ''))
+
+    def _file_path(self, media_id, extension):
+        # Fan out into subdirectories so no single directory grows too large
+        return os.path.join(self.root, media_id[:2], f"{media_id}.{extension}")
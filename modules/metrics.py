@@ -0,0 +1,208 @@
+# Metrics Module
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Default latency buckets in seconds, from cache hits up to slow upstream generations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+class Counter:
+    """
+    Monotonically increasing count, kept separately for every combination of label values.
+    """
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """
+        Yield (suffix, labels, value) for the exposition format.
+        """
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "_total", dict(zip(self.labelnames, key)), value
+
+class Histogram:
+    """
+    Distribution of observed values, e.g. durations, over fixed buckets.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values to [per-bucket counts (last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe how long the with block takes, whether or not it raises.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        """
+        Yield (suffix, labels, value) for the exposition format, with cumulative buckets.
+        """
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", dict(labels, le=_format_value(bound)), cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+class Metrics:
+    """
+    Registry of the application's metrics, rendered in the Prometheus text exposition format.
+
+    Services ask the registry for their metrics by name, so services sharing one
+    registry also share the metric. Figures that services already keep, such as
+    cache hit counts, are read through collectors when the metrics are scraped
+    instead of being tracked twice.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize an empty Metrics registry.
+
+        Args:
+            buckets (tuple): Upper bounds in seconds used by histograms created without their own
+        """
+        self.buckets = buckets
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        """
+        Get or create a counter.
+
+        Args:
+            name (str): Metric name without the _total suffix
+            documentation (str): HELP text
+            labelnames (tuple): Names of the labels every increment provides
+
+        Returns:
+            Counter: The registered counter
+        """
+        return self._register(name, lambda: Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=None):
+        """
+        Get or create a histogram.
+
+        Args:
+            name (str): Metric name
+            documentation (str): HELP text
+            labelnames (tuple): Names of the labels every observation provides
+            buckets (tuple, optional): Bucket upper bounds; defaults to the registry's buckets
+
+        Returns:
+            Histogram: The registered histogram
+        """
+        return self._register(name, lambda: Histogram(name, documentation, labelnames, buckets or self.buckets))
+
+    def register_collector(self, collector):
+        """
+        Add a callback read at scrape time.
+
+        Args:
+            collector (callable): Returns a list of (name, type, documentation, samples)
+                where samples is a list of (labels, value) and type is 'gauge' or 'counter'
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            kind = "histogram" if isinstance(metric, Histogram) else "counter"
+            # Counter samples end in _total, and HELP and TYPE must name the same family
+            family = metric.name if kind == "histogram" else f"{metric.name}_total"
+            lines.append(f"# HELP {family} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {family} {kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {_escape_help(documentation)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _register(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,75 @@
+# Rate Limiter Module
+
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every caller of one upstream provider.
+    """
+
+    def __init__(self, rate, capacity):
+        """
+        Initialize a full TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second, i.e. the sustained request rate
+            capacity (int): Most tokens held at once, i.e. the largest burst allowed
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.waits = 0
+
+    def acquire(self, deadline=None):
+        """
+        Take a token, waiting until one is available.
+
+        Args:
+            deadline (float, optional): Monotonic time after which to give up
+
+        Returns:
+            bool: True once a token was taken, False if none is available before the deadline
+        """
+        waited = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(self._blocked_until - now, 0.0)
+                if wait == 0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    if waited:
+                        self.waits += 1
+                    return True
+                wait = max(wait, (1 - self._tokens) / self.rate)
+            if deadline is not None and now + wait > deadline:
+                return False
+            waited = True
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Hold every caller back for a while, e.g. when the provider asked us to slow down.
+
+        Args:
+            seconds (float): How long no tokens are handed out
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            # Allow one request when the pause ends, not a full burst
+            self._tokens = min(self._tokens, 1.0)
+
+    def _refill(self, now):
+        """
+        Add the tokens earned since the last update, none while paused. Must hold the lock.
+        """
+        earned_since = max(self._updated, self._blocked_until)
+        if now > earned_since:
+            self._tokens = min(self.capacity, self._tokens + (now - earned_since) * self.rate)
+        self._updated = now
@@ -6,6 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initInfoCards();
     initAnimations();
     initCopyButtons();
+    initJobProgress();
 });
 
 /**
@@ -165,6 +166,158 @@ function initCopyButtons() {
     });
 }
 
+/**
+ * Follow a running generation job and fill in the results page as each stage finishes
+ */
+function initJobProgress() {
+    const progress = document.querySelector('.job-progress');
+    if (!progress || !window.EventSource) return;
+
+    const events = new EventSource(progress.dataset.eventsUrl);
+
+    // Show generated text as it streams in, until its section has been parsed
+    events.addEventListener('delta', (event) => {
+        const delta = JSON.parse(event.data);
+        const preview = document.querySelector(`[data-stream="${delta.section}"]`);
+        if (!preview) return;
+        preview.hidden = false;
+        preview.textContent += delta.text;
+    });
+
+    events.addEventListener('stage', (event) => {
+        const stage = JSON.parse(event.data);
+        updateProgress(progress, stage.progress);
+        const preview = document.querySelector(`[data-stream="${stage.stage}"]`);
+        if (preview) preview.remove();
+        if (stage.stage === 'images') {
+            fillImages(stage.data || []);
+        } else if (stage.data) {
+            fillFields(stage.stage, stage.data);
+        }
+    });
+
+    events.addEventListener('completed', () => {
+        events.close();
+        updateProgress(progress, 1);
+        setTimeout(() => progress.remove(), 500);
+    });
+
+    events.addEventListener('failed', () => {
+        events.close();
+        progress.classList.add('failed');
+        progress.querySelector('p').textContent = 'Content generation failed. Please try again.';
+    });
+}
+
+/**
+ * Update the progress bar of a running job
+ */
+function updateProgress(progress, fraction) {
+    const percent = `${Math.round(fraction * 100)}%`;
+    progress.querySelector('.job-progress-value').textContent = percent;
+    progress.querySelector('.job-progress-fill').style.width = percent;
+}
+
+/**
+ * Fill every element bound to a content field, recursing into nested sections
+ */
+function fillFields(path, value) {
+    const businessName = document.querySelector('.results-container').dataset.businessName;
+
+    document.querySelectorAll(`[data-field="${path}"]`).forEach(element => {
+        let text = value;
+        if (Array.isArray(value)) {
+            text = value.join('\n\n');
+        } else if (value && typeof value === 'object') {
+            // Full email copy buttons combine every part of the template
+            text = [value.greeting, value.body, value.cta, `${value.sign_off || ''}\n${businessName} Team`]
+                .filter(Boolean).join('\n\n');
+        }
+
+        if (element.classList.contains('btn-copy')) {
+            element.dataset.content = text;
+        } else {
+            element.textContent = text;
+        }
+    });
+
+    if (value && typeof value === 'object' && !Array.isArray(value)) {
+        Object.entries(value).forEach(([key, child]) => fillFields(`${path}.${key}`, child));
+    }
+}
+
+/**
+ * Render images that arrived after the page was loaded
+ */
+function fillImages(images) {
+    if (images.length === 0) return;
+
+    const gallery = document.querySelector('[data-images]');
+    const widths = gallery ? gallery.dataset.variantWidths.split(',').filter(Boolean) : [];
+
+    document.querySelectorAll('.instagram-preview, .facebook-preview, .linkedin-preview').forEach(preview => {
+        let wrapper = preview.querySelector('.social-image');
+        if (!wrapper) {
+            wrapper = document.createElement('div');
+            wrapper.className = 'social-image';
+            preview.prepend(wrapper);
+        }
+        const alt = wrapper.querySelector('img') ? wrapper.querySelector('img').alt : 'Social Post Image';
+        wrapper.replaceChildren(createPicture(images[0].url, widths, '(max-width: 768px) 100vw, 600px', alt));
+    });
+
+    if (!gallery) return;
+    gallery.innerHTML = '';
+    images.forEach(image => {
+        const card = document.createElement('div');
+        card.className = 'image-card';
+
+        const picture = createPicture(image.url, widths, '(max-width: 768px) 100vw, 400px', 'Business Image');
+        picture.querySelector('img').loading = 'lazy';
+        card.appendChild(picture);
+
+        const info = document.createElement('div');
+        info.className = 'image-info';
+        const credit = document.createElement('p');
+        credit.textContent = image.photographer ? `Photo by ${image.photographer} on ${image.source}` : `Image by ${image.source}`;
+        info.appendChild(credit);
+
+        const download = document.createElement('a');
+        download.href = image.download_url;
+        download.className = 'btn-download';
+        download.setAttribute('download', '');
+        download.textContent = 'Download';
+        info.appendChild(download);
+
+        card.appendChild(info);
+        gallery.appendChild(card);
+    });
+}
+
+/**
+ * Build a <picture> that offers resized WebP derivatives of locally served media,
+ * with JPEG derivatives for browsers without WebP support
+ */
+function createPicture(url, widths, sizes, alt) {
+    const picture = document.createElement('picture');
+    const img = document.createElement('img');
+    img.src = url;
+    img.alt = alt;
+
+    if (url.startsWith('/media/') && widths.length > 0) {
+        const source = document.createElement('source');
+        source.type = 'image/webp';
+        source.srcset = widths.map(width => `${url}?w=${width}&fmt=webp ${width}w`).join(', ');
+        source.sizes = sizes;
+        picture.appendChild(source);
+
+        img.srcset = widths.map(width => `${url}?w=${width}&fmt=jpeg ${width}w`).join(', ');
+        img.sizes = sizes;
+    }
+    picture.appendChild(img);
+    return picture;
+}
+
 /**
  * Show toast notification
  */
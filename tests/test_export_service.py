@@ -0,0 +1,36 @@
+# Export Service Tests
+
+import io
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.export_service import ExportService
+
+CONTENT = {
+    'description': {'short': 'Fresh bread daily.', 'medium': 'Fresh bread daily.', 'long': 'Fresh bread daily.'},
+    'email': {'welcome': {'subject': 'Welcome', 'body': 'Hello there.'}},
+    'social_media': {'twitter': ['Come visit us!']}
+}
+BUSINESS = {'name': 'Test Bakery', 'type': 'Bakery', 'description': 'Neighborhood bakery.', 'location': 'Portland, OR',
+            'target_audience': 'Local families', 'style_preference': 'Rustic'}
+
+def test_bundle_opens_when_one_asset_fails(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = ExportService()
+    
+    def create_social_post(*args):
+        raise UnicodeEncodeError('latin-1', 'café', 3, 4, 'ordinal not in range(256)')
+    monkeypatch.setattr(service, 'create_social_post', create_social_post)
+    
+    data = b"".join(service.iter_bundle(CONTENT, BUSINESS))
+    
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        names = archive.namelist()
+        assert 'description.txt' in names
+        assert 'email/welcome.html' in names
+        assert 'social/twitter.png' not in names
+        assert 'social/twitter.png' in archive.read('errors.txt').decode('utf-8')